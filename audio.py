@@ -0,0 +1,185 @@
+import os
+import random
+import threading
+import time
+from voices import VoiceManager
+from config import (
+    DEFAULT_SOUND_PATH, BUBBLE_SOUND_PATH, PUFFER_INFLATE_SOUND_PATH, CHEST_OPEN_SOUND_PATH,
+    BUBBLE_SOUND_CLIP_DURATION, BUBBLE_CLIP_POOL_SIZE
+)
+
+
+def clip_ranges(total_bytes, clip_bytes, frame_bytes, count):
+    """
+    Picks `count` random (start, end) byte ranges of up to clip_bytes within
+    a buffer of total_bytes, starting on whole sample frames so clips don't
+    click or pop.
+    """
+    if clip_bytes >= total_bytes:
+        return [(0, total_bytes)]
+    ranges = []
+    for _ in range(count):
+        start = random.randint(0, total_bytes - clip_bytes)
+        start -= start % frame_bytes
+        ranges.append((start, start + clip_bytes))
+    return ranges
+
+
+class RateLimiter:
+    """
+    A token bucket: allows bursts of up to `burst` events, then `rate`
+    events per second. Events over the limit are refused, not queued.
+    """
+    def __init__(self, rate, burst, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.tokens = float(burst)
+        self.last = None
+
+        # Event statistics
+        self.allowed = 0
+        self.refused = 0
+
+    def allow(self):
+        """Takes a token if one is available; returns whether the event may go ahead."""
+        now = self.clock()
+        if self.last is not None:
+            self.tokens = min(self.burst, self.tokens + (now - self.last) * self.rate)
+        self.last = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            self.allowed += 1
+            return True
+        self.refused += 1
+        return False
+
+
+class AudioAssets:
+    """
+    Imports pygame and decodes the sound files on a background thread, so
+    the aquarium starts animating straight away.
+
+    Until `ready` is set every sound attribute is empty and callers should
+    treat sound as unavailable; once it is set the attributes never change
+    again (until close()). `status` describes the outcome for the user and
+    `timings` records how long the pygame import and the decoding took.
+    """
+    def __init__(self, resolve_path=lambda path: path, origin=None):
+        self.resolve_path = resolve_path
+        self.origin = time.perf_counter() if origin is None else origin
+        self.ready = threading.Event()
+        self.ready_callbacks = []
+        self.lock = threading.Lock()
+        self.thread = None
+        self.status = 'not loaded'
+        self.timings = {}
+
+        # Filled in by the loader thread
+        self.mixer = None
+        self.voices = None  # VoiceManager that every sound is played through
+        self.ambient = None
+        self.bubble_clips = []  # Random segments of the bubble track, ready to play
+        self.mixer_props = None  # (frequency, size, channels) of the mixer
+        self.puffer = None
+        self.chest = None
+
+    def start(self):
+        """Starts loading on a background thread (once)."""
+        if self.thread is None:
+            self.status = 'loading'
+            self.thread = threading.Thread(target=self._load, name='audio-loader', daemon=True)
+            self.thread.start()
+
+    def add_ready_callback(self, callback):
+        """
+        Calls callback() once loading has finished: straight away if it
+        already has, otherwise from the loader thread.
+        """
+        with self.lock:
+            if not self.ready.is_set():
+                self.ready_callbacks.append(callback)
+                return
+        callback()
+
+    def wait(self, timeout=None):
+        """Blocks until loading has finished; returns whether it has."""
+        return self.ready.wait(timeout)
+
+    def _load(self):
+        """Loader thread: imports pygame, opens the mixer and decodes every sound."""
+        started = time.perf_counter()
+        try:
+            # The import must not print over the animation
+            os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+            import pygame
+        except ImportError:
+            self.status = 'unavailable (pygame not installed)'
+            self._finish(started)
+            return
+        self.timings['pygame_import'] = time.perf_counter() - started
+
+        try:
+            pygame.mixer.init()
+            ambient = pygame.mixer.Sound(self.resolve_path(DEFAULT_SOUND_PATH))
+        except Exception as e:
+            self.status = f'unavailable ({e})'
+            self._finish(started)
+            return
+        self.mixer = pygame.mixer
+        self.mixer_props = pygame.mixer.get_init()
+        self.voices = VoiceManager(pygame.mixer)
+        self.bubble_clips = self._build_clips(self._load_effect(BUBBLE_SOUND_PATH, raw=True))
+        self.puffer = self._load_effect(PUFFER_INFLATE_SOUND_PATH)
+        self.chest = self._load_effect(CHEST_OPEN_SOUND_PATH)
+        # Published last: toggle_sound() takes a non-empty ambient to mean everything is loaded
+        self.ambient = ambient
+        self.status = 'ready'
+        self._finish(started)
+
+    def _load_effect(self, path, raw=False):
+        """Decodes one sound effect (as raw samples if raw=True), or returns None if it can't be loaded."""
+        try:
+            sound = self.mixer.Sound(self.resolve_path(path))
+            return sound.get_raw() if raw else sound
+        except Exception:
+            return None
+
+    def _build_clips(self, raw, duration=BUBBLE_SOUND_CLIP_DURATION, count=BUBBLE_CLIP_POOL_SIZE):
+        """
+        Cuts `count` random clips of `duration` seconds out of raw samples
+        and turns each into a Sound. The clips are memoryview slices, so the
+        track is never copied except by the mixer itself.
+        """
+        if not raw:
+            return []
+        frequency, size, channels = self.mixer_props
+        frame_bytes = abs(size) // 8 * channels  # e.g. 16-bit stereo -> 4 bytes
+        clip_bytes = int(duration * frequency) * frame_bytes
+        samples = memoryview(raw)
+        clips = []
+        for start, end in clip_ranges(len(raw), clip_bytes, frame_bytes, count):
+            try:
+                clips.append(self.mixer.Sound(buffer=samples[start:end]))
+            except Exception:
+                pass
+        return clips
+
+    def _finish(self, started):
+        """Records the load timings and tells the main thread the assets are settled."""
+        now = time.perf_counter()
+        self.timings['load'] = now - started
+        self.timings['ready_at'] = now - self.origin
+        with self.lock:
+            self.ready.set()
+            callbacks, self.ready_callbacks = self.ready_callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def close(self):
+        """Stops all sound and shuts the mixer down, if it was ever opened."""
+        if self.ready.is_set() and self.mixer:
+            try:
+                self.mixer.quit()
+            except Exception:
+                pass
@@ -0,0 +1,249 @@
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+
+from config import SIM_TIMESTEP
+
+# --- Benchmark Suite Parameters ---
+SUITE_SIZES = [(80, 24), (120, 40), (200, 60), (400, 120)]
+SUITE_POPULATIONS = [
+    {'num_fish': 50, 'num_schools': 2, 'num_bubbles': 20, 'num_jellyfish': 3},
+    {'num_fish': 500, 'num_schools': 10, 'num_bubbles': 200, 'num_jellyfish': 10},
+    {'num_fish': 2000, 'num_schools': 20, 'num_bubbles': 1000, 'num_jellyfish': 20},
+]
+SUITE_FRAMES = 200
+SUITE_BURST_EVERY = 25
+
+
+class ByteCountingSink:
+    """A write-only binary stream that discards frames but counts the bytes."""
+    def __init__(self, keep=False):
+        self.bytes_written = 0
+        self.keep = keep
+        self.chunks = []
+
+    def write(self, data):
+        self.bytes_written += len(data)
+        if self.keep:
+            # The renderer reuses its buffer, so keep a copy
+            self.chunks.append(bytes(data))
+
+    def flush(self):
+        pass
+
+
+def percentile(samples, pct):
+    """Returns the pct-th percentile (nearest rank) of a list of samples."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def run_headless(width, height, frames, seed=0, burst_every=0, keep_output=False, profile=False, **population):
+    """
+    Builds a headless Aquarium of a fixed size and seed and runs `frames`
+    iterations of update()+draw() back to back into an in-memory sink.
+    Returns a dict of throughput, per-phase timing and bandwidth results.
+    Entity counts (num_fish, num_schools, num_bubbles, num_jellyfish) may be
+    pinned via keyword arguments; anything left out is randomized as usual.
+    With profile=True the aquarium's frame profiler runs too and its
+    report lines are returned under 'profile'.
+    """
+    from main_aquarium import Aquarium
+
+    random.seed(seed)
+    sink = ByteCountingSink(keep=keep_output)
+    aquarium = Aquarium(size=(width, height), headless=True, stream=sink)
+    if population:
+        aquarium.generate_new_scene(**population)
+    if profile:
+        aquarium.profiler.enable()
+
+    update_times = []
+    draw_times = []
+    frame_bytes = []
+    dirty_fractions = []
+    start = time.perf_counter()
+    for frame in range(frames):
+        if burst_every and frame % burst_every == 0:
+            aquarium.create_bubble_burst(random.randint(0, width - 1), random.randint(0, height - 1))
+
+        t0 = time.perf_counter()
+        aquarium.update(SIM_TIMESTEP)
+        aquarium.time_step += 1
+        t1 = time.perf_counter()
+        aquarium.draw()
+        t2 = time.perf_counter()
+
+        update_times.append((t1 - t0) * 1000)
+        draw_times.append((t2 - t1) * 1000)
+        frame_bytes.append(aquarium.renderer.last_frame_bytes)
+        dirty_fractions.append(aquarium.compositor.last_dirty_fraction)
+    elapsed = time.perf_counter() - start
+
+    result = {
+        'width': width,
+        'height': height,
+        'frames': frames,
+        'seed': seed,
+        'burst_every': burst_every,
+        'population': {
+            'fish': len(aquarium.fishes),
+            'schools': len(aquarium.schools),
+            'bubbles': len(aquarium.bubbles),
+            'jellyfish': len(aquarium.jellyfishes),
+        },
+        'fps': frames / elapsed if elapsed else 0.0,
+        'update_ms_p50': percentile(update_times, 50),
+        'update_ms_p99': percentile(update_times, 99),
+        'draw_ms_p50': percentile(draw_times, 50),
+        'draw_ms_p99': percentile(draw_times, 99),
+        'bytes_per_frame': sum(frame_bytes) / frames if frames else 0.0,
+        'bytes_per_frame_p99': percentile(frame_bytes, 99),
+        'dirty_fraction_mean': sum(dirty_fractions) / frames if frames else 0.0,
+    }
+    if profile:
+        result['profile'] = aquarium.profiler.report_lines(
+            {'fish': len(aquarium.fishes), 'schools': len(aquarium.schools), 'bubbles': len(aquarium.bubbles),
+             'jellyfish': len(aquarium.jellyfishes), 'seaweed': len(aquarium.seaweeds)})
+    return result
+
+
+def measure_startup(width, height, seed=0):
+    """
+    Times a cold start: importing the aquarium, building a scene, drawing
+    the first frame and loading the audio in the background. Only
+    meaningful in a fresh interpreter that has not imported main_aquarium.
+    Returns the timings in milliseconds and the one-line startup report.
+    """
+    import main_aquarium
+
+    random.seed(seed)
+    aquarium = main_aquarium.Aquarium(size=(width, height), headless=True, stream=ByteCountingSink())
+    aquarium.audio.start()
+    aquarium.draw()
+    aquarium.audio.wait()
+    times = aquarium.startup_times
+    audio = aquarium.audio.timings
+    return {
+        'import_ms': times['import'] * 1000,
+        'init_ms': times['init'] * 1000,
+        'first_frame_ms': times['first_frame'] * 1000,
+        'audio_status': aquarium.audio.status,
+        'audio_load_ms': audio['load'] * 1000,
+        'audio_ready_ms': audio['ready_at'] * 1000,
+        'report': aquarium.startup_report(),
+    }
+
+
+def run_suite(frames=SUITE_FRAMES, seed=0, burst_every=SUITE_BURST_EVERY, progress=None):
+    """Sweeps terminal sizes and entity counts and returns the full result set."""
+    results = []
+    for width, height in SUITE_SIZES:
+        for population in SUITE_POPULATIONS:
+            result = run_headless(width, height, frames, seed=seed, burst_every=burst_every, **population)
+            results.append(result)
+            if progress:
+                progress(result)
+    return {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+
+
+def _case_key(result):
+    """Identifies a benchmark case independently of its timings."""
+    population = result['population']
+    return (result['width'], result['height'], population['fish'], population['schools'],
+            population['bubbles'], population['jellyfish'])
+
+
+def compare_runs(baseline, current):
+    """Pairs up matching cases from two suite runs and reports the relative change."""
+    baseline_cases = {_case_key(result): result for result in baseline['results']}
+    rows = []
+    for result in current['results']:
+        before = baseline_cases.get(_case_key(result))
+        if before is None:
+            continue
+        rows.append({
+            'case': _case_key(result),
+            'fps_ratio': result['fps'] / before['fps'] if before['fps'] else float('inf'),
+            'draw_p99_ratio': result['draw_ms_p99'] / before['draw_ms_p99'] if before['draw_ms_p99'] else float('inf'),
+            'bytes_ratio': result['bytes_per_frame'] / before['bytes_per_frame'] if before['bytes_per_frame'] else float('inf'),
+        })
+    return rows
+
+
+def format_result(result):
+    """Formats a single benchmark result as a one-line summary."""
+    population = result['population']
+    return (f"{result['width']:>3}x{result['height']:<3} "
+            f"fish={population['fish']:<5} schools={population['schools']:<3} "
+            f"bubbles={population['bubbles']:<5} jelly={population['jellyfish']:<3} | "
+            f"{result['fps']:8.1f} fps | "
+            f"update p50/p99 {result['update_ms_p50']:6.2f}/{result['update_ms_p99']:6.2f} ms | "
+            f"draw p50/p99 {result['draw_ms_p50']:6.2f}/{result['draw_ms_p99']:6.2f} ms | "
+            f"{result['bytes_per_frame']:9.0f} B/frame | "
+            f"dirty {result.get('dirty_fraction_mean', 1.0):5.1%}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless aquarium benchmarks (no TTY, audio or input needed).")
+    parser.add_argument('--width', type=int, default=200)
+    parser.add_argument('--height', type=int, default=60)
+    parser.add_argument('--frames', type=int, help=f"Frames per run (default 500, or {SUITE_FRAMES} per suite case)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--burst-every', type=int, default=0, help="Trigger a bubble burst every N frames")
+    parser.add_argument('--fish', type=int, dest='num_fish')
+    parser.add_argument('--schools', type=int, dest='num_schools')
+    parser.add_argument('--bubbles', type=int, dest='num_bubbles')
+    parser.add_argument('--jellyfish', type=int, dest='num_jellyfish')
+    parser.add_argument('--suite', action='store_true', help="Sweep terminal sizes and entity counts")
+    parser.add_argument('--output', help="Write results as JSON to this file")
+    parser.add_argument('--compare', help="Compare a suite run against this baseline JSON file")
+    parser.add_argument('--startup', action='store_true', help="Time a cold start (imports, first frame, audio loading)")
+    parser.add_argument('--profile', action='store_true', help="Also print the frame profiler's per-phase p50/p99 table")
+    args = parser.parse_args(argv)
+
+    if args.startup:
+        print(measure_startup(args.width, args.height, seed=args.seed)['report'])
+        return 0
+
+    if args.suite:
+        report = run_suite(frames=args.frames or SUITE_FRAMES, seed=args.seed,
+                           progress=lambda result: print(format_result(result)))
+    else:
+        population = {key: getattr(args, key) for key in ('num_fish', 'num_schools', 'num_bubbles', 'num_jellyfish')
+                      if getattr(args, key) is not None}
+        result = run_headless(args.width, args.height, args.frames or 500, seed=args.seed,
+                              burst_every=args.burst_every, profile=args.profile, **population)
+        print(format_result(result))
+        if args.profile:
+            print("\n".join(result['profile']))
+        report = {'created': time.strftime('%Y-%m-%dT%H:%M:%S'), 'python': platform.python_version(),
+                  'platform': platform.platform(), 'results': [result]}
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        for row in compare_runs(baseline, report):
+            width, height, fish, schools, bubbles, jelly = row['case']
+            print(f"{width:>3}x{height:<3} fish={fish:<5} | fps x{row['fps_ratio']:.2f} | "
+                  f"draw p99 x{row['draw_p99_ratio']:.2f} | bytes x{row['bytes_ratio']:.2f}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,64 +1,154 @@
 import random
+import numpy as np
 from colorama import Fore
 from ascii_art import BUBBLE_CHARS
+from palette import fg_id
+from frame_buffer import GLYPH_DTYPE, COLOR_DTYPE
+from clock import interpolate
 from config import (
-    BUBBLE_SPEED_RANGE, CLICK_BUBBLE_SPEED_RANGE, CLICK_BUBBLE_LIFETIME_RANGE
+    BUBBLE_SPEED_RANGE, CLICK_BUBBLE_SPEED_RANGE, CLICK_BUBBLE_LIFETIME_RANGE, FRAME_RATE
 )
 
+CLICK_BUBBLE_COLORS = [Fore.CYAN, Fore.LIGHTCYAN_EX, Fore.WHITE, Fore.LIGHTBLUE_EX]
 
-class Bubble:
-    """Represents a single bubble rising from the floor."""
-    def __init__(self, width, height):
-        self.width = width
-        self.height = height
-        self.color = Fore.CYAN
-        self.art = random.choice(BUBBLE_CHARS)
-        self.reset()
-
-    def reset(self):
-        """Resets the bubble to a new position at the bottom."""
-        self.x = random.randint(0, self.width - 1)
-        self.y = random.uniform(self.height - 5, self.height - 2)
-        self.speed = random.uniform(*BUBBLE_SPEED_RANGE)
-
-    def update(self):
-        """Moves the bubble upwards."""
-        self.y -= self.speed
-        if self.y <= 0:
-            self.reset()
-
-    def draw(self, buffer):
-        """Draws the bubble onto the provided buffer."""
-        x, y = int(self.x), int(self.y)
-        if 0 <= y < self.height and 0 <= x < self.width:
-            # Only draw if the space is empty
-            if buffer[y][x][0] == ' ':
-                buffer[y][x] = (self.art, self.color)
-
-
-class ClickBubble:
-    """Represents a temporary bubble created from a key press."""
-    def __init__(self, x, y, width, height):
+
+class BubbleSystem:
+    """
+    A particle system holding every bubble of one kind in NumPy columns.
+
+    Ambient systems hold bubbles that rise from the floor and respawn at the
+    bottom when they reach the top. Other systems hold short-lived bubbles
+    (from bursts) that expire after their lifetime; expired particles are
+    compacted out in place, so the columns are only reallocated when the
+    system outgrows its capacity.
+    """
+    layer = 'bubbles'
+
+    COLUMNS = {
+        'x': np.float64,
+        'y': np.float64,
+        'prev_x': np.float64,
+        'prev_y': np.float64,
+        'speed': np.float64,
+        'age': np.float64,
+        'lifetime': np.float64,
+        'glyph': GLYPH_DTYPE,
+        'color': COLOR_DTYPE,
+    }
+
+    def __init__(self, width, height, ambient=False, capacity=64):
         self.width = width
         self.height = height
-        self.color = random.choice([Fore.CYAN, Fore.LIGHTCYAN_EX, Fore.WHITE, Fore.LIGHTBLUE_EX])
-        self.art = random.choice(BUBBLE_CHARS)
-        self.x = float(x)
-        self.y = float(y)
-        self.speed = random.uniform(*CLICK_BUBBLE_SPEED_RANGE)
-        self.lifetime = random.uniform(*CLICK_BUBBLE_LIFETIME_RANGE)
-        self.age = 0.0
-
-    def update(self):
-        """Moves the bubble upwards and ages it."""
-        self.y -= self.speed
-        self.age += 0.1  # Increment by frame rate
-        return self.age < self.lifetime and self.y > 0  # Return False when should be removed
-
-    def draw(self, buffer):
-        """Draws the click-generated bubble onto the provided buffer."""
-        x, y = int(self.x), int(self.y)
-        if 0 <= y < self.height and 0 <= x < self.width:
-            # Only draw if the space is empty
-            if buffer[y][x][0] == ' ':
-                buffer[y][x] = (self.art, self.color)
\ No newline at end of file
+        self.ambient = ambient
+        self.count = 0
+        self.capacity = 0
+        # At least one slot, so the columns exist even for an empty system
+        self._reserve(max(capacity, 1))
+
+    def __len__(self):
+        return self.count
+
+    def _reserve(self, extra):
+        """Grows the columns (doubling) so that `extra` more particles fit."""
+        needed = self.count + extra
+        if needed <= self.capacity:
+            return
+        capacity = max(needed, self.capacity * 2)
+        for name, dtype in self.COLUMNS.items():
+            column = np.zeros(capacity, dtype=dtype)
+            if self.capacity:
+                column[:self.count] = getattr(self, name)[:self.count]
+            setattr(self, name, column)
+        self.capacity = capacity
+
+    def _append(self, x, y, speed, lifetime, char, color):
+        """Adds one particle at the end of the columns."""
+        self._reserve(1)
+        i = self.count
+        self.x[i] = self.prev_x[i] = x
+        self.y[i] = self.prev_y[i] = y
+        self.speed[i] = speed
+        self.age[i] = 0.0
+        self.lifetime[i] = lifetime
+        self.glyph[i] = ord(char)
+        self.color[i] = color
+        self.count += 1
+
+    def add_ambient(self, count):
+        """Adds bubbles that rise from the floor forever."""
+        self._reserve(count)
+        color = fg_id(Fore.CYAN)
+        for _ in range(count):
+            char = random.choice(BUBBLE_CHARS)
+            x, y, speed = self._random_floor_spawn()
+            self._append(x, y, speed, np.inf, char, color)
+
+    def add_burst_bubble(self, x, y):
+        """Adds a temporary, randomly colored bubble at (x, y)."""
+        color = fg_id(random.choice(CLICK_BUBBLE_COLORS))
+        char = random.choice(BUBBLE_CHARS)
+        speed = random.uniform(*CLICK_BUBBLE_SPEED_RANGE)
+        lifetime = random.uniform(*CLICK_BUBBLE_LIFETIME_RANGE)
+        self._append(float(x), float(y), speed, lifetime, char, color)
+
+    def _random_floor_spawn(self):
+        """Picks a new position and speed near the bottom of the screen."""
+        x = random.randint(0, self.width - 1)
+        y = random.uniform(self.height - 5, self.height - 2)
+        speed = random.uniform(*BUBBLE_SPEED_RANGE)
+        return x, y, speed
+
+    def update(self, dt=FRAME_RATE):
+        """Moves every bubble upwards, then respawns or removes the ones that are done."""
+        n = self.count
+        if not n:
+            return
+        np.copyto(self.prev_x[:n], self.x[:n])
+        np.copyto(self.prev_y[:n], self.y[:n])
+        y = self.y[:n]
+        y -= self.speed[:n] * (dt / FRAME_RATE)
+
+        if self.ambient:
+            for i in np.flatnonzero(y <= 0).tolist():
+                x, new_y, speed = self._random_floor_spawn()
+                self.x[i] = self.prev_x[i] = x
+                self.y[i] = self.prev_y[i] = new_y
+                self.speed[i] = speed
+            return
+
+        age = self.age[:n]
+        age += dt
+        alive = (age < self.lifetime[:n]) & (y > 0)
+        kept = int(np.count_nonzero(alive))
+        if kept < n:
+            for name in self.COLUMNS:
+                column = getattr(self, name)
+                column[:kept] = column[:n][alive]
+            self.count = kept
+
+    def resize(self, width, height):
+        """Moves every bubble to the same relative position in a resized aquarium."""
+        n = self.count
+        for column, old, new in (('x', self.width, width), ('y', self.height, height)):
+            values = getattr(self, column)[:n]
+            values *= new / old
+            np.copyto(getattr(self, 'prev_' + column)[:n], values)
+        self.width, self.height = width, height
+
+    def get_swept_rects(self):
+        """Returns an (n, 4) array of the (x0, y0, x1, y1) cells each bubble may cover between steps."""
+        n = self.count
+        x0 = np.floor(np.minimum(self.prev_x[:n], self.x[:n]))
+        y0 = np.floor(np.minimum(self.prev_y[:n], self.y[:n]))
+        x1 = np.ceil(np.maximum(self.prev_x[:n], self.x[:n])) + 1
+        y1 = np.ceil(np.maximum(self.prev_y[:n], self.y[:n])) + 1
+        return np.stack([x0, y0, x1, y1], axis=1).astype(np.int64)
+
+    def draw(self, buffer, alpha=1.0):
+        """Draws every bubble into the blank cells of the buffer, earlier bubbles first."""
+        n = self.count
+        if not n:
+            return
+        xs = interpolate(self.prev_x[:n], self.x[:n], alpha).astype(np.int64)
+        ys = interpolate(self.prev_y[:n], self.y[:n], alpha).astype(np.int64)
+        buffer.put_points_if_empty(xs, ys, self.glyph[:n], self.color[:n])
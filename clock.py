@@ -0,0 +1,129 @@
+import time
+import statistics
+from collections import deque
+from config import SIM_TIMESTEP, RENDER_INTERVAL, MAX_CATCH_UP_STEPS, JITTER_WINDOW
+
+NANOSECONDS = 1_000_000_000
+
+
+def interpolate(previous, current, alpha):
+    """Blends a value between the last two simulation steps for drawing."""
+    return previous + (current - previous) * alpha
+
+
+class SimulationClock:
+    """
+    Drives the main loop with a fixed simulation timestep and a render rate
+    scheduled against monotonic deadlines.
+
+    Time is kept in integer nanoseconds so the simulation never drifts or
+    double-steps from float rounding. Each frame is stamped with the deadline
+    it was scheduled for rather than the moment the process woke up, so small
+    scheduling noise does not leak into the simulation. When the loop falls
+    behind, missed frame deadlines are skipped instead of being drawn in a
+    burst, and the number of catch-up simulation steps is capped.
+    """
+    def __init__(self, sim_timestep=SIM_TIMESTEP, render_interval=RENDER_INTERVAL,
+                 max_catch_up_steps=MAX_CATCH_UP_STEPS, time_source=time.monotonic_ns,
+                 sleep=time.sleep):
+        self.dt = sim_timestep
+        self.step_ns = int(sim_timestep * NANOSECONDS)
+        self.render_interval = render_interval
+        self.interval_ns = int(render_interval * NANOSECONDS)
+        self.max_catch_up_steps = max_catch_up_steps
+        self.time_source = time_source
+        self.sleep = sleep
+
+        self.frame_time = 0
+        self.next_deadline = 0
+        self.accumulator = 0
+        self.last_wake = None
+
+        # Pacing statistics
+        self.frames = 0
+        self.frames_skipped = 0
+        self.sim_steps_dropped = 0
+        self.frame_periods = deque(maxlen=JITTER_WINDOW)
+
+        self.start()
+
+    def start(self):
+        """(Re)starts the clock. The first frame gets a single simulation step."""
+        now = self.time_source()
+        self.frame_time = now
+        self.next_deadline = now + self.interval_ns
+        self.accumulator = self.step_ns
+        self.last_wake = None
+
+    def set_render_interval(self, render_interval):
+        """Changes the target time between drawn frames, starting from the next deadline."""
+        self.render_interval = render_interval
+        self.interval_ns = int(render_interval * NANOSECONDS)
+        self.next_deadline = self.frame_time + self.interval_ns
+
+    def tick(self):
+        """Returns how many fixed simulation steps are due for the current frame."""
+        steps = self.accumulator // self.step_ns
+        if steps > self.max_catch_up_steps:
+            # Too far behind to catch up; drop the backlog rather than spiral
+            self.sim_steps_dropped += steps - self.max_catch_up_steps
+            steps = self.max_catch_up_steps
+            self.accumulator = steps * self.step_ns
+        self.accumulator -= steps * self.step_ns
+        return steps
+
+    @property
+    def frame_seconds(self):
+        """Timestamp of the current frame in seconds (on the clock's time source)."""
+        return self.frame_time / NANOSECONDS
+
+    @property
+    def alpha(self):
+        """How far (0..1) the current frame sits between the last two simulation steps."""
+        return self.accumulator / self.step_ns
+
+    @property
+    def next_deadline_seconds(self):
+        """When the next frame is due, in seconds (on the clock's time source)."""
+        return self.next_deadline / NANOSECONDS
+
+    def wait_for_next_frame(self):
+        """Sleeps until the next frame deadline, then moves on to it."""
+        now = self.time_source()
+        if now < self.next_deadline:
+            self.sleep((self.next_deadline - now) / NANOSECONDS)
+        self.next_frame()
+
+    def next_frame(self):
+        """
+        Moves on to the next frame deadline once it has arrived (an event loop
+        calls this from its timer instead of sleeping), skipping deadlines
+        that were already missed.
+        """
+        wake = self.time_source()
+        if wake > self.next_deadline:
+            missed = (wake - self.next_deadline) // self.interval_ns
+            if missed:
+                self.frames_skipped += missed
+                self.next_deadline += missed * self.interval_ns
+
+        if self.last_wake is not None:
+            self.frame_periods.append((wake - self.last_wake) / NANOSECONDS)
+        self.last_wake = wake
+
+        self.accumulator += self.next_deadline - self.frame_time
+        self.frame_time = self.next_deadline
+        self.next_deadline += self.interval_ns
+        self.frames += 1
+
+    def jitter_ms(self):
+        """Standard deviation of the measured frame period over the recent window, in ms."""
+        if len(self.frame_periods) < 2:
+            return 0.0
+        return statistics.pstdev(self.frame_periods) * 1000
+
+    def mean_frame_ms(self):
+        """Average measured frame period over the recent window, in ms."""
+        if not self.frame_periods:
+            return 0.0
+        return statistics.fmean(self.frame_periods) * 1000
@@ -0,0 +1,326 @@
+import math
+from collections import deque
+import numpy as np
+from frame_buffer import FrameBuffer, SPACE
+from config import JITTER_WINDOW, DIRTY_REDRAW_FRACTION
+
+# Placeholder glyph marking cells a static layer never drew to
+UNSET = 0
+
+# Up to this many dirty boxes are painted one slice at a time; more go
+# through a vectorized difference array
+PAINT_LOOP_LIMIT = 64
+
+
+class StaticLayer:
+    """
+    A pre-rendered layer for scenery that rarely changes (decorations, the
+    floor, the help overlay). It is drawn once into its own FrameBuffer and
+    reused every frame until its key (size, background, ...) changes or it
+    is explicitly invalidated. `mask` marks the cells the layer covers,
+    including the blank cells inside solid art.
+    """
+    def __init__(self):
+        self.frame = FrameBuffer(0, 0)
+        self.mask = np.zeros((0, 0), dtype=bool)
+        self.key = None
+        self.rebuilds = 0
+
+    def invalidate(self):
+        """Forces the layer to be redrawn the next time it is used."""
+        self.key = None
+
+    def render(self, key, width, height, background, draw):
+        """
+        Returns the layer for the given key, calling draw(frame) to rebuild it
+        first if the key changed since the last call.
+        """
+        if key == self.key:
+            return self.frame
+        frame = self.frame
+        frame.resize(width, height)
+        frame.clear(background)
+        frame.glyphs.fill(UNSET)
+        draw(frame)
+        self.mask = frame.glyphs != UNSET
+        frame.glyphs[~self.mask] = SPACE
+        self.key = key
+        self.rebuilds += 1
+        return frame
+
+
+
+def swept_rect(previous, current):
+    """
+    Returns the (x0, y0, x1, y1) cell box covering an entity drawn anywhere
+    between two (x, y, width, height) bounding boxes, as interpolation does.
+    """
+    px, py, pw, ph = previous
+    x, y, width, height = current
+    return (math.floor(min(px, x)), math.floor(min(py, y)),
+            max(math.ceil(px) + pw, math.ceil(x) + width), max(math.ceil(py) + ph, math.ceil(y) + height))
+
+
+def paint_rects(rects, width, height):
+    """Returns a boolean cell mask covering every (x0, y0, x1, y1) row of an array of in-frame boxes."""
+    x0, y0, x1, y1 = rects.T
+    mask = np.zeros((height, width), dtype=bool)
+    if len(rects) <= PAINT_LOOP_LIMIT:
+        for left, top, right, bottom in zip(x0.tolist(), y0.tolist(), x1.tolist(), y1.tolist()):
+            mask[top:bottom, left:right] = True
+        return mask
+    # 2D difference array: +1 at each box's top-left corner, cancelled at the
+    # other corners, so a running sum over both axes counts covering boxes
+    stride = width + 1
+    corners = np.concatenate([y0 * stride + x0, y0 * stride + x1, y1 * stride + x0, y1 * stride + x1])
+    weights = np.repeat([1, -1, -1, 1], len(rects))
+    counts = np.bincount(corners, weights, minlength=(height + 1) * stride).reshape(height + 1, stride)
+    np.greater(counts.cumsum(axis=0).cumsum(axis=1)[:height, :width], 0, out=mask)
+    return mask
+
+
+class Layer:
+    """
+    A named slice of the scene at a fixed z-order; higher z is drawn on top.
+    Drawables are drawn in the order they were added. With only_empty=True
+    the layer only fills cells that are still blank when it is drawn, so it
+    shows up behind whatever the lower layers put there. Static layers are
+    rendered once into a StaticLayer cache and pasted from it.
+    """
+    def __init__(self, name, z, only_empty=False, static=False, draw=None):
+        self.name = name
+        self.z = z
+        self.only_empty = only_empty
+        self.static = static
+        self.draw_callback = draw
+        self.drawables = []
+        self.dirty_rects = []
+        self.cache = StaticLayer() if static else None
+
+    def mark_dirty(self, rects=None):
+        """Records an array of (x0, y0, x1, y1) boxes to recomposite; None means the whole frame."""
+        self.dirty_rects.append(rects)
+
+    def draw(self, buffer, alpha=1.0):
+        """Draws everything on this layer into the buffer."""
+        if self.draw_callback:
+            self.draw_callback(buffer)
+        for drawable in self.drawables:
+            drawable.draw(buffer, alpha)
+
+
+class Compositor:
+    """
+    Builds frames from named layers stacked by z-order.
+
+    The composed frame is kept between calls and only the dirty parts of it
+    are rebuilt. Entities report where they are through get_bounds() and
+    get_previous_bounds() (their boxes after and before the last update), or
+    get_swept_rects() for whole groups such as particle systems. Whenever an
+    entity changes, both the area it covered last frame and the area it
+    covers now are marked dirty. Those cells are recomposited by redrawing,
+    in z-order, only the drawables that touch them.
+
+    Entities choose their layer with a `layer` class attribute, so a new
+    creature type only has to name its layer instead of being slotted into
+    the draw order by hand.
+    """
+    def __init__(self):
+        self.layers = {}
+        self.stack = []
+        self.key = None
+        self.scratch = FrameBuffer(0, 0)
+        self.drawn_rects = {}  # id(drawable) -> boxes it covered in the last composed frame
+        self.last_step = None
+        self.last_alpha = None
+
+        # Dirty-area statistics
+        self.frames_composed = 0
+        self.last_dirty_fraction = 0.0
+        self.dirty_fractions = deque(maxlen=JITTER_WINDOW)
+
+    def add_layer(self, name, z, only_empty=False, static=False, draw=None):
+        """Creates a layer and slots it into the stack by z-order."""
+        layer = Layer(name, z, only_empty=only_empty, static=static, draw=draw)
+        self.layers[name] = layer
+        self.stack = sorted(self.layers.values(), key=lambda layer: layer.z)
+        return layer
+
+    def add(self, drawable, layer=None):
+        """Puts a drawable on its declared layer (or the one given); it is drawn in on the next frame."""
+        target = self.layers[layer or drawable.layer]
+        target.drawables.append(drawable)
+        if target.static:
+            self.invalidate(target.name)
+        else:
+            rects = self._covered_rects(drawable)
+            self.drawn_rects[id(drawable)] = rects
+            target.mark_dirty(rects)
+
+    def remove(self, drawable, layer=None):
+        """Takes a drawable off its layer, marking the area it covered as dirty."""
+        target = self.layers[layer or drawable.layer]
+        target.drawables.remove(drawable)
+        if target.static:
+            self.invalidate(target.name)
+        else:
+            target.mark_dirty(self.drawn_rects.pop(id(drawable), None))
+
+    def clear(self):
+        """Removes every drawable from every layer."""
+        for layer in self.stack:
+            layer.drawables.clear()
+        self.drawn_rects.clear()
+        self.invalidate()
+
+    def invalidate(self, name=None):
+        """Marks one layer (or all of them) for a full redraw, including any static cache."""
+        for layer in [self.layers[name]] if name else self.stack:
+            if layer.cache:
+                layer.cache.invalidate()
+            layer.mark_dirty()
+
+    def compose(self, buffer, background, alpha=1.0, step=None):
+        """
+        Brings the buffer up to date on the given background color ID.
+        step identifies the simulation step being drawn (anything that
+        changes once per update); between steps only moving entities are
+        redrawn. Returns the (x, y, width, height) boxes that were
+        recomposited, as a list that is empty if nothing was.
+        """
+        key = (buffer.width, buffer.height, background)
+        if key != self.key:
+            self.key = key
+            self.invalidate()
+        stepped = step != self.last_step
+        blended = alpha != self.last_alpha
+        self.last_step, self.last_alpha = step, alpha
+
+        for layer in self.stack:
+            if layer.static:
+                layer.cache.render(key, buffer.width, buffer.height, background, layer.draw)
+            else:
+                for drawable in layer.drawables:
+                    self._track(layer, drawable, stepped, blended)
+
+        rects = self._take_dirty_rects(buffer.width, buffer.height)
+        self.frames_composed += 1
+        if not len(rects):
+            self.last_dirty_fraction = 0.0
+            self.dirty_fractions.append(0.0)
+            return []
+
+        x, y = int(rects[:, 0].min()), int(rects[:, 1].min())
+        width, height = int(rects[:, 2].max()) - x, int(rects[:, 3].max()) - y
+        frame_area = buffer.width * buffer.height
+        mask = paint_rects(rects, buffer.width, buffer.height)
+        dirty_area = int(np.count_nonzero(mask))
+        # Once most of the frame is dirty, masking costs more than it saves,
+        # so the whole box around the dirty cells is redrawn in place instead
+        self._redraw(buffer, background, alpha, None if dirty_area > DIRTY_REDRAW_FRACTION * frame_area else mask,
+                     (x, y, width, height))
+
+        self.last_dirty_fraction = dirty_area / frame_area
+        self.dirty_fractions.append(self.last_dirty_fraction)
+        return [(x0, y0, x1 - x0, y1 - y0) for x0, y0, x1, y1 in rects.tolist()]
+
+    def mean_dirty_fraction(self):
+        """Average fraction of the frame recomposited over the recent window."""
+        if not self.dirty_fractions:
+            return 0.0
+        return sum(self.dirty_fractions) / len(self.dirty_fractions)
+
+    def _covered_rects(self, drawable):
+        """
+        Returns the (x0, y0, x1, y1) boxes a drawable may cover this frame:
+        an (n, 4) array for groups, a one-box tuple for single entities, or
+        None if unknown.
+        """
+        if hasattr(drawable, 'get_swept_rects'):
+            return drawable.get_swept_rects()
+        if not hasattr(drawable, 'get_bounds'):
+            return None
+        current = drawable.get_bounds()
+        previous = drawable.get_previous_bounds() if hasattr(drawable, 'get_previous_bounds') else current
+        return (swept_rect(previous, current),)
+
+    def _track(self, layer, drawable, stepped, blended):
+        """Marks a drawable's old and new areas dirty if it may look different than last frame."""
+        rects = self._covered_rects(drawable)
+        key = id(drawable)
+        known = key in self.drawn_rects
+        old = self.drawn_rects.get(key)
+        # Between steps only interpolated motion (or something added to a
+        # group, which changes its boxes) can change anything
+        if (known and not stepped and old is not None and rects is not None
+                and self._same_rects(old, rects) and not (blended and self._is_moving(drawable))):
+            return
+        self.drawn_rects[key] = rects
+        if known:
+            layer.mark_dirty(old)
+        layer.mark_dirty(rects)
+
+    def _same_rects(self, old, new):
+        """Checks whether two sets of boxes from _covered_rects() are identical."""
+        if isinstance(old, tuple) and isinstance(new, tuple):
+            return old == new
+        return np.array_equal(old, new)
+
+    def _is_moving(self, drawable):
+        """Checks whether a drawable sits at different positions before and after its last update."""
+        if hasattr(drawable, 'get_swept_rects'):
+            return True
+        if not hasattr(drawable, 'get_previous_bounds'):
+            return False
+        return drawable.get_previous_bounds()[:2] != drawable.get_bounds()[:2]
+
+    def _take_dirty_rects(self, width, height):
+        """
+        Collects (and clears) every layer's dirty boxes as an (n, 4) array,
+        clipped to the frame, with empty boxes dropped.
+        """
+        pending = []
+        for layer in self.stack:
+            pending.extend(layer.dirty_rects)
+            layer.dirty_rects.clear()
+        if any(rects is None for rects in pending):
+            return np.array([[0, 0, width, height]], dtype=np.int64)
+        # Single entities report tuples of boxes and groups whole arrays
+        boxes = [box for rects in pending if isinstance(rects, tuple) for box in rects]
+        groups = [rects for rects in pending if not isinstance(rects, tuple)]
+        rects = np.concatenate([np.array(boxes, dtype=np.int64).reshape(-1, 4), *groups])
+        np.clip(rects, 0, [width, height, width, height], out=rects)
+        return rects[(rects[:, 0] < rects[:, 2]) & (rects[:, 1] < rects[:, 3])]
+
+    def _redraw(self, buffer, background, alpha, mask, box):
+        """
+        Rebuilds the dirty cells inside box. Without a mask the whole box is
+        redrawn in place. With one, every layer that touches the masked cells
+        is composited into a scratch frame (clipped to the box) and just those
+        cells are copied into the buffer; cells outside the mask may be left
+        half drawn in the scratch frame, but they are never copied.
+        """
+        target = buffer if mask is None else self.scratch
+        target.resize(buffer.width, buffer.height)
+        target.set_clip(*box)
+        target.fill_rect(*box, bg=background)
+        for layer in self.stack:
+            if layer.static:
+                target.copy_from(layer.cache.frame, layer.cache.mask)
+                continue
+            target.only_empty = layer.only_empty
+            if layer.draw_callback:
+                layer.draw_callback(target)
+            for drawable in layer.drawables:
+                rects = self.drawn_rects.get(id(drawable))
+                if mask is None or rects is None or len(rects) != 1 or self._touches(mask, rects[0]):
+                    drawable.draw(target, alpha)
+        target.only_empty = False
+        target.reset_clip()
+        if mask is not None:
+            buffer.copy_from(target, mask)
+
+    def _touches(self, mask, rect):
+        """Checks whether an (x0, y0, x1, y1) box overlaps any masked cell."""
+        x0, y0, x1, y1 = rect
+        return bool(mask[max(0, y0):max(0, y1), max(0, x0):max(0, x1)].any())
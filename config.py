@@ -16,11 +16,69 @@ MAX_DECORATIONS = 3  # Maximum decorations at once
 PUFFER_SPAWN_CHANCE = 0.3 # 30% chance for a puffer fish to spawn
 
 # --- Animation Parameters ---
-FRAME_RATE = 0.1  # Seconds per frame
+FRAME_RATE = 0.1  # Seconds per frame (speeds in this file are cells per FRAME_RATE)
+SIM_TIMESTEP = FRAME_RATE  # Fixed simulation step passed as dt to every update()
+RENDER_INTERVAL = 1 / 30  # Target seconds between drawn frames (positions are interpolated between sim steps)
+MAX_CATCH_UP_STEPS = 5  # Max simulation steps run in one frame when the loop falls behind
+JITTER_WINDOW = 100  # Number of recent frames used for frame-time jitter statistics
+DIRTY_REDRAW_FRACTION = 0.5  # When more of the frame than this is dirty, the box around it is redrawn whole
 
 # --- Display Parameters ---
 BACKGROUND_COLOR = Back.BLACK
 DEFAULT_TERMINAL_SIZE = (120, 30)
+DIFF_RENDERING = True  # Only send changed cells to the terminal (False = full repaint every frame)
+OUTPUT_BUFFER_SIZE = 64 * 1024  # Initial size in bytes of the reusable buffer frames are encoded into
+THREADED_OUTPUT = True  # Write frames to the terminal from a background thread (never when headless)
+WRITER_QUEUE_DEPTH = 2  # Frames that may wait for the writer thread before the oldest is dropped
+CAPABILITY_PROBE_TIMEOUT = 0.2  # Seconds to wait for the terminal to answer the capability probe
+CAPABILITY_CACHE_PATH = None  # Where probe answers are cached (None = ~/.cache/ascii-aquarium/terminal_caps.json)
+STARTUP_REPORT = False  # Print how long startup took (imports, audio loading, first frame) on exit
+RESIZE_DEBOUNCE = 0.15  # Seconds the terminal size must stay put after SIGWINCH before the scene is reflowed
+
+# --- Input Parameters ---
+ESC_TIMEOUT = 0.05  # Seconds a lone ESC waits for the rest of an escape sequence before counting as a key press
+INPUT_BUFFER_SIZE = 4096  # Bytes of terminal input that can be drained in one frame
+MOUSE_REPORTING = True  # Ask the terminal for mouse clicks and drags (clicking makes a bubble burst)
+MOUSE_TRAIL_INTERVAL = 0.15  # Minimum seconds between the bubble bursts left behind while dragging
+MOUSE_BURSTS_PER_TICK = 2  # Most bubble bursts the mouse can trigger in one frame
+ASYNC_RUNTIME = True  # Drive the main loop from an asyncio event loop (Unix); False = the polling loop
+CONTROL_SOCKET_PATH = None  # Unix socket path whose lines are typed into the aquarium as keys (None = off)
+
+# --- Adaptive Quality Parameters ---
+ADAPTIVE_QUALITY = True  # Lower render quality step by step when the terminal link can't keep up
+BANDWIDTH_BUDGET = None  # Pin the link to this many bytes/sec (None = measure write throughput)
+QUALITY_WINDOW = 1.0  # Seconds of output measured before each quality decision
+QUALITY_STEP_DOWN_LOAD = 0.8  # Step down when demand exceeds this fraction of the link's capacity
+QUALITY_STEP_UP_LOAD = 0.4  # Step back up when demand stays below this fraction...
+QUALITY_STEP_UP_WINDOWS = 3  # ...for this many windows in a row
+QUALITY_FPS_DIVISOR = 2  # Render rate is divided by this from the 'low_fps' level on
+QUALITY_ROW_FRACTION = 0.5  # Fraction of the screen's rows sent per frame at the 'partial_rows' level
+
+# --- Simulation Performance Parameters ---
+VECTORIZED_FISH = True  # Update plain fish as one NumPy population (False = one update() call per fish)
+SPATIAL_CELL_SIZE = 16  # Grid cell size (in cells) of the spatial index used for proximity queries
+
+# --- Profiler Parameters ---
+PROFILER_HUD = False  # Show the frame profiler overlay from the start ('p' toggles it); timing is off while hidden
+HISTOGRAM_SIGNIFICANT_DIGITS = 2  # Precision the profiler's histograms keep every value to
+HISTOGRAM_MAX_VALUE = 1 << 24  # Largest value (microseconds or bytes) a histogram tells apart; larger ones are clamped
+
+# --- Layer Parameters ---
+# (name, z-order, only fill empty cells, static); higher z is drawn on top.
+# Only-empty layers show up behind whatever lower layers already drew.
+SCENE_LAYERS = [
+    ('seaweed', 10, False, False),
+    ('scenery', 20, False, True),  # Decorations
+    ('bubbles', 30, True, False),
+    ('food', 40, False, False),
+    ('jellyfish', 50, True, False),
+    ('schools', 60, False, False),
+    ('fish', 70, False, False),
+    ('crab', 80, False, False),
+    ('floor', 90, False, True),
+    ('help', 100, False, True),
+    ('hud', 110, False, False),  # Profiler overlay
+]
 
 # --- Fish Behavior Parameters ---
 STARTLE_RADIUS = 30.0
@@ -76,5 +134,9 @@ JELLYFISH_ANIMATION_SPEED_RANGE = (0.3, 0.8)
 DEFAULT_SOUND_PATH = "underwater-ambience-6201.wav"
 BUBBLE_SOUND_PATH = "bubbles-69893.mp3" # Assumed filename for your new sound
 BUBBLE_SOUND_CLIP_DURATION = 1.5 # Play a 3-second clip
+BUBBLE_CLIP_POOL_SIZE = 8  # Random bubble clips prepared at load time; bursts pick one of them
+BUBBLE_SOUND_RATE = 3.0  # Bubble sounds allowed per second once the burst allowance is used up...
+BUBBLE_SOUND_BURST = 4   # ...and how many may play back to back
+VOICE_CHANNELS = {'ambient': 1, 'bubbles': 3, 'puffer': 2, 'chest': 1}  # Mixer channels reserved for each kind of sound
 PUFFER_INFLATE_SOUND_PATH = "balloon-inflate-4-184055.mp3" # Assumed filename
 CHEST_OPEN_SOUND_PATH = "material-chest-open-394472.mp3"
@@ -1,23 +1,27 @@
 import random
 from colorama import Fore
 from ascii_art import CRAB
+from palette import fg_id
+from sprites import get_sprite
 from config import (
     CRAB_IDLE_DURATION_RANGE, CRAB_WALK_DURATION_RANGE,
-    CRAB_WALK_SPEED_RANGE, CRAB_ANIMATION_SPEED
+    CRAB_WALK_SPEED_RANGE, CRAB_ANIMATION_SPEED, FRAME_RATE
 )
 
 
 class Crab:
     """Represents a crab that walks along the seafloor."""
+    layer = 'crab'
+
     def __init__(self, width, height):
         self.width = width
         self.height = height
         
         # Crab art and animation
-        self.animation_frames = CRAB
+        self.animation_frames = [get_sprite(frame_art) for frame_art in CRAB]
         self.current_frame = 0
-        self.art_height = len(self.animation_frames[0])
-        self.art_width = max(len(line) for line in self.animation_frames[0])
+        self.art_height = self.animation_frames[0].height
+        self.art_width = self.animation_frames[0].width
         
         # Position on seafloor
         self.x = float(random.randint(0, width - self.art_width))
@@ -36,12 +40,12 @@ class Crab:
         self.walk_duration = random.uniform(*CRAB_WALK_DURATION_RANGE)
         self.walk_speed = random.uniform(*CRAB_WALK_SPEED_RANGE)
 
-    def update(self):
+    def update(self, dt=FRAME_RATE):
         """Updates crab state and position."""
         if self.state == 'idle':
             # Reset to first frame when idle
             self.current_frame = 0
-            self.idle_timer += 0.1  # Increment by frame rate
+            self.idle_timer += dt
             
             if self.idle_timer >= self.idle_duration:
                 # Start walking
@@ -54,14 +58,14 @@ class Crab:
                 
         elif self.state == 'walking':
             # Animate walking (rapidly switch between frames)
-            self.animation_timer += 0.1
+            self.animation_timer += dt
             if self.animation_timer >= CRAB_ANIMATION_SPEED:
                 self.current_frame = 1 - self.current_frame  # Toggle between 0 and 1
                 self.animation_timer = 0
             
             # Move crab
-            self.x += self.speed
-            self.walk_timer += 0.1
+            self.x += self.speed * (dt / FRAME_RATE)
+            self.walk_timer += dt
             
             # Check if walk duration is over or hit boundary
             if (self.walk_timer >= self.walk_duration or 
@@ -78,18 +82,20 @@ class Crab:
                 # Keep crab in bounds
                 self.x = max(0, min(self.x, self.width - self.art_width))
 
+    def resize(self, width, height):
+        """Keeps the crab on the seafloor of a resized aquarium, at the same relative x."""
+        self.x = max(0.0, min(self.x * width / self.width, float(width - self.art_width)))
+        self.y = height - 1 - self.art_height
+        self.width, self.height = width, height
+
+    def get_bounds(self):
+        """Returns the crab's bounding box as (x, y, width, height)."""
+        return self.x, self.y, self.art_width, self.art_height
+
     def get_current_art(self):
-        """Returns the current frame's art."""
+        """Returns the current frame's compiled sprite."""
         return self.animation_frames[self.current_frame]
     
-    def draw(self, buffer):
+    def draw(self, buffer, alpha=1.0):
         """Draws the crab onto the provided buffer."""
-        x, y = int(self.x), int(self.y)
-        art_grid = self.get_current_art()
-        for line_idx, line_art in enumerate(art_grid):
-            current_y = y + line_idx
-            if 0 <= current_y < self.height:
-                for char_idx, char_art in enumerate(line_art):
-                    current_x = x + char_idx
-                    if char_art != ' ' and 0 <= current_x < self.width:
-                        buffer[current_y][current_x] = (char_art, Fore.RED)
\ No newline at end of file
+        buffer.blit(self.get_current_art(), int(self.x), int(self.y), fg_id(Fore.RED))
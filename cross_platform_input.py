@@ -1,5 +1,9 @@
 import sys
 import os
+import time
+from input_decoder import ByteRing, KeyDecoder
+from terminal_caps import MOUSE_ENABLE, MOUSE_DISABLE
+from config import MOUSE_REPORTING
 
 class CrossPlatformInput:
     """
@@ -38,6 +42,12 @@ class CrossPlatformInput:
                 # Store original terminal settings to restore later
                 self.fd = sys.stdin.fileno()
                 self.original_settings = None
+
+                # Input is drained into the ring each frame and decoded incrementally
+                self.ring = ByteRing()
+                self.decoder = KeyDecoder()
+                self.at_eof = False
+                self.mouse_enabled = False
                 
                 # Set up signal handler for cleanup
                 signal.signal(signal.SIGINT, self._cleanup_handler)
@@ -59,6 +69,9 @@ class CrossPlatformInput:
             try:
                 self.original_settings = self.termios.tcgetattr(self.fd)
                 self.tty.setraw(self.fd)
+                if MOUSE_REPORTING:
+                    os.write(sys.stdout.fileno(), MOUSE_ENABLE)
+                    self.mouse_enabled = True
             except Exception as e:
                 print(f"Warning: Could not set raw mode: {e}")
                 self.input_method = 'fallback'
@@ -67,21 +80,37 @@ class CrossPlatformInput:
         """Restore terminal settings."""
         if self.input_method == 'unix' and self.original_settings:
             try:
+                if self.mouse_enabled:
+                    os.write(sys.stdout.fileno(), MOUSE_DISABLE)
+                    self.mouse_enabled = False
                 self.termios.tcsetattr(self.fd, self.termios.TCSADRAIN, self.original_settings)
             except Exception:
                 pass  # Best effort cleanup
     
-    def get_char(self):
+    def get_keys(self, now=None):
         """
-        Get a single character from input without blocking.
-        Returns None if no input is available, or the character/special key name.
+        Returns every key pressed since the last call, oldest first (an empty
+        list if there were none), without ever blocking. now is the caller's
+        clock in seconds; it decides when a lone ESC is reported.
         """
         if self.input_method == 'windows':
-            return self._get_char_windows()
+            keys = []
+            while self.msvcrt.kbhit():
+                key = self._get_char_windows()
+                if key:
+                    keys.append(key)
+            return keys
         elif self.input_method == 'unix':
-            return self._get_char_unix()
+            return self._get_keys_unix(time.monotonic() if now is None else now)
         else:
-            return self._get_char_fallback()
+            char = self._get_char_fallback()
+            return [char] if char else []
+    
+    def get_mouse_events(self):
+        """Returns the mouse events decoded by the last get_keys() call (always empty on Windows)."""
+        if self.input_method == 'unix':
+            return self.decoder.poll_mouse()
+        return []
     
     def _get_char_windows(self):
         """Windows-specific non-blocking character input."""
@@ -113,41 +142,36 @@ class CrossPlatformInput:
                 return None
         return None
     
-    def _get_char_unix(self):
-        """Unix-specific non-blocking character input."""
+    def pump(self, now=None):
+        """
+        Unix only: reads and decodes whatever input is ready, keeping the keys
+        for the next get_keys(). An event loop calls this whenever stdin
+        becomes readable, so the terminal never waits on us.
+        """
+        if self.input_method != 'unix' or self.at_eof:
+            return
+        now = time.monotonic() if now is None else now
         try:
-            # Check if there's input available
-            if self.select.select([sys.stdin], [], [], 0) == ([sys.stdin], [], []):
-                char = sys.stdin.read(1)
-                
-                # Handle special characters
-                if not char:  # EOF
-                    return 'EOF'
-                elif ord(char) == 27:  # ESC
-                    # Check for escape sequences (arrow keys, etc.)
-                    if self.select.select([sys.stdin], [], [], 0.1) == ([sys.stdin], [], []):
-                        seq = sys.stdin.read(2)
-                        if seq == '[A':
-                            return 'UP'
-                        elif seq == '[B':
-                            return 'DOWN'
-                        elif seq == '[C':
-                            return 'RIGHT'
-                        elif seq == '[D':
-                            return 'LEFT'
-                        # Add more escape sequences as needed
-                    return 'ESC'
-                elif ord(char) == 3:   # Ctrl+C
-                    return 'CTRL_C'
-                elif ord(char) == 10 or ord(char) == 13:  # Enter (Unix uses \n)
-                    return 'ENTER'
-                elif ord(char) == 127: # Backspace/Delete
-                    return 'BACKSPACE'
-                
-                return char
-        except Exception:
-            return None
+            if not self.ring.read_from(self.fd):
+                self.at_eof = True
+        except OSError:
+            return
+        for chunk in self.ring.chunks():
+            self.decoder.feed(chunk, now)
+
+    def input_deadline(self):
+        """When (in seconds) a pending lone ESC will count as a key press, or None."""
+        if self.input_method == 'unix':
+            return self.decoder.esc_deadline()
         return None
+
+    def _get_keys_unix(self, now):
+        """Unix-specific input: drains every byte available and decodes it."""
+        self.pump(now)
+        keys = self.decoder.poll(now)
+        if self.at_eof:
+            keys.append('EOF')
+        return keys
     
     def _get_char_fallback(self):
         """
@@ -1,12 +1,16 @@
 import random
 import math
 from colorama import Fore
-from ascii_art import DECORATIONS, DECORATION_CATEGORIES, COLOR_ADJUSTMENTS
+from ascii_art import DECORATIONS, DECORATION_CATEGORIES
+from palette import fg_id, LIGHT_MODE
+from sprites import get_sprite
 from config import DECORATION_SPAWN_CHANCE, MAX_DECORATIONS
 
 
 class Decoration:
     """Represents a decoration on the seafloor."""
+    layer = 'scenery'
+
     def __init__(self, decoration_type, decoration_data, x_pos, width, height, background_color, aquarium_manager):
         self.type = decoration_type
         self.category, self.art = decoration_data
@@ -19,9 +23,11 @@ class Decoration:
         # Ensure art is a tuple for consistent processing
         if isinstance(self.art, str):
             self.art = (self.art,)
-            
-        self.art_height = len(self.art)
-        self.art_width = max(len(line) for line in self.art)
+
+        # Spaces inside the art are opaque so the decoration looks solid
+        self.sprite = get_sprite(self.art, solid=True)
+        self.art_height = self.sprite.height
+        self.art_width = self.sprite.width
         
         # Position on seafloor (above the floor line)
         self.y = height - 1 - self.art_height
@@ -33,40 +39,29 @@ class Decoration:
         self.colors = DECORATION_CATEGORIES.get(self.category, [Fore.WHITE])
         self.base_color = random.choice(self.colors)
     
-    def draw(self, buffer):
+    def draw(self, buffer, alpha=1.0):
         """Draws the decoration onto the provided scene buffer."""
-        x, y = self.x, self.y
-        color = self.get_current_color()
-        for line_idx, line_art in enumerate(self.art):
-            current_y = y + line_idx
-            if 0 <= current_y < self.aquarium_height:
-                trimmed_line = line_art.strip()
-                if not trimmed_line:
-                    continue
-                
-                art_start_index = line_art.find(trimmed_line)
-                art_end_index = art_start_index + len(trimmed_line)
+        buffer.blit(self.sprite, self.x, self.y, self.get_current_color())
+
+    def resize(self, width, height):
+        """Keeps the decoration on the seafloor of a resized aquarium."""
+        self.width, self.aquarium_height = width, height
+        self.y = height - 1 - self.art_height
 
-                for char_idx, char_art in enumerate(line_art):
-                    if art_start_index <= char_idx < art_end_index:
-                        current_x = x + char_idx
-                        if 0 <= current_x < self.width:
-                            if char_art != ' ':
-                                buffer[current_y][current_x] = (char_art, color)
-                            else:
-                                buffer[current_y][current_x] = (' ', Fore.RESET)
+    def get_bounds(self):
+        """Returns the decoration's bounding box as (x, y, width, height)."""
+        return self.x, self.y, self.art_width, self.art_height
 
     def get_adjusted_color(self, color):
-        """Adjusts color based on current background mode."""
+        """Adjusts a palette color ID based on current background mode."""
         from colorama import Back
         if self.background_color == Back.LIGHTCYAN_EX:  # Light mode
-            return COLOR_ADJUSTMENTS.get('light_mode', {}).get(color, color)
+            return LIGHT_MODE[color]
         return color
 
     def get_current_color(self):
-        """Gets a random color from the decoration's color set, adjusted for background mode."""
-        base_color = random.choice(self.colors)
-        return self.get_adjusted_color(self.base_color)
+        """Gets the decoration's color, adjusted for background mode."""
+        return self.get_adjusted_color(fg_id(self.base_color))
 
     def open_chest(self):
         """Opens a treasure chest (changes state and art)."""
@@ -77,10 +72,12 @@ class Decoration:
             self.category, self.art = DECORATIONS['treasure']['open'][0]
             if isinstance(self.art, str):
                 self.art = (self.art,)
-            self.art_height = len(self.art)
-            self.art_width = max(len(line) for line in self.art)
+            self.sprite = get_sprite(self.art, solid=True)
+            self.art_height = self.sprite.height
+            self.art_width = self.sprite.width
             # Reposition if needed
             self.y = self.aquarium_height - 1 - self.art_height
+            self.aquarium_manager.invalidate_scenery()
 
     def is_near_point(self, x, y, radius=10):
         """Checks if a point is within radius of this decoration."""
@@ -124,9 +121,7 @@ def generate_decorations(width, height, background_color, aquarium_manager):
         
         # Get art dimensions
         _, art = decoration_data
-        if isinstance(art, str):
-            art = (art,)
-        art_width = max(len(line) for line in art)
+        art_width = get_sprite(art, solid=True).width
         
         # Try to find a position
         x_pos = random.randint(0, width - art_width - 1)
@@ -0,0 +1,159 @@
+import asyncio
+import os
+import signal
+from config import CONTROL_SOCKET_PATH, RESIZE_DEBOUNCE
+
+
+class EventRuntime:
+    """
+    Runs an Aquarium from an asyncio event loop instead of a polling loop.
+
+    The event sources are stdin becoming readable, SIGWINCH, the frame
+    timer, the audio loader finishing and, if CONTROL_SOCKET_PATH is set,
+    lines arriving on a control socket. While the scene is animating, the
+    frame timer fires at the clock's deadlines. While it is paused nothing
+    changes on screen, so once the paused frame is drawn no timer is armed
+    and the process sleeps until the next event wakes it.
+
+    Input is read and decoded as soon as it arrives but handled by the next
+    frame, so keys typed between frames are still handled as one batch.
+    """
+    def __init__(self, aquarium):
+        self.aquarium = aquarium
+        self.loop = None
+        self.finished = None
+        self.frame_timer = None
+        self.resize_timer = None
+
+        # Event statistics
+        self.frames = 0
+        self.wakeups = 0  # Frames that had to be scheduled after going idle
+        self.input_events = 0
+
+    def run(self):
+        """Runs the aquarium until ESC/q (or end of input)."""
+        asyncio.run(self._main())
+
+    async def _main(self):
+        """Registers every event source, then waits for the aquarium to stop."""
+        self.loop = asyncio.get_running_loop()
+        self.finished = self.loop.create_future()
+        self.loop.set_exception_handler(self.on_loop_error)
+        aquarium = self.aquarium
+        fd = aquarium.input_handler.fd
+
+        self.loop.add_reader(fd, self.on_input)
+        self.loop.add_signal_handler(signal.SIGWINCH, self.on_resize)
+        aquarium.audio.add_ready_callback(lambda: self.loop.call_soon_threadsafe(self.on_audio_ready))
+        server = None
+        if CONTROL_SOCKET_PATH:
+            server = await asyncio.start_unix_server(self.on_control_client, CONTROL_SOCKET_PATH)
+
+        aquarium.clock.start()
+        self.frame_timer = self.loop.call_soon(self.on_frame, False)
+        try:
+            await self.finished
+        finally:
+            if self.frame_timer:
+                self.frame_timer.cancel()
+            if self.resize_timer:
+                self.resize_timer.cancel()
+            self.loop.remove_reader(fd)
+            self.loop.remove_signal_handler(signal.SIGWINCH)
+            if server:
+                server.close()
+                await server.wait_closed()
+                try:
+                    os.unlink(CONTROL_SOCKET_PATH)
+                except OSError:
+                    pass
+
+    def request_frame(self, when=None):
+        """Makes sure a frame is coming (at loop time `when`, or now), waking up if idle."""
+        if self.frame_timer is not None or self.finished.done():
+            return
+        self.wakeups += 1
+        if when is None:
+            self.frame_timer = self.loop.call_soon(self.on_frame, True)
+        else:
+            self.frame_timer = self.loop.call_at(when, self.on_frame, True)
+
+    def on_frame(self, resumed):
+        """
+        Frame timer: handles input, simulates and draws one frame, then arms
+        the timer for the next deadline unless the scene is paused.
+        """
+        self.frame_timer = None
+        aquarium = self.aquarium
+        clock = aquarium.clock
+        if resumed:
+            # Start afresh rather than simulating all the time spent asleep
+            clock.start()
+        elif self.frames:
+            clock.next_frame()
+        self.frames += 1
+
+        aquarium.process_input()
+        if not aquarium.running:
+            self.finished.set_result(None)
+            return
+        aquarium.advance_frame()
+
+        if not aquarium.paused:
+            self.frame_timer = self.loop.call_at(clock.next_deadline_seconds, self.on_frame, False)
+        else:
+            # Idle: only a lone ESC waiting to time out needs a wake-up
+            deadline = aquarium.input_handler.input_deadline()
+            if deadline is not None:
+                self.request_frame(deadline)
+
+    def on_input(self):
+        """Stdin is readable: decode what arrived and make sure a frame will handle it."""
+        self.input_events += 1
+        handler = self.aquarium.input_handler
+        handler.pump(self.loop.time())
+        if handler.at_eof:
+            # Readable forever from now on; the next frame sees EOF and stops
+            self.loop.remove_reader(handler.fd)
+        self.request_frame()
+
+    def on_resize(self):
+        """
+        SIGWINCH: (re)starts the debounce timer. Dragging a window edge sends
+        a stream of these, and only the size it settles on gets reflowed.
+        """
+        if self.resize_timer:
+            self.resize_timer.cancel()
+        self.resize_timer = self.loop.call_later(RESIZE_DEBOUNCE, self.on_resize_settled)
+
+    def on_resize_settled(self):
+        """No SIGWINCH for RESIZE_DEBOUNCE seconds: reflow the scene to the new size and redraw."""
+        self.resize_timer = None
+        if self.aquarium.check_terminal_resize():
+            self.request_frame()
+
+    def on_loop_error(self, loop, context):
+        """
+        An event callback raised. asyncio would only log it and carry on, so
+        stop instead and let run() raise it, which runs the usual exit cleanup.
+        """
+        error = context.get('exception')
+        if error is None or self.finished.done():
+            loop.default_exception_handler(context)
+            return
+        self.finished.set_exception(error)
+
+    def on_audio_ready(self):
+        """The audio loader has finished (called on the loop's thread)."""
+        self.aquarium.on_audio_ready()
+
+    async def on_control_client(self, reader, writer):
+        """Types every line received on the control socket into the aquarium as key presses."""
+        try:
+            while line := await reader.readline():
+                self.aquarium.injected_keys.extend(line.decode('utf-8', errors='ignore').strip())
+                self.request_frame()
+        except asyncio.CancelledError:
+            pass  # The aquarium is shutting down
+        finally:
+            writer.close()
@@ -1,7 +1,10 @@
 import random
-import math
-from colorama import Fore, Back
-from ascii_art import FISH_ART_STYLES, FISH_COLOR_SETS, COLOR_ADJUSTMENTS
+from colorama import Back
+from ascii_art import FISH_ART_STYLES, FISH_COLOR_SETS
+from palette import fg_id, LIGHT_MODE
+from sprites import get_sprite
+from clock import interpolate
+from fish_population import PopulationField
 from config import (
     NORMAL_SPEED_RANGE, FAST_SPEED_RANGE, FAST_FISH_PROBABILITY,
     STARTLE_MULTIPLIER_RANGE, STARTLE_DURATION, FRAME_RATE,
@@ -11,6 +14,23 @@ from config import (
 
 class Fish:
     """Represents a single fish in the aquarium with AI for feeding."""
+    layer = 'fish'
+
+    # Movement state; moves into NumPy columns when the fish joins a FishPopulation
+    x = PopulationField()
+    y = PopulationField()
+    prev_x = PopulationField()
+    prev_y = PopulationField()
+    speed = PopulationField()
+    normal_speed = PopulationField()
+    peak_startle_speed = PopulationField()
+    startle_timer = PopulationField()
+    is_startled = PopulationField()
+    direction = PopulationField()
+    state = PopulationField()
+    art_width = PopulationField()
+    art_height = PopulationField()
+
     def __init__(self, width, height, background_color):
         self.width = width
         self.height = height
@@ -44,13 +64,11 @@ class Fish:
         if isinstance(self.forward_art, str): self.forward_art = (self.forward_art,)
         if isinstance(self.backward_art, str): self.backward_art = (self.backward_art,)
 
-        self.art = self.forward_art if self.direction == 'forward' else self.backward_art
+        self.set_art(self.forward_art if self.direction == 'forward' else self.backward_art)
         self.base_color = random.choice(FISH_COLOR_SETS[self.fish_type])
 
     def _init_position_and_speed(self):
         """Sets the initial position and speed of the fish."""
-        self.art_height = len(self.art)
-        self.art_width = max(len(line) for line in self.art) if self.art else 0
         self.x = float(random.randint(0, self.width - 1))
         self.y = random.randint(1, self.height - self.art_height - 3)
 
@@ -60,19 +78,26 @@ class Fish:
             self.normal_speed = random.uniform(*FAST_SPEED_RANGE)
 
         self.speed = self.normal_speed if self.direction == 'forward' else -self.normal_speed
+        # Position at the previous simulation step, used to interpolate drawing
+        self.prev_x, self.prev_y = self.x, self.y
+
+    def set_art(self, art):
+        """Switches to a new piece of art along with its compiled sprite and size."""
+        self.art = art
+        self.sprite = get_sprite(art)
+        self.art_height = self.sprite.height
+        self.art_width = self.sprite.width
 
     def turn_around(self):
         """Flips the fish's direction and updates its art and speed."""
         if self.direction == 'forward':
             self.direction = 'backward'
-            self.art = self.backward_art
+            self.set_art(self.backward_art)
             self.speed = -abs(self.speed)
         else:
             self.direction = 'forward'
-            self.art = self.forward_art
+            self.set_art(self.forward_art)
             self.speed = abs(self.speed)
-        
-        self.art_width = max(len(line) for line in self.art) if self.art else 0
 
     def seek_food(self, food_pellet):
         """Assigns a food pellet and triggers the seeking state with a speed boost."""
@@ -81,25 +106,26 @@ class Fish:
             self.target_food = food_pellet
             self.speed *= FOOD_SEEK_SPEED_MULTIPLIER
 
-    def update(self):
-        """The main AI brain for the fish."""
+    def update(self, dt=FRAME_RATE):
+        """The main AI brain for the fish. dt is the simulation timestep in seconds."""
+        self.prev_x, self.prev_y = self.x, self.y
         if self.is_startled:
-            self._update_startled()
+            self._update_startled(dt)
             return
 
         if self.state == 'seeking':
-            self._update_seeking()
+            self._update_seeking(dt)
         else:
-            self._update_swimming()
+            self._update_swimming(dt)
 
-    def _update_swimming(self):
+    def _update_swimming(self, dt):
         """Default behavior: swim back and forth at normal speed."""
         self.speed = self.normal_speed if self.direction == 'forward' else -self.normal_speed
-        self.x += self.speed
-        if self.speed > 0 and self.x >= self.width: self.x = -self.art_width
-        elif self.speed < 0 and self.x <= -self.art_width: self.x = self.width - 1
+        self.x += self.speed * (dt / FRAME_RATE)
+        if self.speed > 0 and self.x >= self.width: self.x = self.prev_x = -self.art_width
+        elif self.speed < 0 and self.x <= -self.art_width: self.x = self.prev_x = self.width - 1
     
-    def _update_seeking(self):
+    def _update_seeking(self, dt):
         """Behavior for rushing towards food, with anti-oscillation logic."""
         if not self.target_food or not self.target_food.lifetime > 0:
             self.state = 'swimming'
@@ -117,8 +143,8 @@ class Fish:
            (not is_food_to_right and is_facing_right):
             self.turn_around()
         
-        # Calculate the movement for this frame.
-        movement = self.speed
+        # Calculate the movement for this step.
+        movement = self.speed * (dt / FRAME_RATE)
 
         # --- THE CORE FIX ---
         # If the planned movement would overshoot the target, just move exactly
@@ -131,9 +157,9 @@ class Fish:
             self.x += movement
 
 
-    def _update_startled(self):
+    def _update_startled(self, dt):
         """Handles the startled state countdown and deceleration."""
-        self.startle_timer -= FRAME_RATE
+        self.startle_timer -= dt
         if self.startle_timer <= 0:
             self.is_startled = False
             self.speed = self.normal_speed if self.direction == 'forward' else -self.normal_speed
@@ -143,7 +169,7 @@ class Fish:
             current_speed_magnitude = self.normal_speed + (speed_range * progress)
             self.speed = current_speed_magnitude if self.direction == 'forward' else -current_speed_magnitude
         
-        self.x += self.speed
+        self.x += self.speed * (dt / FRAME_RATE)
 
     def startle(self):
         """Temporarily multiplies the fish's speed, interrupting feeding."""
@@ -157,35 +183,34 @@ class Fish:
             self.peak_startle_speed = abs(self.normal_speed * startle_multiplier)
             self.speed = self.peak_startle_speed if self.direction == 'forward' else -self.peak_startle_speed
 
+    def resize(self, width, height):
+        """Fits the fish to a resized aquarium, keeping its relative position."""
+        self.x = self.prev_x = self.x * width / self.width
+        max_y = max(1, height - self.art_height - 3)
+        self.y = self.prev_y = min(max(1, round(self.y * height / self.height)), max_y)
+        self.width, self.height = width, height
+
+    def get_bounds(self):
+        """Returns the fish's bounding box as (x, y, width, height)."""
+        return self.x, self.y, self.art_width, self.art_height
+
+    def get_previous_bounds(self):
+        """Returns the bounding box at the previous simulation step."""
+        return self.prev_x, self.prev_y, self.art_width, self.art_height
+
     def get_adjusted_color(self, color):
-        """Adjusts color based on current background mode."""
+        """Adjusts a palette color ID based on current background mode."""
         if self.background_color == Back.LIGHTCYAN_EX:
-            return COLOR_ADJUSTMENTS.get('light_mode', {}).get(color, color)
+            return LIGHT_MODE[color]
         return color
 
     def get_current_color(self):
-        """Gets the current color adjusted for background mode."""
-        return self.get_adjusted_color(self.base_color)
-
-    def get_art_with_colors(self):
-        """Returns the art with color information for drawing."""
-        single_color = self.get_current_color()
-        colored_art = []
-        for line in self.art:
-            colored_line = [(char, single_color) for char in line]
-            colored_art.append(colored_line)
-        return colored_art
-        
-    def draw(self, buffer):
-        """Draws the fish onto the provided scene buffer."""
-        x, y = int(self.x), int(self.y)
-        colored_art = self.get_art_with_colors()
-        
-        for line_idx, line_data in enumerate(colored_art):
-            current_y = y + line_idx
-            if 0 <= current_y < self.height:
-                for char_idx, (char_art, color) in enumerate(line_data):
-                    current_x = x + char_idx
-                    if char_art != ' ' and 0 <= current_x < self.width:
-                        buffer[current_y][current_x] = (char_art, color)
+        """Gets the current palette color ID adjusted for background mode."""
+        return self.get_adjusted_color(fg_id(self.base_color))
+
+    def draw(self, buffer, alpha=1.0):
+        """Draws the fish onto the provided scene buffer, alpha of the way between its last two positions."""
+        x = interpolate(self.prev_x, self.x, alpha)
+        y = interpolate(self.prev_y, self.y, alpha)
+        buffer.blit(self.sprite, int(x), int(y), self.get_current_color())
 
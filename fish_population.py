@@ -0,0 +1,182 @@
+import numpy as np
+from clock import interpolate
+from config import FRAME_RATE, STARTLE_DURATION
+
+# --- Population Layout ---
+# Each field is one NumPy column indexed by the fish's slot in the population.
+# Fields with codes store an index into the tuple instead of the string itself.
+DIRECTIONS = ('forward', 'backward')
+STATES = ('swimming', 'seeking')
+FORWARD = DIRECTIONS.index('forward')
+SWIMMING = STATES.index('swimming')
+SEEKING = STATES.index('seeking')
+
+FIELDS = {
+    'x': (np.float64, None),
+    'y': (np.float64, None),
+    'prev_x': (np.float64, None),
+    'prev_y': (np.float64, None),
+    'speed': (np.float64, None),
+    'normal_speed': (np.float64, None),
+    'peak_startle_speed': (np.float64, None),
+    'startle_timer': (np.float64, None),
+    'is_startled': (np.bool_, None),
+    'direction': (np.int8, DIRECTIONS),
+    'state': (np.int8, STATES),
+    'art_width': (np.int32, None),
+    'art_height': (np.int32, None),
+}
+
+
+class PopulationField:
+    """
+    A Fish attribute that is stored on the object until the fish joins a
+    FishPopulation, and in the population's column for it afterwards.
+    Reads and writes go through the same attribute either way, so code that
+    works on a single fish does not need to know where its state lives.
+    """
+    def __set_name__(self, owner, name):
+        self.name = name
+        dtype, self.codes = FIELDS[name]
+        self.python_type = bool if dtype is np.bool_ else float if dtype is np.float64 else int
+
+    def __get__(self, fish, owner=None):
+        if fish is None:
+            return self
+        population = fish.__dict__.get('population')
+        if population is None:
+            return fish.__dict__[self.name]
+        value = getattr(population, self.name)[fish.__dict__['population_index']]
+        if self.codes is not None:
+            return self.codes[value]
+        return self.python_type(value)
+
+    def __set__(self, fish, value):
+        population = fish.__dict__.get('population')
+        if population is None:
+            fish.__dict__[self.name] = value
+            return
+        if self.codes is not None:
+            value = self.codes.index(value)
+        getattr(population, self.name)[fish.__dict__['population_index']] = value
+
+
+class FishPopulation:
+    """
+    Struct-of-arrays storage and a vectorized update for plain fish.
+
+    Every fish whose class uses the stock Fish.update() has its movement
+    state moved into NumPy columns, and the whole group is advanced with
+    array operations each step. Subclasses that override update() (such as
+    PufferFish) are left as ordinary objects in `unmanaged` and updated one
+    by one as before. The Fish objects stay valid views onto their columns.
+    """
+    layer = 'fish'
+
+    def __init__(self, fishes, fish_class):
+        self.fishes = [fish for fish in fishes if type(fish).update is fish_class.update]
+        self.unmanaged = [fish for fish in fishes if type(fish).update is not fish_class.update]
+        self.width = self.fishes[0].width if self.fishes else 0
+
+        for name, (dtype, codes) in FIELDS.items():
+            values = [fish.__dict__[name] for fish in self.fishes]
+            if codes is not None:
+                values = [codes.index(value) for value in values]
+            setattr(self, name, np.array(values, dtype=dtype))
+
+        for index, fish in enumerate(self.fishes):
+            for name in FIELDS:
+                del fish.__dict__[name]
+            fish.population = self
+            fish.population_index = index
+
+    def __len__(self):
+        return len(self.fishes)
+
+    def update(self, dt=FRAME_RATE):
+        """Advances every managed fish by one simulation step of dt seconds."""
+        scale = dt / FRAME_RATE
+        x = self.x
+        np.copyto(self.prev_x, x)
+        np.copyto(self.prev_y, self.y)
+
+        # Each fish follows exactly one behaviour per step, chosen up front
+        forward = self.direction == FORWARD
+        startled = self.is_startled.copy()
+        seeking = (self.state == SEEKING) & ~startled
+        swimming = ~(startled | seeking)
+
+        if startled.any():
+            self._update_startled(np.flatnonzero(startled), forward, dt, scale)
+        if seeking.any():
+            self._update_seeking(np.flatnonzero(seeking), scale)
+
+        # Default behaviour: swim at normal speed and wrap around the screen
+        normal = self.normal_speed[swimming]
+        speed = np.where(forward[swimming], normal, -normal)
+        self.speed[swimming] = speed
+        new_x = x[swimming] + speed * scale
+        art_width = self.art_width[swimming]
+        wrap_right = (speed > 0) & (new_x >= self.width)
+        wrap_left = (speed < 0) & (new_x <= -art_width)
+        new_x = np.where(wrap_right, -art_width, new_x)
+        new_x = np.where(wrap_left, self.width - 1, new_x)
+        x[swimming] = new_x
+
+        # Snap the previous position so a wrap isn't interpolated across the screen
+        wrapped = np.flatnonzero(swimming)[wrap_right | wrap_left]
+        self.prev_x[wrapped] = x[wrapped]
+
+    def _update_startled(self, idx, forward, dt, scale):
+        """Counts down the startle timer and decelerates back towards normal speed."""
+        timer = self.startle_timer[idx] - dt
+        self.startle_timer[idx] = timer
+        normal = self.normal_speed[idx]
+        speed_range = self.peak_startle_speed[idx] - normal
+        magnitude = np.where(timer <= 0, normal, normal + speed_range * (timer / STARTLE_DURATION))
+        speed = np.where(forward[idx], magnitude, -magnitude)
+        self.speed[idx] = speed
+        self.is_startled[idx] = timer > 0
+        self.x[idx] += speed * scale
+
+    def _update_seeking(self, idx, scale):
+        """Moves seeking fish towards their food, stopping exactly on it instead of overshooting."""
+        fishes = self.fishes
+        targets = [fishes[i].target_food for i in idx.tolist()]
+        alive = np.array([food is not None and food.lifetime > 0 for food in targets], dtype=bool)
+
+        # Food that was eaten or expired sends the fish back to swimming
+        for i in idx[~alive].tolist():
+            fishes[i].target_food = None
+        self.state[idx[~alive]] = SWIMMING
+
+        idx = idx[alive]
+        if not len(idx):
+            return
+        target_x = np.array([food.x for food, ok in zip(targets, alive.tolist()) if ok], dtype=np.float64)
+        dist_x = target_x - self.x[idx]
+
+        # Turning swaps the art, so it goes through the fish object
+        for i in idx[(dist_x > 0) != (self.speed[idx] > 0)].tolist():
+            fishes[i].turn_around()
+
+        movement = self.speed[idx] * scale
+        arrived = np.abs(movement) >= np.abs(dist_x)
+        self.x[idx] = np.where(arrived, target_x, self.x[idx] + movement)
+        self.state[idx[arrived]] = SWIMMING
+
+    def get_swept_rects(self):
+        """Returns an (n, 4) array of the (x0, y0, x1, y1) boxes each fish may cover between steps."""
+        return np.stack([
+            np.floor(np.minimum(self.prev_x, self.x)),
+            np.floor(np.minimum(self.prev_y, self.y)),
+            np.ceil(np.maximum(self.prev_x, self.x)) + self.art_width,
+            np.ceil(np.maximum(self.prev_y, self.y)) + self.art_height,
+        ], axis=1).astype(np.int64)
+
+    def draw(self, buffer, alpha=1.0):
+        """Draws every managed fish, interpolating all positions in one pass."""
+        xs = interpolate(self.prev_x, self.x, alpha).astype(np.int64).tolist()
+        ys = interpolate(self.prev_y, self.y, alpha).astype(np.int64).tolist()
+        for fish, x, y in zip(self.fishes, xs, ys):
+            buffer.blit(fish.sprite, x, y, fish.get_current_color())
@@ -1,25 +1,33 @@
 import math
 import random
 from colorama import Fore
+from palette import fg_id
 
 class Floor:
     """
     Represents a static, naturalistic seafloor with dunes and variations.
     The floor pattern is generated once and does not animate.
     """
+    layer = 'floor'
+
     def __init__(self, width, height):
         self.width = width
         self.height = height
         self.floor_y = height - 1
         
+        self.floor_pattern = []
+        self._extend_pattern(width)
+        self.floor_line = ''.join(self.floor_pattern)
+
+    def _extend_pattern(self, width):
+        """Generates more dunes onto the end of the pattern until it spans width columns."""
         # The character sequence for building the wave/dune shapes.
         wave_chars_up = ['_', ',', '.', '-', '~', '=', '"', "'", '`', '‾']
         # The downward slope starts from the second-highest character for a smoother peak
         wave_chars_down = wave_chars_up[:-1][::-1] 
 
-        self.floor_pattern = []
-        current_x = 0
-        while current_x < self.width:
+        current_x = len(self.floor_pattern)
+        while current_x < width:
             # 1. Determine the height (amplitude) of the next dune.
             max_amp = random.randint(2, len(wave_chars_up))
             
@@ -30,7 +38,7 @@ class Floor:
             for i in range(max_amp):
                 char = wave_chars_up[i]
                 for _ in range(step_width):
-                    if current_x < self.width:
+                    if current_x < width:
                         self.floor_pattern.append(char)
                         current_x += 1
             
@@ -38,7 +46,7 @@ class Floor:
             peak_width = random.randint(1, 5)
             peak_char = wave_chars_up[max_amp - 1]
             for _ in range(peak_width):
-                 if current_x < self.width:
+                 if current_x < width:
                     self.floor_pattern.append(peak_char)
                     current_x += 1
 
@@ -47,27 +55,32 @@ class Floor:
             for i in range(len(wave_chars_up) - max_amp, len(wave_chars_down)):
                 char = wave_chars_down[i]
                 for _ in range(step_width):
-                    if current_x < self.width:
+                    if current_x < width:
                         self.floor_pattern.append(char)
                         current_x += 1
 
             # 6. Add a shorter, varied flat area between dunes
-            if current_x < self.width:
+            if current_x < width:
                 flat_length = random.randint(2, 8)
                 for _ in range(flat_length):
-                    if current_x < self.width:
+                    if current_x < width:
                         # Add a chance for a slight dip in the flat area
                         char = '_' if random.random() > 0.1 else '.'
                         self.floor_pattern.append(char)
                         current_x += 1
 
-    def draw(self, buffer):
-        """Draws the pre-generated seafloor pattern onto the buffer."""
-        if not (0 <= self.floor_y < self.height):
-            return
+    def resize(self, width, height):
+        """
+        Fits the floor to a resized aquarium. Growing continues the dunes
+        past the old right edge; shrinking only hides the surplus, so the
+        floor looks the same when the window grows back.
+        """
+        self._extend_pattern(width)
+        self.floor_line = ''.join(self.floor_pattern)
+        self.width, self.height = width, height
+        self.floor_y = height - 1
 
-        for x in range(self.width):
-            if x < len(self.floor_pattern):
-                char_to_draw = self.floor_pattern[x]
-                buffer[self.floor_y][x] = (char_to_draw, Fore.YELLOW)
+    def draw(self, buffer, alpha=1.0):
+        """Draws the pre-generated seafloor pattern onto the buffer."""
+        buffer.put_text(0, self.floor_y, self.floor_line[:self.width], fg_id(Fore.YELLOW), transparent=False)
 
@@ -1,15 +1,20 @@
 import random
 from colorama import Fore
 from config import FRAME_RATE, FOOD_SINK_SPEED, FOOD_LIFETIME
+from palette import fg_id
+from clock import interpolate
 
 class FoodPellet:
     """
     Represents a cluster of food particles falling from the top.
     While visually complex, it's treated as a single object by other classes.
     """
+    layer = 'food'
+
     def __init__(self, x, y, width, height):
         self.x = float(x)
         self.y = float(y)
+        self.prev_x, self.prev_y = self.x, self.y
         self.width = width
         self.height = height
         
@@ -22,33 +27,49 @@ class FoodPellet:
         for _ in range(num_particles):
             particle = {
                 'art': random.choice(['●', '•', '.','.','.','.','•','•','•','•','•','•','•','•','•']),
-                'color': random.choice([Fore.RED, Fore.LIGHTRED_EX, Fore.MAGENTA, Fore.LIGHTMAGENTA_EX]),
+                'color': fg_id(random.choice([Fore.RED, Fore.LIGHTRED_EX, Fore.MAGENTA, Fore.LIGHTMAGENTA_EX])),
                 # Give each particle a slight, fixed offset from the center
                 'x_offset': random.uniform(-3.5, 3.5),
                 'y_offset': random.uniform(-2.5, 2.5)
             }
             self.particles.append(particle)
 
-    def update(self):
+    def update(self, dt=FRAME_RATE):
         """Moves the pellet downwards with a slight wobble and ages it."""
+        step = dt / FRAME_RATE
+        self.prev_x, self.prev_y = self.x, self.y
         # Vertical movement
-        self.y += self.speed
+        self.y += self.speed * step
         
         # Add a gentle horizontal drift 
-        self.x += random.uniform(-0.4, 0.4)
+        self.x += random.uniform(-0.4, 0.4) * step
 
-        self.lifetime -= FRAME_RATE
+        self.lifetime -= dt
         # Return True if the pellet is still active
         return self.lifetime > 0 and self.y < self.height - 1
 
-    def draw(self, buffer):
+    def resize(self, width, height):
+        """Fits the pellet to a resized aquarium, keeping its relative position."""
+        self.x = self.prev_x = self.x * width / self.width
+        self.y = self.prev_y = self.y * height / self.height
+        self.width, self.height = width, height
+
+    def get_bounds(self):
+        """Returns a box (x, y, width, height) around every particle of the cluster."""
+        return self.x - 4, self.y - 3, 9, 7
+
+    def get_previous_bounds(self):
+        """Returns the cluster's box at the previous simulation step."""
+        return self.prev_x - 4, self.prev_y - 3, 9, 7
+
+    def draw(self, buffer, alpha=1.0):
         """Draws each particle in the cluster onto the provided buffer."""
+        center_x = interpolate(self.prev_x, self.x, alpha)
+        center_y = interpolate(self.prev_y, self.y, alpha)
         # Loop through particles to draw the cluster
         for particle in self.particles:
             # Calculate the absolute position of each particle
-            x = int(self.x + particle['x_offset'])
-            y = int(self.y + particle['y_offset'])
-            
-            if 0 <= y < self.height and 0 <= x < self.width:
-                buffer[y][x] = (particle['art'], particle['color'])
+            x = int(center_x + particle['x_offset'])
+            y = int(center_y + particle['y_offset'])
+            buffer.put(x, y, particle['art'], particle['color'])
 
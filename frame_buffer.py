@@ -0,0 +1,196 @@
+import functools
+import numpy as np
+from palette import FG_RESET, BG_RESET
+
+# Glyphs are stored as little-endian UTF-32 codepoints so a row slice can be
+# decoded straight back into a string.
+GLYPH_DTYPE = np.dtype('<u4')
+COLOR_DTYPE = np.uint8
+SPACE = ord(' ')
+
+
+@functools.lru_cache(maxsize=4096)
+def encode_text(text):
+    """Converts a string into a read-only array of codepoints (cached per string)."""
+    codes = np.frombuffer(text.encode('utf-32-le'), dtype=GLYPH_DTYPE)
+    codes.flags.writeable = False
+    return codes
+
+
+class FrameBuffer:
+    """
+    A terminal-sized grid of cells backed by NumPy arrays: one of glyph
+    codepoints and two of palette foreground/background color IDs.
+    Allocated once per terminal size and reset with a vectorized fill.
+    Drawing helpers leave a cell's background alone unless one is given.
+
+    All drawing is clipped to the clip rectangle (the whole frame unless set
+    with set_clip()), and while only_empty is set every helper behaves as if
+    called with only_empty=True, so a compositor can redraw part of a frame
+    or draw a whole layer "behind" what is already there.
+    """
+    def __init__(self, width, height):
+        self.width = 0
+        self.height = 0
+        self.only_empty = False
+        self.resize(width, height)
+
+    def resize(self, width, height):
+        """Reallocates the arrays only if the size actually changed."""
+        if (width, height) == (self.width, self.height):
+            return
+        self.width = width
+        self.height = height
+        self.glyphs = np.full((height, width), SPACE, dtype=GLYPH_DTYPE)
+        self.fg = np.full((height, width), FG_RESET, dtype=COLOR_DTYPE)
+        self.bg = np.full((height, width), BG_RESET, dtype=COLOR_DTYPE)
+        self.reset_clip()
+
+    def set_clip(self, x, y, width, height):
+        """Restricts drawing to a rectangle (intersected with the frame)."""
+        self.clip_x0, self.clip_y0 = max(0, x), max(0, y)
+        self.clip_x1, self.clip_y1 = min(self.width, x + width), min(self.height, y + height)
+
+    def reset_clip(self):
+        """Allows drawing anywhere in the frame again."""
+        self.set_clip(0, 0, self.width, self.height)
+
+    def clear(self, background=BG_RESET):
+        """Resets every cell to a blank space on the given background color."""
+        self.glyphs.fill(SPACE)
+        self.fg.fill(FG_RESET)
+        self.bg.fill(background)
+
+    def copy_from(self, other, mask=None):
+        """Bulk-copies the cells inside the clip rectangle (and under an optional mask) from a same-sized frame."""
+        region = np.s_[self.clip_y0:self.clip_y1, self.clip_x0:self.clip_x1]
+        where = True if mask is None else mask[region]
+        for name in ('glyphs', 'fg', 'bg'):
+            np.copyto(getattr(self, name)[region], getattr(other, name)[region], where=where)
+
+    def is_empty(self, x, y):
+        """Checks if a cell holds a blank space (used to draw things 'behind')."""
+        return self.glyphs[y, x] == SPACE
+
+    def put(self, x, y, char, fg, bg=None):
+        """Writes a single character, ignoring positions outside the clip rectangle."""
+        if self.clip_y0 <= y < self.clip_y1 and self.clip_x0 <= x < self.clip_x1:
+            if self.only_empty and self.glyphs[y, x] != SPACE:
+                return
+            self.glyphs[y, x] = ord(char)
+            self.fg[y, x] = fg
+            if bg is not None:
+                self.bg[y, x] = bg
+
+    def put_if_empty(self, x, y, char, fg):
+        """Writes a single character only if the cell is currently blank."""
+        if self.clip_y0 <= y < self.clip_y1 and self.clip_x0 <= x < self.clip_x1 and self.glyphs[y, x] == SPACE:
+            self.glyphs[y, x] = ord(char)
+            self.fg[y, x] = fg
+
+    def put_points_if_empty(self, xs, ys, glyphs, fg):
+        """
+        Vectorized put_if_empty() for many single-cell points at once.
+        xs/ys are integer arrays and glyphs/fg per-point codepoints and color
+        IDs. Points outside the clip rectangle or on non-blank cells are
+        skipped, and
+        when several points land on the same blank cell the first one wins,
+        just as if they had been drawn one after another.
+        """
+        visible = np.flatnonzero((xs >= self.clip_x0) & (xs < self.clip_x1) & (ys >= self.clip_y0) & (ys < self.clip_y1))
+        cells = ys[visible] * self.width + xs[visible]
+        flat_glyphs = self.glyphs.reshape(-1)
+        empty = flat_glyphs[cells] == SPACE
+        cells, first = np.unique(cells[empty], return_index=True)
+        points = visible[empty][first]
+        flat_glyphs[cells] = glyphs[points]
+        self.fg.reshape(-1)[cells] = fg[points]
+
+    def put_text(self, x, y, text, fg, bg=None, transparent=True, only_empty=False):
+        """
+        Writes a run of text starting at (x, y), clipped to the clip rectangle.
+        With transparent=True spaces in the text leave the cell untouched;
+        otherwise they are written as blank cells. With only_empty=True
+        characters only land on cells that are currently blank.
+        """
+        if not (self.clip_y0 <= y < self.clip_y1) or not text:
+            return
+        only_empty = only_empty or self.only_empty
+        codes = encode_text(text)
+        start = max(0, self.clip_x0 - x)
+        end = min(len(codes), self.clip_x1 - x)
+        if start >= end:
+            return
+        codes = codes[start:end]
+        x0, x1 = x + start, x + end
+
+        glyph_row = self.glyphs[y, x0:x1]
+        fg_row = self.fg[y, x0:x1]
+
+        if transparent or only_empty:
+            mask = codes != SPACE if transparent else np.ones(len(codes), dtype=bool)
+            if only_empty:
+                mask &= glyph_row == SPACE
+            glyph_row[mask] = codes[mask]
+            fg_row[mask] = fg
+            if bg is not None:
+                self.bg[y, x0:x1][mask] = bg
+        else:
+            glyph_row[:] = codes
+            fg_row[:] = np.where(codes == SPACE, FG_RESET, fg)
+            if bg is not None:
+                self.bg[y, x0:x1] = bg
+
+    def blit(self, sprite, x, y, fg, bg=None, only_empty=False, row_fg=None):
+        """
+        Draws a compiled sprite with its top-left corner at (x, y), copying
+        each opaque span as a slice. row_fg optionally gives a color per row.
+        With only_empty=True the sprite only lands on blank cells.
+        """
+        clip_x0, clip_y0, clip_x1, clip_y1 = self.clip_x0, self.clip_y0, self.clip_x1, self.clip_y1
+        if x >= clip_x1 or y >= clip_y1 or x + sprite.width <= clip_x0 or y + sprite.height <= clip_y0:
+            return
+        only_empty = only_empty or self.only_empty
+        for row, start, end in sprite.spans:
+            dest_y = y + row
+            if not clip_y0 <= dest_y < clip_y1:
+                continue
+            x0, x1 = x + start, x + end
+            if x0 < clip_x0:
+                start += clip_x0 - x0
+                x0 = clip_x0
+            if x1 > clip_x1:
+                end -= x1 - clip_x1
+                x1 = clip_x1
+            if x0 >= x1:
+                continue
+
+            color = fg if row_fg is None else row_fg[row]
+            source = sprite.glyphs[row, start:end]
+            if only_empty:
+                glyph_row = self.glyphs[dest_y, x0:x1]
+                mask = glyph_row == SPACE
+                glyph_row[mask] = source[mask]
+                self.fg[dest_y, x0:x1][mask] = color
+                if bg is not None:
+                    self.bg[dest_y, x0:x1][mask] = bg
+            else:
+                self.glyphs[dest_y, x0:x1] = source
+                self.fg[dest_y, x0:x1] = color
+                if bg is not None:
+                    self.bg[dest_y, x0:x1] = bg
+
+    def fill_rect(self, x, y, width, height, fg=FG_RESET, bg=None, char=' '):
+        """Fills a rectangle (clipped to the clip rectangle) with a single character and color."""
+        x0, y0 = max(self.clip_x0, x), max(self.clip_y0, y)
+        x1, y1 = min(self.clip_x1, x + width), min(self.clip_y1, y + height)
+        if x0 >= x1 or y0 >= y1:
+            return
+        self.glyphs[y0:y1, x0:x1] = ord(char)
+        self.fg[y0:y1, x0:x1] = fg
+        if bg is not None:
+            self.bg[y0:y1, x0:x1] = bg
+
+    def row_text(self, y, start=0, end=None):
+        """Decodes a slice of a row back into a string."""
+        return self.glyphs[y, start:end].tobytes().decode('utf-32-le')
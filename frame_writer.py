@@ -0,0 +1,139 @@
+import threading
+from collections import deque
+import numpy as np
+from frame_buffer import FrameBuffer
+from config import WRITER_QUEUE_DEPTH
+
+
+def merge_dirty_rects(first, second):
+    """Combines two dirty_rects arguments of DiffRenderer.render() (None means the whole frame)."""
+    if first is None or second is None:
+        return None
+    return [*first, *second]
+
+
+class FrameWriter:
+    """
+    Runs a DiffRenderer on a background thread so a slow terminal never
+    blocks the main loop.
+
+    render() takes a snapshot of the composed frame and queues it; the
+    writer thread diffs and writes queued snapshots in order. The queue
+    holds at most `depth` frames: when it is full the oldest waiting frame
+    is dropped in favour of the newest, and its dirty rows are carried over
+    to the frame that now follows it, so the diff against what the terminal
+    last received stays correct. Snapshot buffers are recycled, so steady
+    state allocates nothing.
+    """
+    def __init__(self, renderer, depth=WRITER_QUEUE_DEPTH):
+        self.renderer = renderer
+        self.depth = depth
+        self.pending = deque()  # (snapshot, background, dirty_rects) waiting to be written
+        self.spare_frames = []
+        self.condition = threading.Condition()
+        self.writing = False
+        self.invalidate_requested = False
+        self.closing = False
+        self.error = None
+
+        # Queue statistics
+        self.frames_submitted = 0
+        self.frames_written = 0
+        self.frames_dropped = 0
+        self.max_backlog = 0
+
+        self.thread = threading.Thread(target=self._run, name='frame-writer', daemon=True)
+        self.thread.start()
+
+    @property
+    def total_bytes(self):
+        """Bytes the writer thread has sent so far."""
+        return self.renderer.total_bytes
+
+    @property
+    def write_seconds(self):
+        """Time the writer thread has spent blocked on the terminal."""
+        return self.renderer.write_seconds
+
+    @property
+    def frames_rendered(self):
+        """Frames the writer thread has sent so far."""
+        return self.renderer.frames_rendered
+
+    @property
+    def backlog(self):
+        """Frames queued or being written right now."""
+        return len(self.pending) + self.writing
+
+    def render(self, frame, background, dirty_rects=None):
+        """Queues a copy of the frame for the writer thread; never waits for the terminal."""
+        if self.error is not None:
+            raise self.error
+        with self.condition:
+            snapshot = self.spare_frames.pop() if self.spare_frames else FrameBuffer(0, 0)
+        snapshot.resize(frame.width, frame.height)
+        np.copyto(snapshot.glyphs, frame.glyphs)
+        np.copyto(snapshot.fg, frame.fg)
+        np.copyto(snapshot.bg, frame.bg)
+
+        with self.condition:
+            self.frames_submitted += 1
+            if len(self.pending) >= self.depth:
+                stale, _, stale_rects = self.pending.popleft()
+                self.spare_frames.append(stale)
+                self.frames_dropped += 1
+                if self.pending:
+                    following, following_background, following_rects = self.pending[0]
+                    self.pending[0] = (following, following_background, merge_dirty_rects(stale_rects, following_rects))
+                else:
+                    dirty_rects = merge_dirty_rects(stale_rects, dirty_rects)
+            self.pending.append((snapshot, background, dirty_rects))
+            self.max_backlog = max(self.max_backlog, self.backlog)
+            self.condition.notify_all()
+
+    def invalidate(self):
+        """Forces the next frame written to be a full repaint."""
+        with self.condition:
+            self.invalidate_requested = True
+
+    def flush(self):
+        """Waits until every queued frame has been written."""
+        with self.condition:
+            while (self.pending or self.writing) and self.error is None and self.thread.is_alive():
+                self.condition.wait()
+
+    def close(self):
+        """Writes whatever is still queued, then stops the writer thread."""
+        with self.condition:
+            self.closing = True
+            self.condition.notify_all()
+        self.thread.join()
+        self.renderer.close()
+
+    def _run(self):
+        """Writer thread: takes frames off the queue and renders them until closed."""
+        while True:
+            with self.condition:
+                while not self.pending and not self.closing:
+                    self.condition.wait()
+                if not self.pending:
+                    return
+                snapshot, background, dirty_rects = self.pending.popleft()
+                self.writing = True
+                invalidate, self.invalidate_requested = self.invalidate_requested, False
+
+            try:
+                if invalidate:
+                    self.renderer.invalidate()
+                self.renderer.render(snapshot, background, dirty_rects)
+            except OSError as e:
+                # Reported to the main thread on its next render()
+                self.error = e
+
+            with self.condition:
+                self.writing = False
+                self.spare_frames.append(snapshot)
+                self.frames_written += 1
+                self.condition.notify_all()
+                if self.error is not None:
+                    return
@@ -0,0 +1,223 @@
+import codecs
+import os
+import select
+from config import ESC_TIMEOUT, INPUT_BUFFER_SIZE
+
+# --- Decoder States ---
+STATES = ('ground', 'escape', 'csi', 'ss3')
+GROUND = STATES.index('ground')
+ESCAPE = STATES.index('escape')    # After ESC, waiting to see if a sequence follows
+CSI = STATES.index('csi')          # Inside ESC [ ... final
+SS3 = STATES.index('ss3')          # After ESC O, waiting for the final byte
+
+ESC = 0x1b
+MAX_SEQUENCE_LENGTH = 32  # Longer CSI sequences are garbage and are dropped
+
+# Key names for the control bytes we care about; other bytes are returned as characters
+CONTROL_KEYS = {0x03: 'CTRL_C', 0x0a: 'ENTER', 0x0d: 'ENTER', 0x08: 'BACKSPACE', 0x7f: 'BACKSPACE'}
+
+# CSI/SS3 final bytes, and the numbers of CSI ... ~ sequences
+FINAL_KEYS = {
+    'A': 'UP', 'B': 'DOWN', 'C': 'RIGHT', 'D': 'LEFT', 'H': 'HOME', 'F': 'END',
+    'P': 'F1', 'Q': 'F2', 'R': 'F3', 'S': 'F4', 'Z': 'BACKTAB',
+}
+TILDE_KEYS = {
+    1: 'HOME', 2: 'INSERT', 3: 'DELETE', 4: 'END', 5: 'PAGE_UP', 6: 'PAGE_DOWN',
+    15: 'F5', 17: 'F6', 18: 'F7', 19: 'F8', 20: 'F9', 21: 'F10', 23: 'F11', 24: 'F12',
+}
+
+# SGR mouse reports (ESC [ < button ; x ; y M/m): flag bits of the button number
+MOUSE_MOTION = 32
+MOUSE_WHEEL = 64
+MOUSE_NO_BUTTON = 3  # Button number of a motion report with nothing held
+
+
+class MouseEvent:
+    """
+    A decoded mouse report. kind is 'press', 'drag', 'release' or 'wheel';
+    button is 0 (left), 1 (middle) or 2 (right), or for the wheel 0 (up)
+    and 1 (down); x and y are 0-based cells.
+    """
+    def __init__(self, kind, button, x, y):
+        self.kind = kind
+        self.button = button
+        self.x = x
+        self.y = y
+
+    def __repr__(self):
+        return f"MouseEvent({self.kind!r}, {self.button}, {self.x}, {self.y})"
+
+
+class ByteRing:
+    """
+    A fixed-size ring buffer that input bytes are read straight into with
+    os.readv, so draining the terminal allocates nothing. Bytes come back
+    out in order through chunks().
+    """
+    def __init__(self, capacity=INPUT_BUFFER_SIZE):
+        self.data = bytearray(capacity)
+        self.view = memoryview(self.data)
+        self.start = 0
+        self.length = 0
+
+    def __len__(self):
+        return self.length
+
+    def free_space(self):
+        """Returns the free regions, in order, as a list of at most two memoryviews."""
+        capacity = len(self.data)
+        end = (self.start + self.length) % capacity
+        if self.length == capacity:
+            return []
+        if end >= self.start:
+            return [region for region in (self.view[end:], self.view[:self.start]) if region]
+        return [self.view[end:self.start]]
+
+    def read_from(self, fd):
+        """
+        Reads whatever the descriptor has ready, without blocking, until it
+        runs dry or the ring is full. Returns False on end of file.
+        """
+        while self.length < len(self.data) and select.select([fd], [], [], 0)[0]:
+            count = os.readv(fd, self.free_space())
+            if not count:
+                return False
+            self.length += count
+        return True
+
+    def chunks(self):
+        """Takes every buffered byte out of the ring, as at most two memoryviews."""
+        capacity = len(self.data)
+        end = self.start + self.length
+        if end <= capacity:
+            chunks = [self.view[self.start:end]]
+        else:
+            chunks = [self.view[self.start:], self.view[:end - capacity]]
+        self.start = end % capacity
+        self.length = 0
+        return chunks
+
+
+class KeyDecoder:
+    """
+    Turns raw terminal input into key names incrementally, byte by byte.
+
+    Escape sequences (CSI `ESC [` and SS3 `ESC O`) are recognised by a
+    small state machine that keeps its place between calls, so a sequence
+    split across two reads still decodes. A lone ESC cannot be told apart
+    from the start of a sequence until more bytes arrive, so it is only
+    reported as 'ESC' once ESC_TIMEOUT has passed on the caller's clock;
+    nothing ever waits for it.
+
+    SGR mouse reports are collected separately as MouseEvents. Consecutive
+    drag reports of the same button collapse into the latest one, so a fast
+    drag costs one event per poll rather than hundreds.
+    """
+    def __init__(self, esc_timeout=ESC_TIMEOUT):
+        self.esc_timeout = esc_timeout
+        self.state = GROUND
+        self.sequence = bytearray()  # Parameter and intermediate bytes of the current sequence
+        self.esc_time = None
+        self.text = codecs.getincrementaldecoder('utf-8')(errors='ignore')
+        self.keys = []
+        self.mouse_events = []
+
+    def feed(self, data, now):
+        """Decodes a bytes-like chunk of input that arrived at time now (in seconds)."""
+        for byte in data:
+            self._decode(byte, now)
+
+    def poll(self, now):
+        """Returns (and forgets) the keys decoded so far, reporting a pending ESC that has timed out."""
+        if self.state == ESCAPE and now - self.esc_time >= self.esc_timeout:
+            self.keys.append('ESC')
+            self.state = GROUND
+        keys, self.keys = self.keys, []
+        return keys
+
+    def esc_deadline(self):
+        """When a pending lone ESC times out into a key press, or None if there is none."""
+        if self.state == ESCAPE:
+            return self.esc_time + self.esc_timeout
+        return None
+
+    def poll_mouse(self):
+        """Returns (and forgets) the mouse events decoded so far."""
+        events, self.mouse_events = self.mouse_events, []
+        return events
+
+    def _decode(self, byte, now):
+        """Advances the state machine by one byte."""
+        state = self.state
+        if state == GROUND:
+            if byte == ESC:
+                self.state, self.esc_time = ESCAPE, now
+            elif byte in CONTROL_KEYS:
+                self.keys.append(CONTROL_KEYS[byte])
+            elif byte < 0x80:
+                self.keys.append(chr(byte))
+            else:
+                char = self.text.decode(bytes((byte,)))
+                if char:
+                    self.keys.append(char)
+        elif state == ESCAPE:
+            if byte == ord('['):
+                self.state = CSI
+                self.sequence.clear()
+            elif byte == ord('O'):
+                self.state = SS3
+            else:
+                # Not a sequence after all: the ESC was a key of its own
+                self.keys.append('ESC')
+                self.state = GROUND
+                self._decode(byte, now)
+        elif state == CSI:
+            if 0x40 <= byte <= 0x7e:
+                self.state = GROUND
+                self._finish_csi(bytes(self.sequence), chr(byte))
+            elif 0x20 <= byte <= 0x3f and len(self.sequence) < MAX_SEQUENCE_LENGTH:
+                self.sequence.append(byte)
+            else:
+                self.state = GROUND
+        else:  # SS3
+            self.state = GROUND
+            key = FINAL_KEYS.get(chr(byte))
+            if key:
+                self.keys.append(key)
+
+    def _finish_csi(self, params, final):
+        """Handles a complete CSI sequence; unknown ones are ignored."""
+        if params.startswith(b'<') and final in 'Mm':
+            self._finish_mouse(params[1:], final)
+            return
+        if final == '~':
+            number = params.split(b';')[0]
+            key = TILDE_KEYS.get(int(number)) if number.isdigit() else None
+        else:
+            key = FINAL_KEYS.get(final)
+        if key:
+            self.keys.append(key)
+
+    def _finish_mouse(self, params, final):
+        """Decodes the `button;x;y` of an SGR mouse report ending in M (press/motion) or m (release)."""
+        fields = params.split(b';')
+        if len(fields) != 3 or not all(field.isdigit() for field in fields):
+            return
+        code, x, y = (int(field) for field in fields)
+        button = code & 3
+        if final == 'm':
+            kind = 'release'
+        elif code & MOUSE_WHEEL:
+            kind = 'wheel'
+        elif code & MOUSE_MOTION:
+            if button == MOUSE_NO_BUTTON:
+                return  # Plain movement; only reported in any-motion mode, which we don't use
+            kind = 'drag'
+        else:
+            kind = 'press'
+        event = MouseEvent(kind, button, x - 1, y - 1)
+        previous = self.mouse_events[-1] if self.mouse_events else None
+        if kind == 'drag' and previous and previous.kind == 'drag' and previous.button == button:
+            self.mouse_events[-1] = event
+        else:
+            self.mouse_events.append(event)
@@ -1,6 +1,9 @@
 import random
 from colorama import Fore, Back
-from ascii_art import COLOR_ADJUSTMENTS
+from palette import fg_id, LIGHT_MODE
+from config import FRAME_RATE
+from clock import interpolate
+from sprites import get_sprite
 
 # --- Jellyfish Configuration ---
 COLOR_CHOICES = [Fore.MAGENTA, Fore.CYAN, Fore.LIGHTBLUE_EX, Fore.LIGHTMAGENTA_EX, Fore.LIGHTCYAN_EX]
@@ -108,9 +111,12 @@ JELLYFISH_ART = [
 
 class Jellyfish:
     """Represents a single, animated jellyfish. Designed to be imported."""
-    def __init__(self, width, height):
+    layer = 'jellyfish'
+
+    def __init__(self, width, height, background_color):
         self.width = width
         self.height = height
+        self.background_color = background_color
         self.speed = random.uniform(0.1, 0.4)
 
         self.animation_speed = random.uniform(0.1, 0.5) 
@@ -122,70 +128,59 @@ class Jellyfish:
             self.tentacle_color = random.choice(COLOR_CHOICES)
 
         self.current_frame_index = random.randint(0, len(JELLYFISH_ART) - 1)
-        self.animation_frames = self._process_frames()
-        self.art_height = len(self.animation_frames[0])
-        self.art_width = max(len(line) for line in self.animation_frames[0])
+        self.animation_frames = [get_sprite(frame_art) for frame_art in JELLYFISH_ART]
+        self.art_height = self.animation_frames[0].height
+        self.art_width = self.animation_frames[0].width
+        # Animation frames differ in size; bounds cover the largest of them
+        self.extent = (max(frame.width for frame in self.animation_frames),
+                       max(frame.height for frame in self.animation_frames))
         self.x = float(random.randint(0, width - self.art_width))
         self.y = float(random.randint(0, height - self.art_height))
+        self.prev_x, self.prev_y = self.x, self.y
+
+        # Per-row colors (bell on top, tentacles below), resolved once for each background mode
+        bell_id, tentacle_id = fg_id(self.bell_color), fg_id(self.tentacle_color)
+        self.row_colors = self._build_row_colors(bell_id, tentacle_id)
+        self.light_row_colors = self._build_row_colors(LIGHT_MODE[bell_id], LIGHT_MODE[tentacle_id])
 
-    def _process_frames(self):
-        processed_frames = []
-        for frame_art in JELLYFISH_ART:
-            colored_frame = []
-            for i, line in enumerate(frame_art):
-                colored_line = []
-                color = self.bell_color if i < 3 else self.tentacle_color
-                for char in line:
-                    colored_line.append((char, color))
-                colored_frame.append(colored_line)
-            processed_frames.append(colored_frame)
-        return processed_frames
-
-    def update(self):
-        self.animation_counter += self.animation_speed
+    def _build_row_colors(self, bell_id, tentacle_id):
+        """Returns a palette color ID for every row of art: the first three rows are the bell."""
+        return tuple(bell_id if i < 3 else tentacle_id for i in range(self.art_height))
+
+    def update(self, dt=FRAME_RATE):
+        step = dt / FRAME_RATE
+        self.prev_x, self.prev_y = self.x, self.y
+        self.animation_counter += self.animation_speed * step
         if self.animation_counter >= 1:
             self.current_frame_index = (self.current_frame_index + 1) % len(self.animation_frames)
             self.animation_counter -= 1 # Reset counter, keeping remainder
-        self.y -= self.speed
+        self.y -= self.speed * step
         if self.y < -self.art_height:
             self.y = self.height
             self.x = float(random.randint(0, self.width - self.art_width))
-
-    def get_current_art(self, background_color):
-        """
-        Returns the current animation frame.
-        If in light mode, it dynamically adjusts colors before returning.
-        """
-        frame_with_original_colors = self.animation_frames[self.current_frame_index]
-
-        # If we are not in light mode, return the pre-calculated frame
-        if background_color != Back.LIGHTCYAN_EX:
-            return frame_with_original_colors
-
-        # If we are in light mode, create a new frame with adjusted colors
-        adjusted_frame = []
-        for line in frame_with_original_colors:
-            adjusted_line = []
-            for char, original_color in line:
-                # Look up the adjustment, defaulting to original color if no adjustment is needed
-                adjusted_color = COLOR_ADJUSTMENTS.get('light_mode', {}).get(original_color, original_color)
-                adjusted_line.append((char, adjusted_color))
-            adjusted_frame.append(adjusted_line)
-
-        return adjusted_frame
-    
-    def draw(self, buffer, background_color):
-        """Draws the jellyfish onto the provided buffer."""
-        x, y = int(self.x), int(self.y)
-        # Get the correctly colored art for the current background
-        art_grid = self.get_current_art(background_color)
-        
-        for line_idx, line_data in enumerate(art_grid):
-            current_y = y + line_idx
-            if 0 <= current_y < self.height:
-                for char_idx, (char_art, color) in enumerate(line_data):
-                    current_x = x + char_idx
-                    if char_art != ' ' and 0 <= current_x < self.width:
-                        # This rule makes jellyfish appear behind other creatures
-                        if buffer[current_y][current_x][0] == ' ':
-                            buffer[current_y][current_x] = (char_art, color)
\ No newline at end of file
+            self.prev_x, self.prev_y = self.x, self.y
+
+    def resize(self, width, height):
+        """Fits the jellyfish to a resized aquarium, keeping its relative position."""
+        self.x = self.prev_x = min(max(0.0, self.x * width / self.width), float(max(0, width - self.art_width)))
+        self.y = self.prev_y = self.y * height / self.height
+        self.width, self.height = width, height
+
+    def get_bounds(self):
+        """Returns the jellyfish's bounding box as (x, y, width, height)."""
+        return (self.x, self.y) + self.extent
+
+    def get_previous_bounds(self):
+        """Returns the bounding box at the previous simulation step."""
+        return (self.prev_x, self.prev_y) + self.extent
+
+    def get_current_art(self):
+        """Returns the compiled sprite for the current animation frame."""
+        return self.animation_frames[self.current_frame_index]
+
+    def draw(self, buffer, alpha=1.0):
+        """Draws the jellyfish onto the provided buffer (its layer keeps it behind other creatures)."""
+        row_colors = self.light_row_colors if self.background_color == Back.LIGHTCYAN_EX else self.row_colors
+        x = interpolate(self.prev_x, self.x, alpha)
+        y = interpolate(self.prev_y, self.y, alpha)
+        buffer.blit(self.get_current_art(), int(x), int(y), None, row_fg=row_colors)
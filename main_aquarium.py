@@ -1,38 +1,47 @@
-import random
 import time
+IMPORT_STARTED = time.perf_counter()  # Origin of the startup timings
+import random
 import os
 import sys
 import math
 from colorama import Fore, Back, Style, init
-import pygame
 import atexit
+import signal
 
 # Import our modular classes
 from jellyfish_module import Jellyfish
 from fish import Fish
+from fish_population import FishPopulation
 from puffer import PufferFish
 from school import School
 from crab import Crab
-from bubble import Bubble, ClickBubble
+from bubble import BubbleSystem
 from seaweed import Seaweed
 from decoration import Decoration, generate_decorations
 from floor import Floor
 from food import FoodPellet
 from cross_platform_input import create_input_handler
+from renderer import DiffRenderer
+from terminal_caps import TerminalCapabilities, detect_capabilities
+from frame_writer import FrameWriter
+from quality import QualityController, LOW_FPS, NO_AMBIENT_BUBBLES, MERGED_COLORS, PARTIAL_ROWS
+from frame_buffer import FrameBuffer
+from compositor import Compositor
+from palette import fg_id, bg_id
+from sprites import precompile_sprites
+from clock import SimulationClock
+from spatial import SpatialHash
+from audio import AudioAssets, RateLimiter
+from profiler import FrameProfiler
 
 # Import configuration
 from config import *
 
-try:
-    import pygame
-    PYGAME_AVAILABLE = True
-except ImportError:
-    PYGAME_AVAILABLE = False
-    print("Warning: pygame not available. Sound will be disabled.")
-
 # Initialize colorama
 init(autoreset=True)
 
+IMPORT_SECONDS = time.perf_counter() - IMPORT_STARTED
+
 def resource_path(relative_path):
     """ Get absolute path to resource, works for dev and for PyInstaller """
     try:
@@ -44,64 +53,98 @@ def resource_path(relative_path):
 
 class Aquarium:
     """Manages the entire scene, all objects, and the animation loop."""
-    def __init__(self):
-        self.set_terminal_size()
+    def __init__(self, size=None, headless=False, stream=None):
+        """
+        size overrides the detected terminal size as (width, height).
+        headless=True skips raw-mode input and audio entirely, and stream
+        replaces stdout as the frame sink (a binary stream, used by the
+        benchmarks).
+        """
+        self.startup_times = {'import': IMPORT_SECONDS}
+        init_started = time.perf_counter()
+        if size:
+            self.width, self.height = size
+        else:
+            self.set_terminal_size()
+        self.headless = headless
         self.time_step = 0
+        self.steps_simulated = 0  # Counts update() calls; tells the compositor when a new step is drawn
         self.background_colors = [Back.BLACK, Back.LIGHTCYAN_EX]
         self.current_background = BACKGROUND_COLOR
         self.paused = False
-
-        self.input_handler = create_input_handler()
-        atexit.register(self.cleanup)
+        self.running = True  # Cleared by ESC/q to leave the main loop
+        self.injected_keys = []  # Key presses from outside the terminal (the control socket)
+        self.resize_requested_at = None  # When the last SIGWINCH arrived, until the scene is reflowed
+        # Probed before the input handler takes over stdin; headless output keeps the defaults
+        self.capabilities = TerminalCapabilities() if headless else detect_capabilities()
+        self.diff_renderer = DiffRenderer(stream=stream, diff_enabled=DIFF_RENDERING, capabilities=self.capabilities)
+        self.renderer = self.diff_renderer
+        if THREADED_OUTPUT and not headless:
+            # A slow terminal only costs dropped frames, never a stalled loop
+            self.renderer = FrameWriter(self.diff_renderer)
+        self.quality = QualityController() if ADAPTIVE_QUALITY else None
+        self.quality_level = 0
+        self.frame = FrameBuffer(self.width, self.height)
+        self.compositor = Compositor()
+        for name, z, only_empty, static in SCENE_LAYERS:
+            self.compositor.add_layer(name, z, only_empty=only_empty, static=static)
+        self.compositor.layers['help'].draw_callback = self.draw_help_layer
+        self.compositor.layers['hud'].draw_callback = self.draw_hud_layer
+        # Only times anything while the HUD is showing (or a benchmark asks for it)
+        self.profiler = FrameProfiler(enabled=PROFILER_HUD)
+        self.diff_renderer.profiler = self.profiler
+        self.hud_visible = PROFILER_HUD
+        self.hud_rect = None  # (x0, y0, x1, y1) box the HUD was last drawn in
+        self.clock = SimulationClock()
+        self.spatial_index = SpatialHash()
+        self.spatial_index_dirty = True
+        precompile_sprites()
 
         self.sound_on = False  # Sound is off by default
-        self.sound = None
-        self.bubble_sound_buffer = None # <-- Will store raw audio data
-        self.mixer_props = None
-        self.puffer_sound = None
-
-        try:
-            pygame.mixer.init()
-            sound_file_path = resource_path(DEFAULT_SOUND_PATH)
-            self.sound = pygame.mixer.Sound(sound_file_path)
-            print("Sound loaded successfully. Press 's' to play/stop.")
-            try:
-                bubble_sound_path = resource_path(BUBBLE_SOUND_PATH)
-                bubble_sound_obj = pygame.mixer.Sound(bubble_sound_path)
-                self.bubble_sound_buffer = bubble_sound_obj.get_raw()
-                self.mixer_props = pygame.mixer.get_init() # Get frequency, bit size, channels
-                print("Bubble sound effect loaded successfully.")
-            except Exception:
-                print(f"Could not load bubble sound effect.")
-                self.bubble_sound_buffer = None
-            try:
-                puffer_sound_path = resource_path(PUFFER_INFLATE_SOUND_PATH)
-                self.puffer_sound = pygame.mixer.Sound(puffer_sound_path)
-                print("Pufferfish sound effect loaded successfully.")
-            except Exception:
-                print(f"Could not load pufferfish sound effect.")
-                self.puffer_sound = None
-            try:
-                chest_sound_path = resource_path(CHEST_OPEN_SOUND_PATH)
-                self.chest_sound = pygame.mixer.Sound(chest_sound_path)
-                print("Chest sound effect loaded successfully.")
-            except Exception:
-                print(f"Could not load chest sound effect.")
-                self.chest_sound = None
-        except Exception as e:
-            print(f"Could not load sound file: {e}")
-            print("Sound will be unavailable.")
+        self.sound_requested = False  # 's' was pressed before the audio finished loading
+        # Decoded in the background; sound stays unavailable until it is ready
+        self.audio = AudioAssets(resource_path, origin=IMPORT_STARTED)
+        self.bubble_sound_limiter = RateLimiter(BUBBLE_SOUND_RATE, BUBBLE_SOUND_BURST)
+        self.last_trail_time = float('-inf')  # When the mouse last left a bubble burst behind
+
+        self.input_handler = None
+        if not headless:
+            self.input_handler = create_input_handler()
+            atexit.register(self.cleanup)
+            self.audio.start()
 
         self.generate_new_scene()
-
-    def generate_new_scene(self):
-        """Generates a completely new scene with randomized elements."""
+        self.startup_times['init'] = time.perf_counter() - init_started
+
+    def startup_report(self):
+        """Returns a one-line summary of how long startup took, in milliseconds since the first import."""
+        times = self.startup_times
+        parts = [f"import {times['import'] * 1000:.0f} ms", f"init {times['init'] * 1000:.0f} ms"]
+        if 'first_frame' in times:
+            parts.append(f"first frame at {times['first_frame'] * 1000:.0f} ms")
+        audio = self.audio.timings
+        if self.audio.ready.is_set():
+            parts.append(f"audio {self.audio.status}: pygame import {audio.get('pygame_import', 0) * 1000:.0f} ms, "
+                         f"load {audio['load'] * 1000:.0f} ms, ready at {audio['ready_at'] * 1000:.0f} ms")
+        else:
+            parts.append(f"audio {self.audio.status}")
+        return "Startup: " + " | ".join(parts)
+
+    def generate_new_scene(self, num_fish=None, num_schools=None, num_bubbles=None, num_jellyfish=None):
+        """
+        Generates a completely new scene with randomized elements.
+        Any of the entity counts can be pinned instead of randomized.
+        """
         # Randomize scene parameters
-        num_fish = random.randint(MIN_FISH, MAX_FISH)
-        num_bubbles = random.randint(15, 25)
-        num_jellyfish = random.randint(0, 6)
+        if num_fish is None:
+            num_fish = random.randint(MIN_FISH, MAX_FISH)
+        if num_bubbles is None:
+            num_bubbles = random.randint(15, 25)
+        if num_jellyfish is None:
+            num_jellyfish = random.randint(0, 6)
         num_seaweed = random.randint(8, 18)
-        num_schools = random.randint(0, 3)
+        if num_schools is None:
+            num_schools = random.randint(0, 3)
         crab_spawn_chance = random.uniform(0.3, 0.8)  # 30-80% chance
         self.food_pellets = []
         self.food_notice_timer = 0 
@@ -114,10 +157,12 @@ class Aquarium:
             num_fish -= 1
         for _ in range(num_fish):
             self.fishes.append(Fish(self.width, self.height, self.current_background))
+        self.fish_population = FishPopulation(self.fishes, Fish) if VECTORIZED_FISH else None
         self.schools = [School(self.width, self.height, self.current_background) for _ in range(num_schools)]
-        self.bubbles = [Bubble(self.width, self.height) for _ in range(num_bubbles)]
-        self.click_bubbles = []  # List for temporary click-generated bubbles
-        self.jellyfishes = [Jellyfish(self.width, self.height) for _ in range(num_jellyfish)]
+        self.bubbles = BubbleSystem(self.width, self.height, ambient=True, capacity=num_bubbles)
+        self.bubbles.add_ambient(num_bubbles)
+        self.click_bubbles = BubbleSystem(self.width, self.height)  # Temporary click-generated bubbles
+        self.jellyfishes = [Jellyfish(self.width, self.height, self.current_background) for _ in range(num_jellyfish)]
         
         # Spawn crab based on random chance
         if random.random() < crab_spawn_chance:
@@ -135,46 +180,62 @@ class Aquarium:
         self.time_step = 0
 
         self.floor = Floor(self.width, self.height)
+        self.spatial_index_dirty = True
+        self.add_scene_to_compositor()
+
+    def add_scene_to_compositor(self):
+        """Hands every drawable in the scene to the compositor; each one names its own layer."""
+        compositor = self.compositor
+        compositor.clear()
+        fish_drawables = self.fishes
+        if self.fish_population:
+            fish_drawables = self.fish_population.unmanaged + [self.fish_population]
+        ambient_bubbles = [self.bubbles] if self.quality_level < NO_AMBIENT_BUBBLES else []
+        for drawable in [*self.seaweeds, *self.decorations, *ambient_bubbles, self.click_bubbles,
+                         *self.food_pellets, *self.jellyfishes, *self.schools, *fish_drawables,
+                         *([self.crab] if self.crab else []), self.floor]:
+            compositor.add(drawable)
+
+    def adapt_quality(self):
+        """Lets the quality controller react to how well the terminal is keeping up."""
+        level = self.quality.sample(time.monotonic(), self.renderer)
+        if level != self.quality_level:
+            self.apply_quality(level)
+
+    def apply_quality(self, level):
+        """Applies a quality level (see quality.QUALITY_LEVELS) to the clock, scene and renderer."""
+        self.quality_level = level
+        self.clock.set_render_interval(RENDER_INTERVAL * (QUALITY_FPS_DIVISOR if level >= LOW_FPS else 1))
+
+        # Ambient bubbles keep rising either way; they are just not drawn
+        show_bubbles = level < NO_AMBIENT_BUBBLES
+        if show_bubbles != (self.bubbles in self.compositor.layers['bubbles'].drawables):
+            if show_bubbles:
+                self.compositor.add(self.bubbles)
+            else:
+                self.compositor.remove(self.bubbles)
 
-    def play_sound_segment(self, raw_buffer, duration_sec):
-        """Plays a random segment of a raw audio buffer."""
-        if not raw_buffer or not self.sound_on or not self.mixer_props:
-            return
-
-        frequency, size, channels = self.mixer_props
-        bytes_per_sample = abs(size) // 8 # e.g., 16-bit audio -> 2 bytes
-        bytes_per_second = frequency * channels * bytes_per_sample
-
-        total_len_bytes = len(raw_buffer)
-        clip_len_bytes = int(duration_sec * bytes_per_second)
-
-        # Ensure we don't try to play a clip longer than the file
-        if clip_len_bytes >= total_len_bytes:
-            start_byte = 0
-        else:
-            max_start_byte = total_len_bytes - clip_len_bytes
-            start_byte = random.randint(0, max_start_byte)
-
-        # Align start byte to the sample frame to prevent clicks/pops
-        sample_frame_size = bytes_per_sample * channels
-        start_byte = (start_byte // sample_frame_size) * sample_frame_size
+        self.diff_renderer.merge_colors = level >= MERGED_COLORS
+        self.diff_renderer.row_budget = max(1, int(self.height * QUALITY_ROW_FRACTION)) if level >= PARTIAL_ROWS else None
 
-        # Slice the buffer to get our random clip
-        clip_buffer = raw_buffer[start_byte : start_byte + clip_len_bytes]
+    def invalidate_scenery(self):
+        """Redraws the cached decorations layer (after a decoration changed)."""
+        self.compositor.invalidate('scenery')
 
-        # Create a new, temporary sound object from the sliced buffer and play it
-        temp_sound = pygame.mixer.Sound(buffer=clip_buffer)
-        temp_sound.play()
+    def play_bubble_sound(self):
+        """Plays a random clip of the bubble sound if sound is on, at most BUBBLE_SOUND_RATE times a second."""
+        if self.sound_on and self.audio.bubble_clips and self.bubble_sound_limiter.allow():
+            self.audio.voices.play('bubbles', random.choice(self.audio.bubble_clips))
 
     def play_puffer_sound(self):
         """Plays the pufferfish inflation sound if sound is on."""
-        if self.sound_on and self.puffer_sound:
-            self.puffer_sound.play()
+        if self.sound_on and self.audio.puffer:
+            self.audio.voices.play('puffer', self.audio.puffer)
 
     def play_chest_sound(self):
         """Plays the chest opening sound if sound is on."""
-        if self.sound_on and self.chest_sound:
-            self.chest_sound.play()
+        if self.sound_on and self.audio.chest:
+            self.audio.voices.play('chest', self.audio.chest)
 
     def drop_food(self):
         """Creates a food pellet at the top of the screen."""
@@ -183,17 +244,16 @@ class Aquarium:
             x = random.randint(buffer_zone, self.width - (buffer_zone + 1))
             pellet = FoodPellet(x, 0, self.width, self.height)
             self.food_pellets.append(pellet)
+            self.compositor.add(pellet)
             self.food_notice_timer = FOOD_NOTICE_DELAY
 
     def cleanup(self):
         """Clean up resources on exit."""
-        if hasattr(self, 'input_handler'):
+        # Stops the frame writer first, so nothing is drawn after leaving the alternate screen
+        self.renderer.close()
+        if self.input_handler:
             self.input_handler.cleanup()
-        if PYGAME_AVAILABLE:
-            try:
-                pygame.mixer.quit()
-            except Exception:
-                pass
+        self.audio.close()
 
     def set_terminal_size(self):
         """Gets the current terminal size with better error handling."""
@@ -210,31 +270,55 @@ class Aquarium:
                 self.width, self.height = DEFAULT_TERMINAL_SIZE
                 print(f"Could not detect terminal size. Using default: {self.width}x{self.height}")
 
-    def get_char_input(self):
-        """Gets a single character from input using the cross-platform handler."""
-        char = self.input_handler.get_char()
-        
-        # Handle special keys consistently across platforms
-        if char in ['CTRL_C', 'EOF']:
-            # Treat these as exit signals
-            return 'ESC'
-        elif char in ['ENTER']:
-            # You could add enter key functionality here if needed
-            return None
-        elif char in ['BACKSPACE']:
-            # You could add backspace functionality here if needed
-            return None
-        elif isinstance(char, str) and char.startswith('EXTENDED_'):
-            # Extended keys (function keys, arrow keys on Windows)
-            return None
-        elif char in ['UP', 'DOWN', 'LEFT', 'RIGHT']:
-            # Arrow keys - you could add functionality here if needed
-            return None
-        
-        return char
+    def get_input_keys(self):
+        """Gets every key pressed since the last frame using the cross-platform handler, never waiting."""
+        keys, self.injected_keys = self.injected_keys, []
+        for char in self.input_handler.get_keys(self.clock.frame_seconds):
+            # Handle special keys consistently across platforms
+            if char in ['CTRL_C', 'EOF']:
+                # Treat these as exit signals
+                keys.append('ESC')
+            elif char in ['ENTER']:
+                # You could add enter key functionality here if needed
+                continue
+            elif char in ['BACKSPACE']:
+                # You could add backspace functionality here if needed
+                continue
+            elif char.startswith('EXTENDED_'):
+                # Extended keys (function keys, arrow keys on Windows)
+                continue
+            elif char in ['UP', 'DOWN', 'LEFT', 'RIGHT']:
+                # Arrow keys - you could add functionality here if needed
+                continue
+            else:
+                keys.append(char)
+        return keys
+
+    def handle_mouse(self, events):
+        """
+        Turns one frame's mouse events into bubble bursts: one at each left
+        click, plus a trail while dragging, at most one burst every
+        MOUSE_TRAIL_INTERVAL seconds at the latest drag position. No more than
+        MOUSE_BURSTS_PER_TICK bursts are made per frame.
+        """
+        now = self.clock.frame_seconds
+        bursts = 0
+        drag = None
+        for event in events:
+            if event.button != 0:
+                continue
+            if event.kind == 'press' and bursts < MOUSE_BURSTS_PER_TICK:
+                self.create_bubble_burst(event.x, event.y)
+                self.last_trail_time = now
+                bursts += 1
+            elif event.kind == 'drag':
+                drag = event
+        if drag and bursts < MOUSE_BURSTS_PER_TICK and now - self.last_trail_time >= MOUSE_TRAIL_INTERVAL:
+            self.create_bubble_burst(drag.x, drag.y)
+            self.last_trail_time = now
 
     def create_bubble_burst(self, x, y):
-        self.play_sound_segment(self.bubble_sound_buffer, BUBBLE_SOUND_CLIP_DURATION)
+        self.play_bubble_sound()
         """Creates a burst of bubbles at the specified location."""
         num_burst_bubbles = random.randint(*BUBBLE_BURST_COUNT_RANGE)
         for _ in range(num_burst_bubbles):
@@ -246,16 +330,17 @@ class Aquarium:
             bubble_x = max(0, min(bubble_x, self.width - 1))
             bubble_y = max(1, min(bubble_y, self.height - 2))
             
-            click_bubble = ClickBubble(bubble_x, bubble_y, self.width, self.height)
-            self.click_bubbles.append(click_bubble)
+            self.click_bubbles.add_burst_bubble(bubble_x, bubble_y)
 
         # Check if any treasure chests are near the burst and open them
-        for decoration in self.decorations:
+        index = self.get_spatial_index()
+        for decoration in index.query_radius(x, y, 20, kind='decoration'):
             if decoration.is_near_point(x, y, radius=20):
                 decoration.open_chest()
+                self.spatial_index_dirty = True
 
         # Startle fish and schools
-        for fish in self.fishes:
+        for fish in index.query_radius(x, y, STARTLE_RADIUS, kind='fish'):
             fish_center_x = fish.x + (fish.art_width / 2)
             fish_center_y = fish.y + (fish.art_height / 2)
             distance = math.sqrt((fish_center_x - x)**2 + (fish_center_y - y)**2)
@@ -263,7 +348,7 @@ class Aquarium:
             if distance <= STARTLE_RADIUS:
                 fish.startle()
         
-        for school in self.schools:
+        for school in index.query_radius(x, y, STARTLE_RADIUS, kind='school'):
             school_center_x = school.x + school.formation_width / 2
             school_center_y = school.y + school.formation_height / 2
             distance = math.sqrt((school_center_x - x)**2 + (school_center_y - y)**2)
@@ -285,135 +370,255 @@ class Aquarium:
                 school.background_color = self.current_background
             for decoration in self.decorations:
                 decoration.background_color = self.current_background
+            for jelly in self.jellyfishes:
+                jelly.background_color = self.current_background
                 
         except ValueError:
             self.current_background = self.background_colors[0]
     
     def toggle_sound(self):
         """Toggles the looping background sound on and off."""
-        if not self.sound: # Do nothing if sound failed to load
+        if not (self.audio.ready.is_set() and self.audio.ambient): # Do nothing if sound failed to load...
+            if self.audio.thread and not self.audio.ready.is_set():
+                # ...but remember the request until it has
+                self.sound_requested = not self.sound_requested
             return
             
         self.sound_on = not self.sound_on
         if self.sound_on:
-            self.sound.play(loops=-1)  # loops=-1 means loop forever
+            self.audio.voices.play('ambient', self.audio.ambient, loops=-1)  # loops=-1 means loop forever
         else:
-            self.sound.stop()
+            self.audio.voices.stop('ambient')
     
+    def on_audio_ready(self):
+        """Called once the audio has loaded: honours an 's' pressed while it was loading."""
+        if self.sound_requested:
+            self.sound_requested = False
+            self.toggle_sound()
+
     def check_terminal_resize(self):
         #Checks if terminal size has changed and updates accordingly.
         try:
             new_width, new_height = os.get_terminal_size()
             if new_width != self.width or new_height != self.height:
-                self.width, self.height = new_width, new_height
-                # Regenerate scene with new dimensions
-                self.generate_new_scene()
+                self.reflow_scene(new_width, new_height)
                 return True
         except OSError:
             pass
         return False
 
+    def reflow_scene(self, width, height):
+        """
+        Fits the current scene to a new terminal size instead of generating
+        a new one: creatures keep their relative positions, the floor is
+        extended or cut, seaweed is planted or pulled to keep its density
+        and decorations that no longer fit are dropped.
+        """
+        old_width = self.width
+        self.width, self.height = width, height
+        self.renderer.invalidate()
+        self.frame.resize(width, height)
+
+        # Drop the seaweed and decorations that are now past the right edge
+        density = len(self.seaweeds) / max(1, old_width - 3)
+        self.seaweeds = [seaweed for seaweed in self.seaweeds if seaweed.x < width - 3]
+        self.decorations = [decoration for decoration in self.decorations
+                            if decoration.x + decoration.art_width < width]
+
+        for entity in [*self.fishes, *self.schools, *self.jellyfishes, *self.food_pellets, *self.seaweeds,
+                       *self.decorations, self.bubbles, self.click_bubbles, *([self.crab] if self.crab else []),
+                       self.floor]:
+            entity.resize(width, height)
+        if self.fish_population:
+            self.fish_population.width = width
+
+        # Plant new columns with the same number of stalks per column
+        if width > old_width:
+            new_columns = range(max(0, old_width - 3), width - 3)
+            count = min(round(density * len(new_columns)), len(new_columns))
+            self.seaweeds += [Seaweed(pos, width, height) for pos in random.sample(new_columns, count)]
+
+        self.spatial_index_dirty = True
+        self.add_scene_to_compositor()
+        self.apply_quality(self.quality_level)
+
     def run(self):
-        """Starts the main animation loop."""
+        """Starts the main animation loop, event-driven where the platform allows it."""
+        if ASYNC_RUNTIME and self.input_handler.input_method == 'unix':
+            from event_runtime import EventRuntime  # Imported here to keep asyncio off the startup path
+            EventRuntime(self).run()
+        else:
+            self.run_polling()
+        self.say_goodbye()
+
+    def run_polling(self):
+        """The fallback main loop: handle input, update, draw, then sleep until the next frame."""
+        watch_resize = hasattr(signal, 'SIGWINCH')
+        if watch_resize:
+            previous_handler = signal.signal(signal.SIGWINCH, self.request_resize)
         try:
-            while True:
-                if self.time_step % 10 == 0:  # Check every 10 frames
+            self.clock.start()
+            while self.running:
+                if watch_resize:
+                    # Reflow once the size has stopped changing
+                    if self.resize_requested_at is not None and time.monotonic() - self.resize_requested_at >= RESIZE_DEBOUNCE:
+                        self.resize_requested_at = None
+                        self.check_terminal_resize()
+                elif self.time_step % 10 == 0:  # No SIGWINCH (Windows): check every 10 frames
                     self.check_terminal_resize()
-
-                input_result = self.get_char_input()
-                if input_result:
-                    # --- MODIFIED: Restructure input handling ---
-                    # Keys that should always work, even when paused
-                    if input_result.lower() == 'h':
-                        self.paused = not self.paused
-                        if self.paused:
-                            self.original_background = self.current_background
-                            self.current_background = Back.BLUE
-                        else:
-                            self.current_background = self.original_background
-                    elif input_result.lower() == 's':
-                        self.toggle_sound()
-                    elif input_result == 'ESC' or input_result == 'q':
-                        if self.sound_on and self.sound:
-                            self.sound.stop()
-                        pygame.mixer.quit()
-                        print(f"{Style.RESET_ALL}\nThanks for visiting the aquarium!")
-                        print("Press any key to close the terminal...")
-                        
-                        # Restore terminal settings before waiting
-                        self.input_handler.cleanup()
-                        
-                        # Wait for user input before closing
-                        if sys.platform == "win32":
-                            import msvcrt
-                            msvcrt.getch()
-                        else:
-                            input()  # Simple blocking input
-                        
-                        pygame.mixer.quit()
-                        sys.exit(0)
-                    
-                    # Keys that should ONLY work when the animation is running
-                    elif not self.paused:
-                        if input_result.lower() == 'm':
-                            self.toggle_background()
-                        elif input_result.lower() == 'r':
-                            self.generate_new_scene()
-                        elif input_result.lower() == 'b':
-                            random_x = random.randint(5, self.width - 5)
-                            random_y = random.randint(5, self.height - 5)
-                            self.create_bubble_burst(random_x, random_y)
-                        elif input_result.lower() == 'f':
-                            self.drop_food()
-                if not self.paused:
-                    self.update()
-                    self.time_step += 1
-                    
-                self.draw()
-                time.sleep(FRAME_RATE)
+                if self.sound_requested and self.audio.ready.is_set():
+                    self.on_audio_ready()
+
+                self.process_input()
+                if not self.running:
+                    break
+                self.advance_frame()
+                self.clock.wait_for_next_frame()
         except KeyboardInterrupt:
-            if self.sound_on and self.sound:
-                self.sound.stop()
-            pygame.mixer.quit()
-            print(f"{Style.RESET_ALL}\nThanks for visiting the aquarium!")
-            print("Press any key to close the terminal...")
-            
-            # Restore terminal settings
-            self.input_handler.cleanup()
-            
-            # Wait for user input
-            if sys.platform == "win32":
-                import msvcrt
-                msvcrt.getch()
-            else:
-                input()
-            
-            pygame.mixer.quit()
-            sys.exit(0)
-
-    def update(self):
-        """Updates the state of all objects in the aquarium."""
-        self.food_pellets = [p for p in self.food_pellets if p.update()]
+            pass
+        finally:
+            if watch_resize:
+                signal.signal(signal.SIGWINCH, previous_handler)
+
+    def request_resize(self, signum=None, frame=None):
+        """SIGWINCH handler: notes the time, the polling loop reflows once resizing settles."""
+        self.resize_requested_at = time.monotonic()
+
+    def process_input(self):
+        """Handles every key and mouse event since the last frame, in order."""
+        started = self.profiler.start()
+        for input_result in self.get_input_keys():
+            # Keys that should always work, even when paused
+            if input_result.lower() == 'h':
+                self.paused = not self.paused
+                self.compositor.invalidate('help')
+                if self.paused:
+                    self.original_background = self.current_background
+                    self.current_background = Back.BLUE
+                else:
+                    self.current_background = self.original_background
+            elif input_result.lower() == 's':
+                self.toggle_sound()
+            elif input_result.lower() == 'p':
+                self.toggle_hud()
+            elif input_result == 'ESC' or input_result == 'q':
+                self.running = False
+                return
+
+            # Keys that should ONLY work when the animation is running
+            elif not self.paused:
+                if input_result.lower() == 'm':
+                    self.toggle_background()
+                elif input_result.lower() == 'r':
+                    self.generate_new_scene()
+                elif input_result.lower() == 'b':
+                    random_x = random.randint(5, self.width - 5)
+                    random_y = random.randint(5, self.height - 5)
+                    self.create_bubble_burst(random_x, random_y)
+                elif input_result.lower() == 'f':
+                    self.drop_food()
+        mouse_events = self.input_handler.get_mouse_events()
+        if not self.paused:
+            self.handle_mouse(mouse_events)
+        self.profiler.stop('input', started)
+
+    def advance_frame(self):
+        """Runs the simulation steps due for the current frame, then draws it."""
+        # Run however many fixed simulation steps are due for this frame
+        sim_steps = self.clock.tick()
+        if not self.paused:
+            for _ in range(sim_steps):
+                self.update(self.clock.dt)
+                self.time_step += 1
+
+        # Render frames between simulation steps are interpolated;
+        # while paused nothing moves, so draw the current state as-is
+        self.draw(1.0 if self.paused else self.clock.alpha)
+        if self.quality:
+            self.adapt_quality()
+        if self.audio.voices:
+            self.audio.voices.end_tick()
+
+    def say_goodbye(self):
+        """Stops sound and output, restores the terminal and exits after a final key press."""
+        self.audio.close()
+        self.renderer.close()
+        print(f"{Style.RESET_ALL}\nThanks for visiting the aquarium!")
+        if STARTUP_REPORT:
+            print(self.startup_report())
+        print("Press any key to close the terminal...")
+        
+        # Restore terminal settings before waiting
+        self.input_handler.cleanup()
+        
+        # Wait for user input before closing
+        if sys.platform == "win32":
+            import msvcrt
+            msvcrt.getch()
+        else:
+            input()  # Simple blocking input
+        
+        sys.exit(0)
+
+    def update(self, dt=SIM_TIMESTEP):
+        """Advances the state of all objects in the aquarium by one simulation step of dt seconds."""
+        profiler = self.profiler
+        step_started = profiler.start()
+        self.steps_simulated += 1
+        expired = [pellet for pellet in self.food_pellets if not pellet.update(dt)]
+        for pellet in expired:
+            self.food_pellets.remove(pellet)
+            self.compositor.remove(pellet)
 
         if self.food_notice_timer > 0:
-            self.food_notice_timer -= FRAME_RATE
+            self.food_notice_timer -= dt
             if self.food_notice_timer <= 0 and self.food_pellets:
                 self._notify_fish_of_food()
 
-        for fish in self.fishes:
-            fish.update()
+        # Each entity group is timed separately while profiling
+        lap = profiler.start()
+        if self.fish_population:
+            self.fish_population.update(dt)
+            for fish in self.fish_population.unmanaged:
+                fish.update(dt)
+        else:
+            for fish in self.fishes:
+                fish.update(dt)
+        lap = profiler.stop('fish', lap)
         for school in self.schools:
-            school.update()
-        for bubble in self.bubbles:
-            bubble.update()
+            school.update(dt)
+        lap = profiler.stop('schools', lap)
+        self.bubbles.update(dt)
         
         # Update click bubbles and remove expired ones
-        self.click_bubbles = [bubble for bubble in self.click_bubbles if bubble.update()]
+        self.click_bubbles.update(dt)
+        lap = profiler.stop('bubbles', lap)
         
         for jelly in self.jellyfishes: 
-            jelly.update()
+            jelly.update(dt)
+        lap = profiler.stop('jellyfish', lap)
+        for seaweed in self.seaweeds:
+            seaweed.update(dt)
+        profiler.stop('seaweed', lap)
         if self.crab:
-            self.crab.update()            
+            self.crab.update(dt)
+        self.spatial_index_dirty = True
+        profiler.stop('update', step_started)
+
+    def get_spatial_index(self):
+        """
+        Returns the spatial index of fish, schools and decorations for the
+        current simulation step. It is rebuilt at most once per step, and
+        only when something actually asks a proximity question.
+        """
+        if self.spatial_index_dirty:
+            index = self.spatial_index
+            index.clear()
+            for kind, entities in (('fish', self.fishes), ('school', self.schools), ('decoration', self.decorations)):
+                for entity in entities:
+                    index.insert(entity, kind, *entity.get_bounds())
+            self.spatial_index_dirty = False
+        return self.spatial_index
 
     def _notify_fish_of_food(self):
         """Finds all fish within a radius of the food and tells them to seek it."""
@@ -422,7 +627,7 @@ class Aquarium:
 
         pellet = self.food_pellets[0]
         
-        for fish in self.fishes:
+        for fish in self.get_spatial_index().query_radius(pellet.x, pellet.y, FOOD_NOTICE_RADIUS, kind='fish'):
             if isinstance(fish, PufferFish): continue
             
             dist = math.sqrt((fish.x - pellet.x)**2 + (fish.y - pellet.y)**2)
@@ -439,8 +644,10 @@ class Aquarium:
             "║   M - Toggle Day/Night Mode  ║",
             "║   R - Randomize New Scene    ║",
             "║   B - Create Bubble Burst    ║",
+            "║   Click - Bubbles At Mouse   ║",
             "║   F - Drop Food Pellet       ║",
             "║   S - Toggle Sound On/Off    ║",
+            "║   P - Toggle Profiler HUD    ║",
             "║   H - Toggle This Help Menu  ║",
             "║                              ║",
             "║    ESC/Q - Exit Aquarium     ║",
@@ -456,87 +663,73 @@ class Aquarium:
         if start_x < 0 or start_y < 0: return # Failsafe for tiny terminals
 
         # Draw the solid background box
-        for y in range(start_y, start_y + box_height):
-            if 0 <= y < self.height:
-                for x in range(start_x, start_x + box_width):
-                    if 0 <= x < self.width:
-                        buffer[y][x] = (' ', Back.BLUE)
+        box_color = bg_id(Back.BLUE)
+        buffer.fill_rect(start_x, start_y, box_width, box_height, bg=box_color)
 
         # Draw the text on top of the box
+        text_color = fg_id(Fore.LIGHTYELLOW_EX)
         for y_offset, line in enumerate(help_text):
-            y = start_y + y_offset
-            if 0 <= y < self.height:
-                for x_offset, char in enumerate(line):
-                    x = start_x + x_offset
-                    if 0 <= x < self.width:
-                        buffer[y][x] = (char, Fore.LIGHTYELLOW_EX + Back.BLUE)
-
-    def draw(self):
-        """Draws the entire scene to the terminal."""
-        buffer = [[(' ', Fore.RESET) for _ in range(self.width)] for _ in range(self.height)]
-
-        # 1. Draw Seaweed
-        for seaweed in self.seaweeds:
-            seaweed.draw(buffer, self.time_step)
-
-        # 2. Draw Decorations
-        for decoration in self.decorations:
-            decoration.draw(buffer)
-
-        # 3. Draw Bubbles (regular)
-        for bubble in self.bubbles:
-            bubble.draw(buffer)
-
-        # 3b. Draw Click Bubbles (temporary)
-        for bubble in self.click_bubbles:
-            bubble.draw(buffer)
-
-        for pellet in self.food_pellets: pellet.draw(buffer)
-
-        # 4. Draw Jellyfish
-        for jelly in self.jellyfishes:
-            jelly.draw(buffer, self.current_background)
-
-        # 5. Draw Schools
-        for school in self.schools:
-            school.draw(buffer)
-
-        # 6. Draw Fish
-        for fish in self.fishes:
-            fish.draw(buffer)
-
-        # 7. Draw Crab (on seafloor, before ocean floor)
-        if self.crab:
-            self.crab.draw(buffer)
-
-        # 8. Draw the ocean floor
-        """floor_y = self.height - 1
-        if 0 <= floor_y < self.height:
-            for i in range(self.width):
-                buffer[floor_y][i] = ('~', Fore.YELLOW)"""
-        self.floor.draw(buffer)
+            buffer.put_text(start_x, start_y + y_offset, line, text_color, bg=box_color, transparent=False)
 
+    def draw_help_layer(self, buffer):
+        """Draws the help screen layer, which is only visible while paused."""
         if self.paused:
             self.draw_help_screen(buffer)
 
-        # Render the buffer to a single string
-        output_lines = []
-        for y in range(self.height):
-            line_str = ""
-            current_color = None
-            for x in range(self.width):
-                char, color = buffer[y][x]
-                if color != current_color:
-                    line_str += color
-                    current_color = color
-                line_str += char
-            output_lines.append(line_str)
-        final_output = "\n".join(output_lines)
-
-        # Print the final frame
-        clear_and_draw_command = f"{self.current_background}\033[2J\033[H{final_output}"
-        sys.stdout.write(clear_and_draw_command)
-        sys.stdout.flush()
+    def toggle_hud(self):
+        """Shows or hides the profiler HUD; the profiler only records while it is visible."""
+        self.hud_visible = not self.hud_visible
+        if self.hud_visible:
+            self.profiler.enable()
+        else:
+            self.profiler.disable()
+        self.hud_rect = None
+        self.compositor.invalidate('hud')
+
+    def draw_hud(self, buffer):
+        """Draws the profiler's numbers in a box in the top-left corner."""
+        counts = {
+            'fish': len(self.fishes),
+            'schools': len(self.schools),
+            'bubbles': len(self.bubbles) + len(self.click_bubbles),
+            'jellyfish': len(self.jellyfishes),
+            'seaweed': len(self.seaweeds),
+        }
+        lines = self.profiler.report_lines(counts)
+        box_width = max(len(line) for line in lines) + 2
+        box_height = len(lines)
+        self.hud_rect = (0, 0, box_width, box_height)
+
+        box_color = bg_id(Back.BLACK)
+        buffer.fill_rect(0, 0, box_width, box_height, bg=box_color)
+        text_color = fg_id(Fore.LIGHTGREEN_EX)
+        for y_offset, line in enumerate(lines):
+            buffer.put_text(1, y_offset, line, text_color, bg=box_color, transparent=False)
+
+    def draw_hud_layer(self, buffer):
+        """Draws the HUD layer, which is only visible while toggled on."""
+        if self.hud_visible:
+            self.draw_hud(buffer)
+
+    def draw(self, alpha=1.0):
+        """
+        Draws the entire scene to the terminal. Moving creatures are drawn
+        alpha (0..1) of the way between their last two simulation positions.
+        The compositor stacks the layers; see SCENE_LAYERS for the order.
+        """
+        profiler = self.profiler
+        started = profiler.start()
+        if self.hud_visible and self.hud_rect:
+            # The HUD's numbers change every frame
+            self.compositor.layers['hud'].mark_dirty((self.hud_rect,))
+        dirty_rects = self.compositor.compose(self.frame, bg_id(self.current_background), alpha,
+                                              step=self.steps_simulated)
+        profiler.stop('compose', started)
+
+        # Send only what changed since the last frame to the terminal
+        self.renderer.render(self.frame, self.current_background, dirty_rects)
+        if 'first_frame' not in self.startup_times:
+            self.startup_times['first_frame'] = time.perf_counter() - IMPORT_STARTED
 
 
 if __name__ == "__main__":
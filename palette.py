@@ -0,0 +1,123 @@
+import functools
+import numpy as np
+from colorama import Fore, Back
+from ascii_art import COLOR_ADJUSTMENTS
+
+# --- Palette ---
+# Every colorama foreground and background color is interned into a small
+# integer ID. Frame cells store these IDs, and the SGR parameters for each ID
+# are precomputed so the encoder never has to parse escape strings.
+
+def _sgr_parameter(escape):
+    """Extracts the numeric SGR parameter from a colorama escape string ('\\x1b[33m' -> '33')."""
+    return escape[2:-1]
+
+
+def _build_table(ansi_codes):
+    """Interns every color exposed by a colorama Fore/Back object, RESET first."""
+    names = ['RESET'] + sorted(name for name in vars(type(ansi_codes)) if name.isupper() and name != 'RESET')
+    escapes = []
+    for name in names:
+        escape = getattr(ansi_codes, name)
+        if escape not in escapes:
+            escapes.append(escape)
+    ids = {escape: idx for idx, escape in enumerate(escapes)}
+    parameters = tuple(_sgr_parameter(escape) for escape in escapes)
+    return ids, parameters
+
+
+_FG_IDS, FG_PARAMETERS = _build_table(Fore)
+_BG_IDS, BG_PARAMETERS = _build_table(Back)
+
+FG_RESET = _FG_IDS[Fore.RESET]
+BG_RESET = _BG_IDS[Back.RESET]
+
+
+def fg_id(color):
+    """Returns the palette ID for a colorama foreground color."""
+    return _FG_IDS[color]
+
+
+def bg_id(color):
+    """Returns the palette ID for a colorama background color."""
+    return _BG_IDS[color]
+
+
+def _build_light_mode_table():
+    """Turns the light mode color adjustments into an ID -> ID lookup table."""
+    table = np.arange(len(FG_PARAMETERS), dtype=np.uint8)
+    for original, adjusted in COLOR_ADJUSTMENTS.get('light_mode', {}).items():
+        table[fg_id(original)] = fg_id(adjusted)
+    table.flags.writeable = False
+    return table
+
+
+# Indexed by foreground ID; a NumPy array so whole frames can be remapped at once.
+LIGHT_MODE = _build_light_mode_table()
+
+
+def _build_merged_table():
+    """
+    Maps every bright (LIGHT*_EX) foreground ID onto its normal variant,
+    except grey, which would turn black and vanish on the dark background.
+    """
+    table = np.arange(len(FG_PARAMETERS), dtype=np.uint8)
+    for name in vars(type(Fore)):
+        if name.startswith('LIGHT') and name.endswith('_EX') and name != 'LIGHTBLACK_EX':
+            table[fg_id(getattr(Fore, name))] = fg_id(getattr(Fore, name[len('LIGHT'):-len('_EX')]))
+    table.flags.writeable = False
+    return table
+
+
+# Used when bandwidth is short: fewer distinct colors means fewer color changes.
+MERGED_FG = _build_merged_table()
+
+
+def _build_basic_tables():
+    """
+    Maps every bright foreground and background ID onto one of the eight
+    basic colors, for terminals without the aixterm bright codes. Grey
+    becomes white as a foreground (to stay visible) and black as a
+    background.
+    """
+    tables = []
+    for ids, colors, grey in ((_FG_IDS, Fore, Fore.WHITE), (_BG_IDS, Back, Back.BLACK)):
+        table = np.arange(len(ids), dtype=np.uint8)
+        for name in vars(type(colors)):
+            if name.startswith('LIGHT') and name.endswith('_EX'):
+                basic = grey if name == 'LIGHTBLACK_EX' else getattr(colors, name[len('LIGHT'):-len('_EX')])
+                table[ids[getattr(colors, name)]] = ids[basic]
+        table.flags.writeable = False
+        tables.append(table)
+    return tables
+
+
+# Used on 8-color terminals; indexed by foreground and background ID.
+BASIC_FG, BASIC_BG = _build_basic_tables()
+
+
+def bg_escape(background_id):
+    """Returns the escape sequence that selects a background color ID."""
+    return f"\033[{BG_PARAMETERS[background_id]}m"
+
+
+def sgr_transition(current_fg, current_bg, fg, bg):
+    """
+    Returns the shortest escape sequence that switches the terminal from the
+    current colors to the requested ones. Only the attributes that actually
+    change are emitted, combined into a single sequence and without resets.
+    A current color of None means the terminal state is unknown.
+    """
+    if fg != current_fg:
+        if bg != current_bg:
+            return f"\033[{FG_PARAMETERS[fg]};{BG_PARAMETERS[bg]}m"
+        return f"\033[{FG_PARAMETERS[fg]}m"
+    if bg != current_bg:
+        return f"\033[{BG_PARAMETERS[bg]}m"
+    return ""
+
+
+@functools.lru_cache(maxsize=None)
+def sgr_transition_bytes(current_fg, current_bg, fg, bg):
+    """sgr_transition() pre-encoded as bytes (cached per color pair)."""
+    return sgr_transition(current_fg, current_bg, fg, bg).encode('ascii')
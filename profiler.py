@@ -0,0 +1,163 @@
+import time
+import numpy as np
+from config import HISTOGRAM_SIGNIFICANT_DIGITS, HISTOGRAM_MAX_VALUE
+
+# --- Profiled Sections ---
+# Phases of a frame, in the order they happen
+PHASES = ('input', 'update', 'compose', 'encode', 'write')
+# Entity groups timed inside the update phase
+ENTITY_GROUPS = ('fish', 'schools', 'bubbles', 'jellyfish', 'seaweed')
+
+
+class HdrHistogram:
+    """
+    A fixed-size histogram of non-negative integers in the style of
+    HdrHistogram: values below 2 * 10**digits are counted exactly, and
+    above that each power of two is split into the same number of linear
+    buckets, so every value is kept to `digits` significant digits however
+    large it is. Values over max_value are counted as max_value. Recording
+    is a couple of integer operations and never allocates.
+    """
+    def __init__(self, digits=HISTOGRAM_SIGNIFICANT_DIGITS, max_value=HISTOGRAM_MAX_VALUE):
+        self.sub_bucket_bits = int(np.ceil(np.log2(2 * 10 ** digits)))
+        self.sub_bucket_count = 1 << self.sub_bucket_bits
+        self.max_value = max_value
+        self.counts = np.zeros(self._index(max_value) + 1, dtype=np.int64)
+        self.total = 0
+        self.max = 0
+
+    def _index(self, value):
+        """Returns the bucket a value is counted in."""
+        if value < self.sub_bucket_count:
+            return value
+        shift = value.bit_length() - self.sub_bucket_bits
+        half = self.sub_bucket_count >> 1
+        return self.sub_bucket_count + (shift - 1) * half + (value >> shift) - half
+
+    def _bucket_top(self, index):
+        """Returns the largest value counted in a bucket."""
+        if index < self.sub_bucket_count:
+            return index
+        half = self.sub_bucket_count >> 1
+        shift, offset = divmod(index - self.sub_bucket_count, half)
+        return ((half + offset + 1) << (shift + 1)) - 1
+
+    def record(self, value):
+        """Counts one (integer) value."""
+        value = min(max(0, int(value)), self.max_value)
+        self.counts[self._index(value)] += 1
+        self.total += 1
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, pct):
+        """Returns the smallest value that pct percent of the recorded values are at or below (0 if empty)."""
+        if not self.total:
+            return 0
+        rank = max(1, int(np.ceil(pct / 100 * self.total)))
+        index = int(np.searchsorted(np.cumsum(self.counts), rank))
+        return min(self._bucket_top(index), self.max)
+
+    def reset(self):
+        """Forgets every recorded value."""
+        self.counts.fill(0)
+        self.total = 0
+        self.max = 0
+
+
+class FrameProfiler:
+    """
+    Times each phase of a frame (see PHASES) and, inside the update phase,
+    each entity group (see ENTITY_GROUPS), into one HdrHistogram per
+    section in microseconds, plus a histogram of the bytes sent per frame.
+
+    Call sites bracket a section with start() and stop(name, started);
+    stop() returns the time it stopped at, so consecutive sections can be
+    chained. While the profiler is disabled both return straight away and
+    nothing is recorded, so the instrumentation can stay in place.
+    Encoding and writing may be timed on the frame writer thread.
+    """
+    def __init__(self, enabled=False):
+        self.enabled = False
+        self.histograms = {name: HdrHistogram() for name in PHASES + ENTITY_GROUPS}
+        self.frame_bytes = HdrHistogram()
+        self.fps = 0.0
+        self.window_start = None
+        self.window_frames = 0
+        if enabled:
+            self.enable()
+
+    def enable(self):
+        """Starts recording afresh."""
+        for histogram in self.histograms.values():
+            histogram.reset()
+        self.frame_bytes.reset()
+        self.fps = 0.0
+        self.window_start = None
+        self.window_frames = 0
+        self.enabled = True
+
+    def disable(self):
+        """Stops recording; the histograms keep what they have."""
+        self.enabled = False
+
+    def start(self):
+        """Returns the time a section starts at."""
+        if not self.enabled:
+            return 0.0
+        return time.perf_counter()
+
+    def stop(self, name, started):
+        """Records the section that started at `started`; returns the time it stopped at."""
+        if not self.enabled:
+            return 0.0
+        now = time.perf_counter()
+        self.histograms[name].record((now - started) * 1e6)
+        return now
+
+    def record(self, name, seconds):
+        """Records a section timed by the caller."""
+        if self.enabled:
+            self.histograms[name].record(seconds * 1e6)
+
+    def end_frame(self, frame_bytes):
+        """Counts a finished frame that sent frame_bytes to the terminal, updating the fps once a second."""
+        if not self.enabled:
+            return
+        self.frame_bytes.record(frame_bytes)
+        now = time.perf_counter()
+        if self.window_start is None:
+            self.window_start = now
+        self.window_frames += 1
+        if now - self.window_start >= 1.0:
+            self.fps = self.window_frames / (now - self.window_start)
+            self.window_start, self.window_frames = now, 0
+
+    def summary(self):
+        """Returns {section: (p50, p99, max)} in milliseconds, plus the bytes per frame."""
+        report = {name: tuple(value / 1000 for value in (histogram.percentile(50), histogram.percentile(99),
+                                                          histogram.max))
+                  for name, histogram in self.histograms.items()}
+        report['bytes'] = (self.frame_bytes.percentile(50), self.frame_bytes.percentile(99), self.frame_bytes.max)
+        return report
+
+    def report_lines(self, entity_counts=None):
+        """
+        Formats the profile as a small table: fps, p50/p99 per phase and
+        per entity group (with the group's size from entity_counts, if
+        given) and the bytes sent per frame.
+        """
+        entity_counts = entity_counts or {}
+        summary = self.summary()
+        lines = [f"{self.fps:5.1f} fps        p50ms   p99ms", "phase"]
+        for name in PHASES:
+            p50, p99, _ = summary[name]
+            lines.append(f" {name:<13}{p50:>7.2f} {p99:>7.2f}")
+        lines.append("update by group")
+        for name in ENTITY_GROUPS:
+            p50, p99, _ = summary[name]
+            count = entity_counts.get(name, '')
+            lines.append(f" {name:<9}{count:>4}{p50:>7.2f} {p99:>7.2f}")
+        p50, p99, _ = summary['bytes']
+        lines.append(f"bytes/frame  {p50:>7} {p99:>7}")
+        return lines
@@ -26,7 +26,7 @@ class PufferFish(Fish):
         self.swim_frames = [art for _, art in FISH_ART_STYLES['puffer'][f"{self.direction}_swim"]]
 
         # Set the initial art to the smallest frame
-        self.art = self.puff_frames[0]
+        self.set_art(self.puff_frames[0])
 
         # Slower speed than normal fish
         self.normal_speed = random.uniform(*PUFFER_NORMAL_SPEED_RANGE)
@@ -43,6 +43,16 @@ class PufferFish(Fish):
         self.wave_frequency = random.uniform(0.01, 0.04)
         
         # --- MODIFIED: Override Y position to prevent floor clipping ---
+        min_y, max_y = self._safe_y_range(height)
+        
+        # Set the new, safe Y position
+        self.y = random.randint(min_y, max_y)
+        self.center_y = self.y  # The central line for the wave is now this safe Y
+        self.prev_x, self.prev_y = self.x, self.y
+        # --- END MODIFICATION ---
+
+    def _safe_y_range(self, height):
+        """Returns the (min, max) center line of the wave that keeps the puffer off the floor."""
         # This is a tweakable range to ensure the sine wave motion is safe.
         safe_top_margin = int(self.wave_amplitude) + 1
         safe_bottom_margin = int(self.wave_amplitude) + self.art_height + 14 # +2 for floor & buffer
@@ -54,19 +64,26 @@ class PufferFish(Fish):
         # Failsafe for very small terminal windows where the range might be invalid
         if min_y >= max_y:
             min_y, max_y = height // 2, height // 2
-        
-        # Set the new, safe Y position
-        self.y = random.randint(min_y, max_y)
-        self.center_y = self.y  # The central line for the wave is now this safe Y
-        # --- END MODIFICATION ---
-
-    def update(self):
+        return min_y, max_y
+
+    def resize(self, width, height):
+        """Fits the puffer to a resized aquarium, keeping its wave inside the safe band."""
+        min_y, max_y = self._safe_y_range(height)
+        offset = self.y - self.center_y
+        self.center_y = min(max(min_y, round(self.center_y * height / self.height)), max_y)
+        self.x = self.prev_x = self.x * width / self.width
+        self.y = self.prev_y = self.center_y + offset
+        self.width, self.height = width, height
+
+    def update(self, dt=FRAME_RATE):
         """
         Overrides the base Fish update method to handle state-based animation.
         """
+        self.prev_x, self.prev_y = self.x, self.y
+
         # --- State Machine Logic ---
         if self.state == 'puffing':
-            self.animation_timer += FRAME_RATE
+            self.animation_timer += dt
             if self.animation_timer >= PUFFER_PUFF_ANIMATION_SPEED:
                 self.animation_timer = 0
                 if self.animation_frame_index < len(self.puff_frames) - 1:
@@ -77,8 +94,8 @@ class PufferFish(Fish):
                     self.animation_frame_index = 0
 
         elif self.state == 'puffed':
-            self.puffed_duration_timer -= FRAME_RATE
-            self.animation_timer += FRAME_RATE
+            self.puffed_duration_timer -= dt
+            self.animation_timer += dt
             if self.animation_timer >= PUFFER_SWIM_ANIMATION_SPEED:
                 self.animation_timer = 0
                 self.animation_frame_index = (self.animation_frame_index + 1) % len(self.swim_frames)
@@ -88,7 +105,7 @@ class PufferFish(Fish):
                 self.animation_frame_index = len(self.puff_frames) - 1
 
         elif self.state == 'deflating':
-            self.animation_timer += FRAME_RATE
+            self.animation_timer += dt
             if self.animation_timer >= PUFFER_PUFF_ANIMATION_SPEED:
                 self.animation_timer = 0
                 if self.animation_frame_index > 0:
@@ -96,15 +113,15 @@ class PufferFish(Fish):
                 else:
                     self.state = 'normal'
 
-        # Update the current art based on the state and frame index
+        # Update the current art (and its precomputed dimensions) based on the state and frame index
         if self.state == 'puffed':
-            self.art = self.swim_frames[self.animation_frame_index]
+            self.set_art(self.swim_frames[self.animation_frame_index])
         else:
-            self.art = self.puff_frames[self.animation_frame_index]
+            self.set_art(self.puff_frames[self.animation_frame_index])
 
         # --- Movement Logic ---
         if self.state in ['normal', 'puffed']:
-            self.x += self.speed
+            self.x += self.speed * (dt / FRAME_RATE)
             self.speed = self.normal_speed if self.direction == 'forward' else -self.normal_speed
             
             # Sine wave vertical movement
@@ -113,15 +130,12 @@ class PufferFish(Fish):
         else:
             self.speed = 0
 
-        # Update art dimensions for wrapping logic
-        self.art_height = len(self.art)
-        self.art_width = max(len(line) for line in self.art) if self.art else 0
-
         # Handle screen wrapping
+        # (snapping the previous position so the wrap isn't interpolated across the screen)
         if self.speed > 0 and self.x >= self.width:
-            self.x = -self.art_width
+            self.x = self.prev_x = -self.art_width
         elif self.speed < 0 and self.x <= -self.art_width:
-            self.x = self.width - 1
+            self.x = self.prev_x = self.width - 1
 
     def startle(self):
         """
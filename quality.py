@@ -0,0 +1,97 @@
+from config import (
+    BANDWIDTH_BUDGET, QUALITY_WINDOW, QUALITY_STEP_DOWN_LOAD, QUALITY_STEP_UP_LOAD,
+    QUALITY_STEP_UP_WINDOWS
+)
+
+# --- Quality Levels ---
+# Each level keeps the savings of the ones before it.
+QUALITY_LEVELS = (
+    'full',                # Everything, at the normal frame rate
+    'low_fps',             # Fewer frames per second
+    'no_ambient_bubbles',  # Rising background bubbles are not drawn
+    'merged_colors',       # Bright and normal variants of a color are sent as one
+    'partial_rows',        # Only some of the changed rows are sent each frame
+)
+LOW_FPS = QUALITY_LEVELS.index('low_fps')
+NO_AMBIENT_BUBBLES = QUALITY_LEVELS.index('no_ambient_bubbles')
+MERGED_COLORS = QUALITY_LEVELS.index('merged_colors')
+PARTIAL_ROWS = QUALITY_LEVELS.index('partial_rows')
+
+
+class QualityController:
+    """
+    Steps render quality down when the terminal link can't keep up and back
+    up when there is headroom.
+
+    Every QUALITY_WINDOW seconds it compares the bytes per second the scene
+    wants to send (including frames the writer had to drop) with what the
+    link can carry. The link's capacity is the pinned BANDWIDTH_BUDGET, or
+    otherwise the throughput measured while writing. Above
+    QUALITY_STEP_DOWN_LOAD it drops one level at once; it only climbs back
+    after QUALITY_STEP_UP_WINDOWS windows in a row below
+    QUALITY_STEP_UP_LOAD, so it does not flap.
+    """
+    def __init__(self, budget=BANDWIDTH_BUDGET, window=QUALITY_WINDOW):
+        self.budget = budget
+        self.window = window
+        self.level = 0
+        self.calm_windows = 0
+        self.window_start = None
+        self.last_counters = None
+
+        # Most recent measurements
+        self.demand = 0.0
+        self.capacity = None
+        self.load = 0.0
+        self.level_changes = 0
+
+    @property
+    def name(self):
+        """Name of the current quality level."""
+        return QUALITY_LEVELS[self.level]
+
+    def sample(self, now, output):
+        """
+        Feeds in the renderer's running counters (total_bytes, write_seconds,
+        frames_rendered and, for a FrameWriter, frames_dropped) at time now
+        in seconds. Returns the quality level to use.
+        """
+        counters = (output.total_bytes, output.write_seconds, output.frames_rendered,
+                    getattr(output, 'frames_dropped', 0))
+        if self.window_start is None:
+            self.window_start, self.last_counters = now, counters
+            return self.level
+        elapsed = now - self.window_start
+        if elapsed < self.window:
+            return self.level
+
+        sent, write_seconds, written, dropped = (current - last for current, last in zip(counters, self.last_counters))
+        self.window_start, self.last_counters = now, counters
+        if not written:
+            return self.level
+
+        # Dropped frames would have cost about as much as the ones that made it
+        self.demand = sent / elapsed * (written + dropped) / written
+        if self.budget:
+            self.capacity = self.budget
+        elif write_seconds > 0:
+            self.capacity = sent / write_seconds
+        else:
+            self.capacity = None
+        self.load = self.demand / self.capacity if self.capacity else 0.0
+
+        if self.load > QUALITY_STEP_DOWN_LOAD and self.level < len(QUALITY_LEVELS) - 1:
+            self._set_level(self.level + 1)
+        elif self.load < QUALITY_STEP_UP_LOAD and self.level > 0:
+            self.calm_windows += 1
+            if self.calm_windows >= QUALITY_STEP_UP_WINDOWS:
+                self._set_level(self.level - 1)
+        else:
+            self.calm_windows = 0
+        return self.level
+
+    def _set_level(self, level):
+        """Moves to a new level and restarts the count of calm windows."""
+        self.level = level
+        self.calm_windows = 0
+        self.level_changes += 1
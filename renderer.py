@@ -0,0 +1,240 @@
+import sys
+import time
+import numpy as np
+from palette import bg_id, bg_escape, sgr_transition, sgr_transition_bytes, MERGED_FG, BASIC_FG, BASIC_BG
+from tty_output import OutputBuffer, open_output
+from terminal_caps import TerminalCapabilities, SYNC_BEGIN, SYNC_END, ALT_SCREEN_ENTER, ALT_SCREEN_LEAVE
+
+
+class DiffRenderer:
+    """
+    Writes frames to the terminal, emitting only the cells that changed since
+    the previously written frame. Falls back to a full repaint whenever the
+    frame size or background color changes.
+
+    Frames are encoded as UTF-8 run by run into a reusable OutputBuffer and
+    handed to the stream as a memoryview. By default the stream is an
+    FdWriter on stdout's file descriptor, so a frame is never built as one
+    big string or pushed through a text stream; any other stream must
+    accept bytes-like objects.
+
+    The terminal's capabilities decide the framing: with synchronized
+    output every frame is wrapped in begin/end markers so it appears at
+    once instead of tearing, with the alternate screen the first repaint
+    switches to it (and close() switches back), and on 8-color terminals
+    bright colors are folded onto the basic eight.
+    """
+    # A cursor move costs roughly this many bytes, so unchanged gaps shorter
+    # than this are cheaper to re-send than to jump over.
+    CURSOR_MOVE_COST = 8
+
+    def __init__(self, stream=None, diff_enabled=True, capabilities=None):
+        self.stream = stream if stream is not None else open_output(sys.stdout)
+        self.output = OutputBuffer()
+        self.diff_enabled = diff_enabled
+        self.capabilities = capabilities or TerminalCapabilities()
+        self.on_alt_screen = False
+        self.writing_frame = False  # A frame's bytes are on their way out (it may be cut short)
+        self.previous_glyphs = None
+        self.previous_fg = None
+        self.previous_bg = None
+        self.previous_background = None
+        self.deferred_rows = None  # Rows that changed but were held back by row_budget
+
+        # Quality settings (see quality.py)
+        self.merge_colors = False  # Send similar colors (bright/normal variants) as one
+        self.row_budget = None  # Most rows sent per frame; the rest follow in later frames
+
+        # Bandwidth counters
+        self.last_frame_bytes = 0
+        self.total_bytes = 0
+        self.frames_rendered = 0
+        self.full_repaints = 0
+        self.write_seconds = 0.0
+        self.profiler = None  # FrameProfiler that encode/write times are reported to, if any
+
+    def invalidate(self):
+        """Forces the next frame to be a full repaint."""
+        self.previous_glyphs = None
+
+    def close(self):
+        """
+        Leaves the alternate screen (if it was entered) and makes sure
+        everything has reached the stream. Safe to call more than once, and
+        from exit paths that interrupted a frame halfway through writing it.
+        """
+        if self.writing_frame:
+            # Don't leave the terminal holding back a synchronized update
+            if self.capabilities.sync_output:
+                self.stream.write(SYNC_END)
+            self.writing_frame = False
+        if self.on_alt_screen:
+            self.stream.write(ALT_SCREEN_LEAVE)
+            self.on_alt_screen = False
+        self.stream.flush()
+
+    def render(self, frame, background, dirty_rects=None):
+        """
+        Writes the frame to the stream and records how many bytes were sent.
+        dirty_rects optionally lists the (x, y, width, height) regions that
+        may have changed since the last frame (as reported by the
+        compositor); only the rows they cover are compared.
+        """
+        encode_started = time.perf_counter()
+        output = self.output
+        output.clear()
+        sync = self.capabilities.sync_output
+        if sync:
+            output.append(SYNC_BEGIN)
+        # Rows of plain ASCII are encoded by narrowing the codepoints to bytes
+        ascii_rows = (frame.glyphs < 0x80).all(axis=1).tolist()
+        fg, bg, background_id = frame.fg, frame.bg, bg_id(background)
+        if not self.capabilities.bright_colors:
+            fg, bg, background_id = BASIC_FG[fg], BASIC_BG[bg], int(BASIC_BG[background_id])
+        if self.merge_colors:
+            fg = MERGED_FG[fg]
+
+        if self._needs_full_repaint(frame, background):
+            if self.capabilities.alt_screen and not self.on_alt_screen:
+                output.append(ALT_SCREEN_ENTER)
+                self.on_alt_screen = True
+            self._encode_full(frame, fg, bg, ascii_rows, background_id)
+            self.full_repaints += 1
+            self.previous_glyphs = frame.glyphs.copy()
+            self.previous_fg = fg.copy()
+            self.previous_bg = bg.copy()
+            self.deferred_rows = np.zeros(frame.height, dtype=bool)
+        else:
+            top, bottom = 0, frame.height
+            if dirty_rects is not None:
+                top = min((y for _, y, _, _ in dirty_rects), default=0)
+                bottom = max((y + height for _, y, _, height in dirty_rects), default=0)
+            held = np.flatnonzero(self.deferred_rows)
+            if len(held):
+                top, bottom = min(top, int(held[0])), max(bottom, int(held[-1]) + 1)
+            self._encode_diff(frame, fg, bg, ascii_rows, background_id, top, bottom)
+            # Rows held back keep their old contents as the diff base
+            rows = np.s_[top:bottom]
+            sent = ~self.deferred_rows[rows, np.newaxis]
+            np.copyto(self.previous_glyphs[rows], frame.glyphs[rows], where=sent)
+            np.copyto(self.previous_fg[rows], fg[rows], where=sent)
+            np.copyto(self.previous_bg[rows], bg[rows], where=sent)
+        self.previous_background = background
+
+        if sync:
+            if len(output) == len(SYNC_BEGIN):
+                output.clear()  # Nothing changed, so there is nothing to synchronize
+            else:
+                output.append(SYNC_END)
+        self.last_frame_bytes = len(output)
+        self.total_bytes += self.last_frame_bytes
+        self.frames_rendered += 1
+
+        start = time.perf_counter()
+        if self.last_frame_bytes:
+            self.writing_frame = True
+            with self.output.view() as view:
+                self.stream.write(view)
+            self.stream.flush()
+            self.writing_frame = False
+            self.write_seconds += time.perf_counter() - start
+        profiler = self.profiler
+        if profiler and profiler.enabled:
+            profiler.record('encode', start - encode_started)
+            if self.last_frame_bytes:
+                profiler.stop('write', start)
+            profiler.end_frame(self.last_frame_bytes)
+
+    def _needs_full_repaint(self, frame, background):
+        """Checks whether the previous frame can be used as a diff base."""
+        if not self.diff_enabled or self.previous_glyphs is None:
+            return True
+        if background != self.previous_background:
+            return True
+        return self.previous_glyphs.shape != frame.glyphs.shape
+
+    def _encode_full(self, frame, fg, bg, ascii_rows, background_id):
+        """Encodes the whole frame (with colors fg/bg) after clearing the screen."""
+        output = self.output
+        output.append(bg_escape(background_id).encode('ascii'))
+        output.append(b"\033[2J\033[H")
+        current = (None, background_id)
+        for y in range(frame.height):
+            if y:
+                output.append(b"\n")
+            current = self._encode_run(frame, fg, bg, ascii_rows, y, 0, frame.width, current)
+
+    def _encode_diff(self, frame, fg, bg, ascii_rows, background_id, top=0, bottom=None):
+        """
+        Encodes cursor moves plus the runs of cells (in rows top..bottom)
+        that differ from the previous frame. With a row_budget, changed rows
+        beyond it are recorded in deferred_rows instead, rows held back
+        earlier going first.
+        """
+        rows = np.s_[top:bottom]
+        changed = frame.glyphs[rows] != self.previous_glyphs[rows]
+        changed |= fg[rows] != self.previous_fg[rows]
+        changed |= bg[rows] != self.previous_bg[rows]
+
+        changed_rows = np.flatnonzero(changed.any(axis=1))
+        if self.row_budget is not None and len(changed_rows) > self.row_budget:
+            waiting = np.argsort(~self.deferred_rows[rows][changed_rows], kind='stable')
+            held = changed_rows[waiting[self.row_budget:]]
+            changed_rows = np.sort(changed_rows[waiting[:self.row_budget]])
+            self.deferred_rows[:] = False
+            self.deferred_rows[top + held] = True
+        else:
+            self.deferred_rows[:] = False
+        if not len(changed_rows):
+            return
+
+        output = self.output
+        output.append(bg_escape(background_id).encode('ascii'))
+        current = (None, background_id)
+        for row in changed_rows.tolist():
+            y = top + row
+            for start, end in self._changed_runs(changed[row]):
+                output.append(b"\033[%d;%dH" % (y + 1, start + 1))
+                current = self._encode_run(frame, fg, bg, ascii_rows, y, start, end, current)
+
+    def _changed_runs(self, changed_row):
+        """Returns (start, end) column ranges covering every changed cell in a row."""
+        columns = np.flatnonzero(changed_row)
+        gaps = np.flatnonzero(np.diff(columns) > self.CURSOR_MOVE_COST)
+        starts = columns[np.concatenate(([0], gaps + 1))]
+        ends = columns[np.concatenate((gaps, [len(columns) - 1]))] + 1
+        return zip(starts.tolist(), ends.tolist())
+
+    def _encode_run(self, frame, fg, bg, ascii_rows, y, start, end, current):
+        """
+        Appends the escape codes and text for cells [start, end) of row y,
+        taking colors from fg and bg. ascii_rows[y] says whether the row is
+        plain ASCII, which is encoded by narrowing the codepoints to bytes.
+        `current` is the (fg, bg) pair the terminal is already using; the
+        updated pair is returned. Runs of spaces only need the right
+        background, so they never force a foreground change.
+        """
+        fg = fg[y, start:end]
+        bg = bg[y, start:end]
+        keys = (fg.astype(np.uint16) << 8) | bg
+        edges = [0, *(np.flatnonzero(keys[1:] != keys[:-1]) + 1).tolist(), end - start]
+        ascii = ascii_rows[y]
+        if ascii:
+            # Narrowed straight from the codepoints, already valid UTF-8
+            text = frame.glyphs[y, start:end].astype(np.uint8).tobytes()
+            transition = sgr_transition_bytes
+        else:
+            text = frame.row_text(y, start, end)
+            transition = sgr_transition
+
+        parts = []
+        current_fg, current_bg = current
+        for seg_start, seg_end in zip(edges, edges[1:]):
+            segment = text[seg_start:seg_end]
+            cell_bg = int(bg[seg_start])
+            cell_fg = current_fg if segment.isspace() and current_fg is not None else int(fg[seg_start])
+            parts.append(transition(current_fg, current_bg, cell_fg, cell_bg))
+            parts.append(segment)
+            current_fg, current_bg = cell_fg, cell_bg
+        self.output.append(b"".join(parts) if ascii else "".join(parts).encode('utf-8'))
+        return current_fg, current_bg
@@ -1,7 +1,9 @@
 import random
 import math
-from colorama import Fore
-from ascii_art import FISH_ART_STYLES, FISH_COLOR_SETS, COLOR_ADJUSTMENTS
+from ascii_art import FISH_ART_STYLES, FISH_COLOR_SETS
+from palette import fg_id, LIGHT_MODE
+from sprites import get_sprite
+from clock import interpolate
 from config import (
     SCHOOL_SIZE_RANGE, FORMATION_WIDTH_RANGE, FORMATION_HEIGHT_RANGE,
     SCHOOL_SPEED_RANGE, SCHOOL_STARTLE_MULTIPLIER_RANGE, SCHOOL_STARTLE_DURATION,
@@ -11,6 +13,8 @@ from config import (
 
 class School:
     """Represents a school of fish that move together in formation."""
+    layer = 'schools'
+
     def __init__(self, width, height, background_color):
         self.width = width
         self.height = height
@@ -20,6 +24,7 @@ class School:
         # Choose a single fish type and color for the entire school
         fish_type, self.art = random.choice(FISH_ART_STYLES['single_line'][self.direction])
         self.base_color = random.choice(FISH_COLOR_SETS[fish_type])
+        self.sprite = get_sprite(self.art)
         
         # School properties - larger and more spread out
         self.school_size = random.randint(*SCHOOL_SIZE_RANGE)
@@ -29,6 +34,7 @@ class School:
         # School movement
         self.x = float(random.randint(0, width - 1))
         self.y = random.randint(1, height - self.formation_height - 2)
+        self.prev_x, self.prev_y = self.x, self.y
         
         # School speed
         self.normal_speed = random.uniform(*SCHOOL_SPEED_RANGE)
@@ -65,20 +71,21 @@ class School:
             self.fish_positions.append((offset_x, offset_y))
 
     def get_adjusted_color(self, color):
-        """Adjusts color based on current background mode."""
+        """Adjusts a palette color ID based on current background mode."""
         from colorama import Back
         if self.background_color == Back.LIGHTCYAN_EX:  # Light mode
-            return COLOR_ADJUSTMENTS.get('light_mode', {}).get(color, color)
+            return LIGHT_MODE[color]
         return color
 
     def get_current_color(self):
-        """Gets the current color adjusted for background mode."""
-        return self.get_adjusted_color(self.base_color)
+        """Gets the current palette color ID adjusted for background mode."""
+        return self.get_adjusted_color(fg_id(self.base_color))
 
-    def update(self):
+    def update(self, dt=FRAME_RATE):
         """Moves the entire school as a unit."""
+        self.prev_x, self.prev_y = self.x, self.y
         if self.is_startled:
-            self.startle_timer -= FRAME_RATE
+            self.startle_timer -= dt
             if self.startle_timer <= 0:
                 self.is_startled = False
                 # Revert to normal speed
@@ -90,13 +97,13 @@ class School:
                 current_speed_magnitude = self.normal_speed + (speed_range * progress)
                 self.speed = current_speed_magnitude if self.direction == 'forward' else -current_speed_magnitude
 
-        self.x += self.speed
-        art_width = len(self.art)
+        self.x += self.speed * (dt / FRAME_RATE)
+        art_width = self.sprite.width
         school_total_width = self.formation_width + art_width
         if self.speed > 0 and self.x >= self.width:
-            self.x = -school_total_width
+            self.x = self.prev_x = -school_total_width
         elif self.speed < 0 and self.x <= -school_total_width:
-            self.x = self.width - 1
+            self.x = self.prev_x = self.width - 1
 
     def startle(self):
         """Temporarily speeds up the entire school."""
@@ -107,24 +114,35 @@ class School:
             startle_multiplier = random.uniform(*SCHOOL_STARTLE_MULTIPLIER_RANGE)
             self.peak_startle_speed = self.normal_speed * startle_multiplier
 
-    def get_fish_positions(self):
-        """Returns the absolute positions of all fish in the school."""
+    def resize(self, width, height):
+        """Fits the school to a resized aquarium, keeping its relative position."""
+        self.x = self.prev_x = self.x * width / self.width
+        max_y = max(1, height - self.formation_height - 2)
+        self.y = self.prev_y = min(max(1, round(self.y * height / self.height)), max_y)
+        self.width, self.height = width, height
+
+    def get_bounds(self):
+        """Returns the bounding box of the whole formation as (x, y, width, height)."""
+        return self.x, self.y, self.formation_width + self.sprite.width, self.formation_height
+
+    def get_previous_bounds(self):
+        """Returns the formation's bounding box at the previous simulation step."""
+        return self.prev_x, self.prev_y, self.formation_width + self.sprite.width, self.formation_height
+
+    def get_fish_positions(self, alpha=1.0):
+        """Returns the absolute positions of all fish in the school (interpolated by alpha)."""
+        school_x = interpolate(self.prev_x, self.x, alpha)
+        school_y = interpolate(self.prev_y, self.y, alpha)
         positions = []
         for offset_x, offset_y in self.fish_positions:
-            abs_x = self.x + offset_x
-            abs_y = self.y + offset_y
+            abs_x = school_x + offset_x
+            abs_y = school_y + offset_y
             positions.append((abs_x, abs_y))
         return positions
     
-    def draw(self, buffer):
+    def draw(self, buffer, alpha=1.0):
         """Draws all the fish in the school onto the provided buffer."""
         current_color = self.get_current_color()
-        for fish_x, fish_y in self.get_fish_positions():
-            x, y = int(fish_x), int(fish_y)
-            # Bounds check against aquarium height
-            if 0 <= y < self.height:
-                for char_idx, char_art in enumerate(self.art):
-                    current_x = x + char_idx
-                    # Bounds check against aquarium width
-                    if char_art != ' ' and 0 <= current_x < self.width:
-                        buffer[y][current_x] = (char_art, current_color)
\ No newline at end of file
+        for fish_x, fish_y in self.get_fish_positions(alpha):
+            buffer.blit(self.sprite, int(fish_x), int(fish_y), current_color)
+
@@ -1,11 +1,14 @@
 import random
 import math
 from ascii_art import SEAWEED_SEGMENTS
-from config import SEAWEED_HEIGHT_RANGE, SEAWEED_SWAY_SPEED
+from palette import fg_id
+from config import SEAWEED_HEIGHT_RANGE, SEAWEED_SWAY_SPEED, FRAME_RATE
 
 
 class Seaweed:
     """Represents a swaying stalk of seaweed."""
+    layer = 'seaweed'
+
     def __init__(self, x_pos, width, height):
         self.x = x_pos
         self.aquarium_height = height
@@ -13,6 +16,7 @@ class Seaweed:
         self.height = random.randint(*SEAWEED_HEIGHT_RANGE)
         self.segments = []
         self.sway_offset = random.uniform(0, math.pi * 2)  # Randomize sway cycle
+        self.time_step = 0  # Simulation steps since the seaweed was planted; drives the sway
 
         # Build the seaweed from bottom up using imported segment types
         for i in range(self.height):
@@ -22,16 +26,33 @@ class Seaweed:
                 self.segments.append(random.choice(SEAWEED_SEGMENTS['top_types']))
             else:
                 self.segments.append(random.choice(SEAWEED_SEGMENTS['mid_types']))
-    
-    def draw(self, buffer, time_step):
+
+        self.bounds = self._sway_bounds()
+
+    def _sway_bounds(self):
+        """Returns the box the stalk can reach at any point of its sway."""
+        # The top segment sways furthest, by up to half the stalk's height
+        max_sway = (self.height - 1) // 2
+        art_width = max(len(art) for art, _ in self.segments)
+        return (self.x - max_sway, self.aquarium_height - 1 - self.height, 2 * max_sway + art_width, self.height)
+
+    def resize(self, width, height):
+        """Replants the stalk on the floor of a resized aquarium (it keeps its column)."""
+        self.width, self.aquarium_height = width, height
+        self.bounds = self._sway_bounds()
+
+    def update(self, dt=FRAME_RATE):
+        """Advances the sway by one simulation step of dt seconds."""
+        self.time_step += dt / FRAME_RATE
+
+    def draw(self, buffer, alpha=1.0):
         """Draws the swayed seaweed onto the provided buffer."""
-        for segment in self.get_swayed_segments(time_step):
-            x, y, art, color = segment['x'], segment['y'], segment['art'], segment['color']
-            if 0 <= y < self.aquarium_height:
-                for i, char_art in enumerate(art):
-                    current_x = x + i
-                    if 0 <= current_x < self.width:
-                        buffer[y][current_x] = (char_art, color)
+        for segment in self.get_swayed_segments(self.time_step):
+            buffer.put_text(segment['x'], segment['y'], segment['art'], fg_id(segment['color']), transparent=False)
+
+    def get_bounds(self):
+        """Returns a box (x, y, width, height) covering the stalk at any point of its sway."""
+        return self.bounds
 
     def get_swayed_segments(self, time_step):
         """Calculates the current sway and returns segments with their positions."""
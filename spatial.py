@@ -0,0 +1,53 @@
+from collections import defaultdict
+from config import SPATIAL_CELL_SIZE
+
+
+class SpatialHash:
+    """
+    A uniform grid index over entity bounding boxes for proximity queries.
+    Each entity is filed under every grid cell its bounding box touches, so a
+    radius query only has to look at the handful of cells around the point
+    instead of scanning every entity. Queries return candidates (anything
+    whose box overlaps the query square) in insertion order; callers apply
+    their own exact distance test.
+    """
+    def __init__(self, cell_size=SPATIAL_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = defaultdict(list)
+        self.entries = []
+
+    def __len__(self):
+        return len(self.entries)
+
+    def clear(self):
+        """Removes every entity from the index."""
+        self.cells.clear()
+        self.entries.clear()
+
+    def insert(self, entity, kind, x, y, width, height):
+        """Files an entity (tagged with a kind such as 'fish') under its bounding box."""
+        entry = len(self.entries)
+        self.entries.append((kind, entity))
+        size = self.cell_size
+        x0, x1 = int(x // size), int((x + max(width, 1)) // size)
+        y0, y1 = int(y // size), int((y + max(height, 1)) // size)
+        for cell_x in range(x0, x1 + 1):
+            for cell_y in range(y0, y1 + 1):
+                self.cells[(cell_x, cell_y)].append(entry)
+
+    def query_rect(self, left, top, right, bottom, kind=None):
+        """Returns the entities whose bounding boxes may overlap a rectangle, in insertion order."""
+        size = self.cell_size
+        found = set()
+        for cell_x in range(int(left // size), int(right // size) + 1):
+            for cell_y in range(int(top // size), int(bottom // size) + 1):
+                cell = self.cells.get((cell_x, cell_y))
+                if cell:
+                    found.update(cell)
+        entries = self.entries
+        return [entries[entry][1] for entry in sorted(found)
+                if kind is None or entries[entry][0] == kind]
+
+    def query_radius(self, x, y, radius, kind=None):
+        """Returns candidate entities that may lie within radius of (x, y)."""
+        return self.query_rect(x - radius, y - radius, x + radius, y + radius, kind)
@@ -0,0 +1,94 @@
+import numpy as np
+from ascii_art import FISH_ART_STYLES, CRAB, DECORATIONS
+from frame_buffer import GLYPH_DTYPE, SPACE
+
+
+class Sprite:
+    """
+    An immutable, precompiled piece of ASCII art.
+    Stores its size, a padded array of glyph codepoints and, for every row,
+    the opaque spans (runs of non-transparent cells) so that drawing it is a
+    handful of slice copies instead of a per-character loop.
+    """
+    __slots__ = ('lines', 'width', 'height', 'glyphs', 'spans')
+
+    def __init__(self, lines, solid=False):
+        lines = tuple(lines)
+        width = max((len(line) for line in lines), default=0)
+        glyphs = np.full((len(lines), width), SPACE, dtype=GLYPH_DTYPE)
+        spans = []
+        for row, line in enumerate(lines):
+            if line:
+                glyphs[row, :len(line)] = np.frombuffer(line.encode('utf-32-le'), dtype=GLYPH_DTYPE)
+            spans.extend((row, start, end) for start, end in self._row_spans(line, solid))
+        glyphs.flags.writeable = False
+
+        object.__setattr__(self, 'lines', lines)
+        object.__setattr__(self, 'width', width)
+        object.__setattr__(self, 'height', len(lines))
+        object.__setattr__(self, 'glyphs', glyphs)
+        object.__setattr__(self, 'spans', tuple(spans))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Sprite is immutable")
+
+    @staticmethod
+    def _row_spans(line, solid):
+        """
+        Finds the opaque runs in a line of art. Spaces are transparent, except
+        for solid sprites where everything between the first and last visible
+        character is opaque.
+        """
+        if solid:
+            trimmed = line.strip()
+            if not trimmed:
+                return []
+            start = line.find(trimmed)
+            return [(start, start + len(trimmed))]
+
+        spans = []
+        start = None
+        for idx, char in enumerate(line):
+            if char != ' ' and start is None:
+                start = idx
+            elif char == ' ' and start is not None:
+                spans.append((start, idx))
+                start = None
+        if start is not None:
+            spans.append((start, len(line)))
+        return spans
+
+
+# --- Sprite Cache ---
+_SPRITE_CACHE = {}
+
+
+def get_sprite(art, solid=False):
+    """Returns the compiled sprite for a piece of art, compiling it on first use."""
+    if isinstance(art, str):
+        art = (art,)
+    key = (art, solid)
+    sprite = _SPRITE_CACHE.get(key)
+    if sprite is None:
+        sprite = Sprite(art, solid)
+        _SPRITE_CACHE[key] = sprite
+    return sprite
+
+
+def precompile_sprites():
+    """Compiles every fish, crab, jellyfish and decoration sprite up front."""
+    from jellyfish_module import JELLYFISH_ART
+
+    for category in FISH_ART_STYLES.values():
+        for variants in category.values():
+            for _, art in variants:
+                get_sprite(art)
+    for art in CRAB:
+        get_sprite(art)
+    for art in JELLYFISH_ART:
+        get_sprite(art)
+    for states in DECORATIONS.values():
+        variants = states.values() if isinstance(states, dict) else [states]
+        for decoration_list in variants:
+            for _, art in decoration_list:
+                get_sprite(art, solid=True)
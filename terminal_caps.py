@@ -0,0 +1,189 @@
+import json
+import os
+import re
+import sys
+import time
+from config import CAPABILITY_PROBE_TIMEOUT, CAPABILITY_CACHE_PATH
+
+# --- Escape Sequences ---
+SYNC_BEGIN = b"\033[?2026h"  # DEC mode 2026: hold screen updates...
+SYNC_END = b"\033[?2026l"    # ...and show everything since SYNC_BEGIN at once
+ALT_SCREEN_ENTER = b"\033[?1049h"
+ALT_SCREEN_LEAVE = b"\033[?1049l"
+# Report presses, releases and drags (1002) in SGR form (1006), which has no coordinate limit
+MOUSE_ENABLE = b"\033[?1002h\033[?1006h"
+MOUSE_DISABLE = b"\033[?1006l\033[?1002l"
+
+# Ask for modes 2026 and 1049 (DECRQM), then for the device attributes
+# (DA1), which every terminal answers, so we know when to stop waiting.
+PROBE_QUERY = b"\033[?2026$p\033[?1049$p\033[c"
+MODE_REPORT = re.compile(rb"\033\[\?(\d+);(\d)\$y")
+DEVICE_ATTRIBUTES = re.compile(rb"\033\[\?[\d;]*c")
+
+COLOR_MODES = ('8', '16', '256', 'truecolor')
+
+# Terminals known to support synchronized output, by $TERM_PROGRAM or $TERM
+SYNC_TERMINALS = ('iTerm.app', 'WezTerm', 'contour', 'xterm-kitty', 'foot', 'alacritty')
+
+
+class TerminalCapabilities:
+    """
+    What the terminal we are drawing on supports: synchronized output (DEC
+    mode 2026), its richest color mode (one of COLOR_MODES) and the
+    alternate screen. `source` records where the answer came from.
+    """
+    def __init__(self, sync_output=False, color_mode='16', alt_screen=False, source='default'):
+        self.sync_output = sync_output
+        self.color_mode = color_mode
+        self.alt_screen = alt_screen
+        self.source = source
+
+    def __repr__(self):
+        return (f"TerminalCapabilities(sync_output={self.sync_output}, color_mode={self.color_mode!r}, "
+                f"alt_screen={self.alt_screen}, source={self.source!r})")
+
+    @property
+    def bright_colors(self):
+        """Whether the bright (aixterm 90-97/100-107) colors can be used."""
+        return self.color_mode != '8'
+
+
+def terminal_key(env):
+    """Identifies the terminal for the capability cache."""
+    return "|".join(env.get(name, '') for name in ('TERM', 'TERM_PROGRAM', 'TERM_PROGRAM_VERSION', 'COLORTERM'))
+
+
+def from_environment(env):
+    """Guesses capabilities from environment variables alone."""
+    term = env.get('TERM', '')
+    program = env.get('TERM_PROGRAM', '')
+    if env.get('COLORTERM', '').lower() in ('truecolor', '24bit'):
+        color_mode = 'truecolor'
+    elif '256color' in term:
+        color_mode = '256'
+    elif term in ('linux', 'vt100', 'vt220', 'ansi'):
+        color_mode = '8'
+    else:
+        color_mode = '16'
+    sync_output = program in SYNC_TERMINALS or term in SYNC_TERMINALS or 'WT_SESSION' in env
+    alt_screen = bool(term) and term != 'dumb' or 'WT_SESSION' in env
+    return TerminalCapabilities(sync_output, color_mode, alt_screen, source='environment')
+
+
+def refine_from_terminfo(caps, term):
+    """Corrects the color mode and alternate screen support from the terminfo database, if available."""
+    try:
+        import curses
+        curses.setupterm(term, sys.__stdout__.fileno() if sys.__stdout__ else -1)
+    except Exception:
+        # No curses (Windows) or no terminfo entry for this terminal
+        return caps
+    colors = curses.tigetnum('colors')
+    if curses.tigetflag('Tc') == 1 or curses.tigetflag('RGB') == 1 or colors >= 1 << 24:
+        caps.color_mode = 'truecolor'
+    elif colors >= 256 and caps.color_mode != 'truecolor':
+        caps.color_mode = '256'
+    elif 0 < colors < 16:
+        caps.color_mode = '8'
+    caps.alt_screen = bool(curses.tigetstr('smcup'))
+    caps.source = 'terminfo'
+    return caps
+
+
+def probe_terminal(fd_in, fd_out, timeout=CAPABILITY_PROBE_TIMEOUT):
+    """
+    Asks the terminal which of modes 2026 and 1049 it supports. Returns a
+    {mode: supported} dict, which is empty if the terminal did not answer
+    in time. The terminal is put in cbreak mode for the exchange.
+    """
+    import termios
+    import tty
+    import select
+
+    saved = termios.tcgetattr(fd_in)
+    reply = b""
+    try:
+        tty.setcbreak(fd_in)
+        os.write(fd_out, PROBE_QUERY)
+        deadline = time.monotonic() + timeout
+        while not DEVICE_ATTRIBUTES.search(reply):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([fd_in], [], [], remaining)[0]:
+                break
+            reply += os.read(fd_in, 1024)
+    finally:
+        termios.tcsetattr(fd_in, termios.TCSADRAIN, saved)
+    # 1 = set, 2 = reset, 3 = permanently set; 0 and 4 mean unsupported
+    return {int(mode): value in b"123" for mode, value in MODE_REPORT.findall(reply)}
+
+
+def default_cache_path():
+    """Where probe results are kept between runs."""
+    if CAPABILITY_CACHE_PATH:
+        return CAPABILITY_CACHE_PATH
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'ascii-aquarium', 'terminal_caps.json')
+
+
+def load_cache(path):
+    """Reads the probe cache, returning an empty dict if it is missing or unreadable."""
+    try:
+        with open(path) as f:
+            cache = json.load(f)
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(path, cache):
+    """Writes the probe cache, ignoring failures (it only saves time)."""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(cache, f, indent=2)
+    except OSError:
+        pass
+
+
+def detect_capabilities(env=None, stdin=None, stdout=None, cache_path=None, probe=True):
+    """
+    Works out the terminal's capabilities from the environment and terminfo,
+    then asks the terminal itself about synchronized output and the
+    alternate screen. Probe answers are cached on disk per terminal (see
+    terminal_key()), so later launches skip the round-trip. A probe that
+    timed out is not cached, so the next launch asks again.
+    """
+    env = os.environ if env is None else env
+    stdin = sys.stdin if stdin is None else stdin
+    stdout = sys.stdout if stdout is None else stdout
+    caps = refine_from_terminfo(from_environment(env), env.get('TERM'))
+    if not probe:
+        return caps
+
+    cache_path = cache_path or default_cache_path()
+    key = terminal_key(env)
+    cache = load_cache(cache_path)
+    if cache.get(key):
+        answers = {int(mode): supported for mode, supported in cache[key].items()}
+        source = 'cache'
+    else:
+        try:
+            if not (stdin.isatty() and stdout.isatty()):
+                return caps
+            stdout.flush()
+            answers = probe_terminal(stdin.fileno(), stdout.fileno())
+        except (ImportError, OSError, ValueError, AttributeError):
+            # No termios (Windows) or not a real terminal
+            return caps
+        if answers:
+            cache[key] = answers
+            save_cache(cache_path, cache)
+        source = 'probe'
+
+    if 2026 in answers:
+        caps.sync_output = answers[2026]
+    if 1049 in answers:
+        caps.alt_screen = answers[1049]
+    if answers:
+        caps.source = source
+    return caps
@@ -0,0 +1,18 @@
+import random
+from benchmark import ByteCountingSink
+from bubble import BubbleSystem
+from main_aquarium import Aquarium
+
+
+def test_empty_bubble_system_has_no_swept_rects():
+    bubbles = BubbleSystem(80, 24, capacity=0)
+    assert bubbles.get_swept_rects().shape == (0, 4)
+
+
+def test_scene_without_bubbles_draws():
+    random.seed(0)
+    aquarium = Aquarium(size=(80, 24), headless=True, stream=ByteCountingSink())
+    aquarium.generate_new_scene(num_bubbles=0)
+    aquarium.update()
+    aquarium.draw()
+    assert len(aquarium.bubbles) == 0
@@ -0,0 +1,32 @@
+import json
+import os
+import terminal_caps
+from terminal_caps import detect_capabilities, terminal_key
+
+ENV = {'TERM': 'xterm-256color'}
+
+
+def detect_on_silent_terminal(cache_path):
+    """Runs detect_capabilities() on a pty whose other end never answers the probe."""
+    master, slave = os.openpty()
+    with open(slave, 'rb', buffering=0) as stdin, open(os.dup(slave), 'wb', buffering=0) as stdout:
+        try:
+            return detect_capabilities(env=ENV, stdin=stdin, stdout=stdout, cache_path=str(cache_path))
+        finally:
+            os.close(master)
+
+
+def test_timed_out_probe_is_not_cached(tmp_path):
+    cache_path = tmp_path / 'caps.json'
+    caps = detect_on_silent_terminal(cache_path)
+    assert caps.source != 'probe'
+    assert not cache_path.exists() or terminal_key(ENV) not in json.loads(cache_path.read_text())
+
+
+def test_empty_cache_entry_is_probed_again(tmp_path, monkeypatch):
+    cache_path = tmp_path / 'caps.json'
+    cache_path.write_text(json.dumps({terminal_key(ENV): {}}))
+    monkeypatch.setattr(terminal_caps, 'probe_terminal', lambda fd_in, fd_out: {2026: True, 1049: True})
+    caps = detect_on_silent_terminal(cache_path)
+    assert caps.source == 'probe' and caps.sync_output
+    assert json.loads(cache_path.read_text())[terminal_key(ENV)] == {'2026': True, '1049': True}
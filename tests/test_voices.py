@@ -0,0 +1,147 @@
+from voices import VoiceManager
+
+
+class FakeClock:
+    """A clock that only moves when told to."""
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeSound:
+    """A sound that only knows its length."""
+    def __init__(self, length):
+        self.length = length
+
+    def get_length(self):
+        return self.length
+
+
+class FakeChannel:
+    """A mixer channel that only keeps track of what it would be playing."""
+    def __init__(self, clock):
+        self.clock = clock
+        self.sound = None
+        self.ends = 0.0
+        self.plays = 0
+
+    def play(self, sound, loops=0):
+        self.sound = sound
+        self.ends = float('inf') if loops < 0 else self.clock() + sound.get_length() * (loops + 1)
+        self.plays += 1
+
+    def stop(self):
+        self.sound = None
+
+    def get_busy(self):
+        return self.sound is not None and self.clock() < self.ends
+
+
+class FakeMixer:
+    """
+    Stands in for pygame.mixer without an audio device. Its channels stay
+    busy for the length of the sound they were given (by the clock).
+    """
+    def __init__(self, clock):
+        self.clock = clock
+        self.channels = []
+        self.reserved = 0
+
+    def set_num_channels(self, count):
+        self.channels = self.channels[:count]
+        while len(self.channels) < count:
+            self.channels.append(FakeChannel(self.clock))
+
+    def set_reserved(self, count):
+        self.reserved = count
+
+    def Channel(self, index):
+        return self.channels[index]
+
+
+def make_voices(channels):
+    clock = FakeClock()
+    mixer = FakeMixer(clock)
+    return VoiceManager(mixer, channels=channels, clock=clock), mixer, clock
+
+
+def test_channels_are_reserved_per_category():
+    voices, mixer, _ = make_voices({'ambient': 1, 'bubbles': 3})
+    assert len(mixer.channels) == 4 and mixer.reserved == 4
+    assert voices.channels['ambient'] == mixer.channels[:1]
+    assert voices.channels['bubbles'] == mixer.channels[1:]
+
+
+def test_repeat_within_a_tick_is_coalesced():
+    voices, _, _ = make_voices({'puffer': 2})
+    pop = FakeSound(1.0)
+    assert voices.play('puffer', pop)
+    assert not voices.play('puffer', pop)
+    assert voices.coalesced['puffer'] == 1 and voices.played['puffer'] == 1
+
+    voices.end_tick()
+    assert voices.play('puffer', pop)
+    assert voices.played['puffer'] == 2
+
+
+def test_different_sounds_in_a_tick_each_get_a_channel():
+    voices, _, _ = make_voices({'bubbles': 3})
+    sounds = [FakeSound(1.0) for _ in range(3)]
+    for sound in sounds:
+        assert voices.play('bubbles', sound)
+    assert [channel.sound for channel in voices.channels['bubbles']] == sounds
+    assert voices.stolen['bubbles'] == 0
+
+
+def test_full_category_steals_the_oldest_voice():
+    voices, _, clock = make_voices({'bubbles': 2})
+    first, second, third = FakeSound(10.0), FakeSound(10.0), FakeSound(10.0)
+    voices.play('bubbles', first)
+    clock.now = 1.0
+    voices.play('bubbles', second)
+    clock.now = 2.0
+    assert voices.play('bubbles', third)
+
+    channels = voices.channels['bubbles']
+    assert [channel.sound for channel in channels] == [third, second]
+    assert voices.started['bubbles'] == [2.0, 1.0]
+    assert voices.stolen['bubbles'] == 1
+
+
+def test_finished_voice_frees_its_channel():
+    voices, _, clock = make_voices({'chest': 1})
+    voices.play('chest', FakeSound(0.5))
+    clock.now = 1.0
+    voices.end_tick()
+    assert voices.play('chest', FakeSound(0.5))
+    assert voices.stolen['chest'] == 0
+
+
+def test_last_tick_reports_triggered_and_played():
+    voices, _, _ = make_voices({'puffer': 2, 'chest': 1})
+    pop, other, creak = FakeSound(1.0), FakeSound(1.0), FakeSound(1.0)
+    for sound in (pop, pop, other, other):
+        voices.play('puffer', sound)
+    voices.play('chest', creak)
+    voices.end_tick()
+    assert voices.last_tick == {'puffer': (4, 2), 'chest': (1, 1)}
+
+    voices.end_tick()
+    assert voices.last_tick == {}
+
+
+def test_stop_frees_a_looping_voice():
+    voices, _, clock = make_voices({'ambient': 1})
+    loop = FakeSound(1.0)
+    voices.play('ambient', loop, loops=-1)
+    clock.now = 1000.0
+    channel = voices.channels['ambient'][0]
+    assert channel.get_busy()
+
+    voices.stop('ambient')
+    assert not channel.get_busy()
+    voices.end_tick()
+    assert voices.play('ambient', loop, loops=-1)
+    assert voices.stolen['ambient'] == 0
@@ -0,0 +1,106 @@
+import os
+import select
+from config import OUTPUT_BUFFER_SIZE
+
+
+class OutputBuffer:
+    """
+    A reusable byte buffer that frames are encoded into. The bytearray is
+    allocated once and only replaced (at double the size) when a frame does
+    not fit, so building a frame never creates intermediate strings or
+    copies of the whole frame. view() hands the bytes to a writer without
+    copying them.
+    """
+    def __init__(self, capacity=OUTPUT_BUFFER_SIZE):
+        self.length = 0
+        self._allocate(capacity)
+
+    def __len__(self):
+        return self.length
+
+    def _allocate(self, capacity):
+        """Switches to a new bytearray of the given size, keeping the bytes written so far."""
+        data = bytearray(capacity)
+        if self.length:
+            data[:self.length] = memoryview(self.data)[:self.length]
+        self.data = data
+
+    def clear(self):
+        """Empties the buffer, keeping its memory for the next frame."""
+        self.length = 0
+
+    def reserve(self, extra):
+        """Makes sure `extra` more bytes fit."""
+        needed = self.length + extra
+        if needed > len(self.data):
+            self._allocate(max(needed, len(self.data) * 2))
+
+    def append(self, chunk):
+        """Copies a bytes-like chunk onto the end of the buffer."""
+        size = len(chunk)
+        self.reserve(size)
+        self.data[self.length:self.length + size] = chunk
+        self.length += size
+
+    def view(self):
+        """Returns a memoryview of the bytes written so far (valid until the next append)."""
+        return memoryview(self.data)[:self.length]
+
+
+class FdWriter:
+    """
+    Writes bytes straight to a file descriptor with os.write, skipping the
+    text and buffering layers of a Python stream. A short write is resumed
+    from where it stopped, and on a non-blocking descriptor an EAGAIN waits
+    until the terminal can take more instead of dropping the rest.
+    """
+    def __init__(self, fd, stream=None):
+        self.fd = fd
+        self.stream = stream
+
+        # Write statistics
+        self.partial_writes = 0
+        self.blocked_writes = 0
+
+    def write(self, data):
+        """Writes every byte of a bytes-like object, returning how many were written."""
+        if self.stream is not None:
+            # Anything printed through the stream must reach the terminal first
+            self.stream.flush()
+        with memoryview(data) as view:
+            remaining = view
+            while remaining:
+                try:
+                    written = os.write(self.fd, remaining)
+                except BlockingIOError:
+                    self.blocked_writes += 1
+                    self._wait_writable()
+                    continue
+                except InterruptedError:
+                    continue
+                if written < len(remaining):
+                    self.partial_writes += 1
+                remaining = remaining[written:]
+            return len(view)
+
+    def _wait_writable(self):
+        """Blocks until the descriptor can accept more output."""
+        try:
+            select.select([], [self.fd], [])
+        except (OSError, ValueError):
+            # select() only supports sockets on some platforms; just retry
+            pass
+
+    def flush(self):
+        """Nothing to do: os.write is unbuffered."""
+
+
+def open_output(stream):
+    """
+    Returns a binary writer for a text stream such as sys.stdout: an FdWriter
+    on its file descriptor when it has one, otherwise its binary buffer.
+    """
+    try:
+        return FdWriter(stream.fileno(), stream)
+    except (AttributeError, OSError):
+        return getattr(stream, 'buffer', stream)
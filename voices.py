@@ -0,0 +1,83 @@
+import time
+from collections import Counter
+from config import VOICE_CHANNELS
+
+
+class VoiceManager:
+    """
+    Hands out mixer channels to sounds, so a flurry of effects can't crowd
+    out the rest of the soundscape.
+
+    Every category (see VOICE_CHANNELS) owns a fixed set of channels. A
+    sound plays on a free channel of its category; when they are all busy
+    the voice that started first is stolen. The same sound triggered again
+    within one tick (say, by every pufferfish a burst startles) plays only
+    once. end_tick() closes the tick and keeps its triggered/played counts
+    in `last_tick`.
+
+    `mixer` is pygame.mixer, or anything with the same set_num_channels(),
+    set_reserved() and Channel() functions, such as the fake mixer the
+    tests use.
+    """
+    def __init__(self, mixer, channels=VOICE_CHANNELS, clock=time.monotonic):
+        self.clock = clock
+        total = sum(channels.values())
+        mixer.set_num_channels(total)
+        # Reserved channels are never picked by Sound.play(), so only we use them
+        mixer.set_reserved(total)
+
+        self.channels = {}
+        self.started = {}  # category -> start time of the voice on each of its channels
+        first = 0
+        for category, count in channels.items():
+            self.channels[category] = [mixer.Channel(index) for index in range(first, first + count)]
+            self.started[category] = [0.0] * count
+            first += count
+        self.tick_sounds = set()  # (category, sound) pairs already played this tick
+
+        # Voice statistics
+        self.triggered = Counter()
+        self.played = Counter()
+        self.coalesced = Counter()
+        self.stolen = Counter()
+        self.tick_triggered = Counter()
+        self.tick_played = Counter()
+        self.last_tick = {}  # category -> (triggered, played) during the last tick
+
+    def play(self, category, sound, loops=0):
+        """Plays a sound on one of the category's channels; returns whether it started."""
+        self.triggered[category] += 1
+        self.tick_triggered[category] += 1
+        key = (category, id(sound))
+        if key in self.tick_sounds:
+            self.coalesced[category] += 1
+            return False
+        self.tick_sounds.add(key)
+
+        channels = self.channels[category]
+        started = self.started[category]
+        index = next((i for i, channel in enumerate(channels) if not channel.get_busy()), None)
+        if index is None:
+            # Saturated: the oldest voice makes way
+            index = started.index(min(started))
+            channels[index].stop()
+            self.stolen[category] += 1
+        channels[index].play(sound, loops=loops)
+        started[index] = self.clock()
+        self.played[category] += 1
+        self.tick_played[category] += 1
+        return True
+
+    def stop(self, category):
+        """Silences every channel of a category."""
+        for channel in self.channels[category]:
+            channel.stop()
+
+    def end_tick(self):
+        """Closes the current tick: records its counts and lets every sound play again."""
+        self.last_tick = {category: (self.tick_triggered[category], self.tick_played[category])
+                          for category in self.tick_triggered}
+        self.tick_triggered.clear()
+        self.tick_played.clear()
+        self.tick_sounds.clear()
+